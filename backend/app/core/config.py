@@ -1,3 +1,5 @@
+from typing import Dict, List
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -17,6 +19,86 @@ class Settings(BaseSettings):
     
     # Storage
     REPO_STORAGE_PATH: str = "/tmp/eonix_repos"
+    PROJECT_STATE_PATH: str = "/tmp/eonix_repos/eonix_state.db"
+    CHECKPOINT_PATH: str = "/tmp/eonix_repos/eonix_checkpoints.db"
+    HISTORY_STORE_PATH: str = "/tmp/eonix_repos/eonix_history.db"
+    CHECKPOINT_TTL_SECONDS: float = 7 * 24 * 3600  # Checkpoints of abandoned runs are dropped after this
+    REPO_MIRROR_QUOTA_BYTES: int = 50 * 1024 * 1024 * 1024  # Evict LRU mirrors above 50 GB
+    CLONE_DEPTH: int = 0  # 0 = full history, 1 = shallow
+    CLONE_PARTIAL: bool = False  # Blob-less partial clones (--filter=blob:none)
+    CLONE_TIMEOUT_SECONDS: float = 3600  # Kill a clone or fetch running longer than this
+    SCAN_USE_GIT: bool = True  # List git checkouts with `git ls-files` instead of walking them
+    SCAN_RESPECT_GITIGNORE: bool = True  # Apply .gitignore files to walked (non-git) directories
+    SCAN_WORKERS: int = 8  # Threads listing directories during a scan (I/O bound), 1 = serial
+    SCAN_STREAMING: bool = True  # Extract checkout files while the scan is still running
+    SCAN_STREAM_BUFFER: int = 1024  # Scanned files waiting for the pipeline
+    SCAN_MAX_FILE_BYTES: int = 2 * 1024 * 1024  # Larger files are not extracted, 0 = unlimited
+    SCAN_SNIFF_BYTES: int = 4096  # Head read to spot binary, minified and generated files, 0 = off
+    SCAN_MINIFIED_MAX_LINE: int = 1000  # A longer line in the head marks the file as minified
+    SCAN_MINIFIED_MEAN_LINE: int = 300  # As does a longer mean line length
+    SCAN_GENERATED_MARKERS: List[str] = [
+        "@generated", "Code generated", "<auto-generated",
+        "Generated by the protocol buffer compiler",
+    ]  # Text in a file's head that marks it as generated code
+    INGEST_FROM_OBJECT_STORE: bool = False  # Read blobs from the mirror instead of checking out
+    INGEST_DEDUP_FILES: bool = True  # Extract identical files once and copy the result to each path
+    INGEST_PROGRESSIVE: bool = False  # Extract and write high-value files (routes, models) before the rest
+    QUICK_LOOK_PATTERNS: List[str] = [
+        "routes", "router", "routers", "controllers", "controller", "models", "model", "api",
+        "urls.py", "views", "endpoints", "handlers", "*.controller.ts", "*.routes.ts", "*.module.ts",
+    ]  # File or directory name globs extracted first in progressive mode
+    HISTORY_MAX_COMMITS: int = 50  # Commits per history run
+    MONOREPO_SPLIT_WORKSPACES: bool = True  # Ingest each monorepo workspace as its own sub-job
+    MONOREPO_PARALLEL_WORKSPACES: int = 4  # Workspace sub-jobs run at once
+    LOCAL_INGEST_ROOTS: List[str] = []  # Directories local-path ingests may read, empty = disabled
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024 * 1024  # Archive upload size limit, 0 = unlimited
+    UPLOAD_MAX_MEMBER_BYTES: int = 10 * 1024 * 1024  # Larger archive members are not extracted
+    UPLOAD_BUFFER_MEMBERS: int = 64  # Parsed archive members waiting for extraction
+    UPLOAD_DETECTION_BYTES: int = 32 * 1024 * 1024  # File heads kept for language detection of an upload
+    UPLOAD_STAGE_FOR_WORKERS: bool = False  # Stage uploads on disk and queue them for a worker instead of streaming them in the API process
+    UPLOAD_STAGING_PATH: str = "/tmp/eonix_repos/uploads"  # Staged uploads, must be shared with the workers
+    UPLOAD_MAX_CONCURRENT: int = 4  # Uploads in progress at once per API process; more get 429
+
+    # Extraction
+    EXTRACTION_WORKERS: int = 0  # 0 = one worker per CPU core
+    PARALLEL_EXTRACTION_MIN_FILES: int = 50  # Below this, extract in-process
+    EXTRACTION_CHUNK_TARGET_BYTES: int = 64 * 1024  # Small files are grouped into tasks of about this size
+    EXTRACTION_CHUNK_MAX_FILES: int = 32
+    EXTRACTION_FILE_TIMEOUT_SECONDS: float = 60.0  # Per-file wall clock before the result is marked LOW
+    EXTRACTION_TIMEOUT_GRACE_SECONDS: float = 5.0  # Extra time before a stuck worker is killed
+    EXTRACTION_WORKER_MAX_TASKS: int = 1000  # Files per worker process before it is recycled, 0 = never
+    EXTRACTION_WORKER_MAX_RSS_BYTES: int = 1024 * 1024 * 1024  # Recycle a worker whose RSS grows past 1 GB, 0 = never
+    EXTRACTION_WORKER_MAX_AS_BYTES: int = 0  # RLIMIT_AS per worker, 0 = unlimited (inherited by Go/Java tool subprocesses)
+    EXTRACTION_START_METHOD: str = "forkserver"  # Worker start method; plain fork can inherit locks held by the API's threads
+    PIPELINE_QUEUE_SIZE: int = 64  # Max extracted files buffered between stages
+    GRAPH_WRITE_BATCH_SIZE: int = 500  # Nodes per graph write
+    EXTRACTION_CACHE_ENABLED: bool = True
+    EXTRACTION_CACHE_PATH: str = "/tmp/eonix_repos/extraction_cache.db"
+    EXTRACTION_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024  # LRU eviction above 1 GB
+
+    # Ingestion jobs
+    JOB_QUEUE_PATH: str = "/tmp/eonix_repos/eonix_jobs.db"
+    INGEST_WORKER_CONCURRENCY: int = 2  # Jobs run at once per worker process
+    INGEST_INTERACTIVE_SLOTS: int = 1  # Extra per-worker slots reserved for interactive jobs
+    JOB_LEASE_SECONDS: float = 60.0  # Job is re-queued if its worker stops heartbeating
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_POLL_INTERVAL: float = 1.0  # Seconds between claims when the queue is empty
+    SSE_POLL_INTERVAL: float = 0.5  # Seconds between job checks in event streams
+    SSE_KEEPALIVE_SECONDS: float = 15.0
+
+    # Scheduling
+    TENANT_MAX_RUNNING_JOBS: int = 4  # Per-tenant running jobs across all workers, 0 = unlimited
+    TENANT_JOB_LIMITS: Dict[str, int] = {}  # Per-tenant overrides of TENANT_MAX_RUNNING_JOBS
+    TENANT_WEIGHTS: Dict[str, float] = {}  # Fair-share weight per tenant (default 1)
+    JOB_PRIORITY_AGING_SECONDS: float = 300.0  # Queued jobs move up one priority class per interval
+
+    # Admission control
+    INGEST_MAX_QUEUED_JOBS: int = 500  # New jobs get 429 above this backlog, 0 = unlimited
+    TENANT_MAX_QUEUED_JOBS: int = 100  # Per-tenant backlog limit, 0 = unlimited
+    INGEST_RETRY_AFTER_SECONDS: int = 30  # Retry-After sent with 429 responses
+    COMMIT_RESOLVE_TTL_SECONDS: float = 10.0  # Cache of remote HEAD lookups used for dedup
+    BATCH_MAX_REPOS: int = 1000  # Repositories per batch ingest request
+    BATCH_RESOLVE_CONCURRENCY: int = 16  # Parallel remote HEAD lookups while admitting a batch
 
     class Config:
         case_sensitive = True
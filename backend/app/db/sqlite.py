@@ -0,0 +1,101 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    Open a SQLite database tuned for several processes sharing one file.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+class LocalConnections:
+    """
+    One connection per thread to a SQLite file, reopened in forked children.
+
+    The schema is applied by the first connection of the instance; a lock
+    keeps threads that connect at the same time from racing on it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        schema: str,
+        migrate: Optional[Callable[[sqlite3.Connection], None]] = None
+    ):
+        """
+        Args:
+            path: SQLite database file
+            schema: Script creating the tables (with IF NOT EXISTS)
+            migrate: Run after the schema, e.g. to add columns of newer versions
+        """
+        self.path = path
+        self.schema = schema
+        self.migrate = migrate
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = connect(self.path)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(self.schema)
+                    if self.migrate is not None:
+                        self.migrate(conn)
+                    self._initialized = True
+        yield conn
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection):
+    """
+    Run a block inside BEGIN IMMEDIATE so read-modify-write is atomic
+    across processes.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    else:
+        conn.execute("COMMIT")
+
+
+def ensure_columns(conn: sqlite3.Connection, table: str, columns: dict) -> None:
+    """
+    Add columns missing from a table created by an older schema.
+
+    Args:
+        conn: Open connection
+        table: Table to migrate
+        columns: Column name -> column definition (e.g. "TEXT NOT NULL DEFAULT ''")
+    """
+    existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, definition in columns.items():
+        if name not in existing:
+            try:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+            except sqlite3.OperationalError as e:
+                # Another process migrated the table in the meantime
+                if "duplicate column" not in str(e):
+                    raise
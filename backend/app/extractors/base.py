@@ -2,9 +2,31 @@ from abc import ABC, abstractmethod
 from app.schemas.uas import ExtractionResult
 
 class BaseExtractor(ABC):
+    # Identify the extractor in cache keys; bump version when output changes
+    name: str = "base"
+    version: str = "1"
+    # Extractors that hand file_path to an external parser instead of using `content`
+    reads_from_disk: bool = False
+
     @abstractmethod
     def extract(self, file_path: str, content: str) -> ExtractionResult:
         """
         Extract architectural elements from source code.
         """
         pass
+
+    @property
+    def cache_version(self) -> str:
+        """Version string that identifies this extractor's output format"""
+        return self.version
+
+    @property
+    def cacheable(self) -> bool:
+        """Whether results can be reused for identical content"""
+        return True
+
+    def retarget(self, result: ExtractionResult, old_path: str, new_path: str) -> ExtractionResult:
+        """
+        Adapt a result extracted from old_path to identical content at new_path.
+        """
+        return result.retarget(old_path, new_path)
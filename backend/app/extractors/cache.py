@@ -0,0 +1,209 @@
+"""
+Content-addressed extraction cache.
+Stores serialized ExtractionResults in SQLite keyed by
+(content hash, extractor name, extractor version), so identical file
+contents across re-ingests, forks and branches are parsed only once.
+"""
+
+import hashlib
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.db.sqlite import LocalConnections, transaction
+from app.schemas.uas import ExtractionResult
+
+
+def git_blob_hash(data: bytes) -> str:
+    """
+    SHA-1 of the content as git hashes blobs, so keys computed from files
+    on disk match blob SHAs read straight from a git object store.
+    """
+    digest = hashlib.sha1()
+    digest.update(b"blob %d\0" % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for one cache instance"""
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    source_path TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_lru_idx ON entries (last_access);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (name, value) VALUES ('total_bytes', 0);
+"""
+
+# Hits update last_access in batches of this many, or after this long
+_TOUCH_BATCH = 256
+_TOUCH_INTERVAL_SECONDS = 30.0
+
+
+class ExtractionCache:
+    """
+    Persistent, size-bounded LRU cache of extraction results.
+
+    Entries remember the path they were extracted from; callers retarget a
+    hit to the requesting path (see BaseExtractor.retarget). Hits are
+    read-only: their last_access updates are buffered and written in one
+    batch (see flush_access), so concurrent readers do not queue on the
+    SQLite write lock.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            path: SQLite database file (default: settings.EXTRACTION_CACHE_PATH)
+            max_bytes: Evict least-recently-used entries above this size
+        """
+        self.path = path or settings.EXTRACTION_CACHE_PATH
+        self.max_bytes = max_bytes or settings.EXTRACTION_CACHE_MAX_BYTES
+        self.stats = CacheStats()
+        self._conn = LocalConnections(self.path, _SCHEMA).connection
+        self._touched: Dict[str, float] = {}  # Key -> last hit, not yet written
+        self._touch_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    @staticmethod
+    def make_key(content_hash: str, extractor_name: str, extractor_version: str) -> str:
+        return f"{content_hash}:{extractor_name}:{extractor_version}"
+
+    def get(self, key: str) -> Optional[Tuple[str, ExtractionResult]]:
+        """
+        Look up a cached result.
+
+        Returns:
+            (path the result was extracted from, result), or None on a miss
+        """
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT source_path, data FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+
+        self.stats.hits += 1
+        with self._touch_lock:
+            self._touched[key] = time.time()
+            due = len(self._touched) >= _TOUCH_BATCH or \
+                time.monotonic() - self._last_flush >= _TOUCH_INTERVAL_SECONDS
+        if due:
+            self.flush_access()
+        result = ExtractionResult.from_json(zlib.decompress(row["data"]).decode("utf-8"))
+        return row["source_path"], result
+
+    def flush_access(self) -> None:
+        """Write the buffered last_access times of recent hits"""
+        with self._touch_lock:
+            if not self._touched:
+                return
+        with self._conn() as conn, transaction(conn):
+            self._write_touches(conn)
+
+    def _write_touches(self, conn) -> None:
+        with self._touch_lock:
+            touched, self._touched = self._touched, {}
+            self._last_flush = time.monotonic()
+        conn.executemany(
+            "UPDATE entries SET last_access = MAX(last_access, ?) WHERE key = ?",
+            [(accessed, key) for key, accessed in touched.items()]
+        )
+
+    def put(self, key: str, source_path: str, result: ExtractionResult) -> None:
+        """Store a result, evicting old entries if the cache grows too large"""
+        data = zlib.compress(result.to_json().encode("utf-8"))
+        with self._conn() as conn, transaction(conn):
+            previous = conn.execute(
+                "SELECT size_bytes FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO entries (key, source_path, size_bytes, last_access, data)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, source_path, len(data), time.time(), data)
+            )
+            delta = len(data) - (previous["size_bytes"] if previous else 0)
+            conn.execute(
+                "UPDATE meta SET value = value + ? WHERE name = 'total_bytes'", (delta,)
+            )
+            self._evict(conn)
+        self.stats.stores += 1
+
+    def _evict(self, conn) -> None:
+        """Drop least-recently-used entries until the cache is within 90% of max_bytes"""
+        total = conn.execute(
+            "SELECT value FROM meta WHERE name = 'total_bytes'"
+        ).fetchone()["value"]
+        if total <= self.max_bytes:
+            return
+
+        # Recent hits must count before choosing victims
+        self._write_touches(conn)
+
+        target = int(self.max_bytes * 0.9)
+        freed = 0
+        victims = []
+        for row in conn.execute(
+            "SELECT key, size_bytes FROM entries ORDER BY last_access"
+        ):
+            if total - freed <= target:
+                break
+            victims.append(row["key"])
+            freed += row["size_bytes"]
+
+        conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in victims])
+        conn.execute(
+            "UPDATE meta SET value = value - ? WHERE name = 'total_bytes'", (freed,)
+        )
+        self.stats.evictions += len(victims)
+
+    def summary(self) -> Dict[str, Any]:
+        """Counters plus current size of the cache"""
+        with self._conn() as conn:
+            entries = conn.execute("SELECT COUNT(*) AS n FROM entries").fetchone()["n"]
+            total = conn.execute(
+                "SELECT value FROM meta WHERE name = 'total_bytes'"
+            ).fetchone()["value"]
+        return {
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "hit_rate": round(self.stats.hit_rate, 3),
+            "stores": self.stats.stores,
+            "evictions": self.stats.evictions,
+            "entries": entries,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def default_cache() -> Optional[ExtractionCache]:
+    """The configured cache, or None when caching is disabled"""
+    if not settings.EXTRACTION_CACHE_ENABLED:
+        return None
+    return ExtractionCache()
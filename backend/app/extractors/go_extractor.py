@@ -25,6 +25,10 @@ class GoExtractor(BaseExtractor):
     - gRPC services
     """
     
+    name = "go"
+    version = "1"
+    reads_from_disk = True  # The parser binary reads file_path itself
+    
     def __init__(self):
         """Initialize Go extractor"""
         self.binary_path = self._find_binary()
@@ -48,6 +52,11 @@ class GoExtractor(BaseExtractor):
         
         return None
     
+    @property
+    def cacheable(self) -> bool:
+        # "Not available" results must not outlive building the extractor
+        return self.available
+    
     def extract(self, file_path: str, content: str) -> ExtractionResult:
         """
         Extract facts from Go file.
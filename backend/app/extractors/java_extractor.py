@@ -25,6 +25,10 @@ class JavaExtractor(BaseExtractor):
     - Request/Response parameters
     """
     
+    name = "java"
+    version = "1"
+    reads_from_disk = True  # The parser binary reads file_path itself
+    
     def __init__(self):
         """Initialize Java extractor"""
         self.jar_path = self._find_jar()
@@ -49,6 +53,11 @@ class JavaExtractor(BaseExtractor):
         
         return None
     
+    @property
+    def cacheable(self) -> bool:
+        # "Not available" results must not outlive building the extractor
+        return self.available
+    
     def extract(self, file_path: str, content: str) -> ExtractionResult:
         """
         Extract facts from Java file.
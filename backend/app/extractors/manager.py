@@ -1,4 +1,7 @@
 import os
+import tempfile
+from typing import Optional, Union
+from app.extractors.cache import ExtractionCache, default_cache, git_blob_hash
 from app.extractors.python_extractor import PythonExtractor
 from app.extractors.ts_extractor import TypeScriptExtractor
 from app.extractors.java_extractor import JavaExtractor
@@ -9,9 +12,14 @@ class ExtractionManager:
     """
     Central manager for routing files to appropriate extractors.
     Supports Python, TypeScript, JavaScript, Java, and Go with appropriate AST parsers.
+    
+    An optional ExtractionCache short-circuits files whose content was
+    already extracted by the same extractor version.
     """
     
-    def __init__(self):
+    def __init__(self, cache: Optional[ExtractionCache] = None):
+        self.cache = cache
+        
         python_extractor = PythonExtractor()
         ts_extractor = TypeScriptExtractor()
         java_extractor = JavaExtractor()
@@ -44,27 +52,116 @@ class ExtractionManager:
         Args:
             file_path: Path to the file to extract from
             
+        Returns:
+            ExtractionResult with nodes and edges
+        """
+        _, ext = os.path.splitext(file_path)
+        if ext.lower() not in self.extractors:
+            # No extractor for this file type
+            return ExtractionResult(nodes=[], edges=[], confidence="LOW")
+        
+        try:
+            with open(file_path, 'rb') as f:
+                content = f.read()
+        except Exception as e:
+            print(f"⚠️  Error extracting {file_path}: {e}")
+            return ExtractionResult(
+                nodes=[],
+                edges=[],
+                confidence="LOW",
+                errors=[str(e)]
+            )
+        return self.extract_content(file_path, content, on_disk=True)
+    
+    def extract_content(
+        self,
+        file_path: str,
+        content: Union[bytes, str],
+        content_hash: Optional[str] = None,
+        on_disk: bool = False
+    ) -> ExtractionResult:
+        """
+        Extract architectural facts from file content that is already in memory.
+        
+        Args:
+            file_path: Path the content belongs to (selects the extractor, embedded in node IDs)
+            content: Raw file content
+            content_hash: Git blob SHA of the content, if already known
+            on_disk: Whether file_path exists with this content (false for
+                blobs read from the git object store)
+            
         Returns:
             ExtractionResult with nodes and edges
         """
         _, ext = os.path.splitext(file_path)
         extractor = self.extractors.get(ext.lower())
         
-        if extractor:
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                return extractor.extract(file_path, content)
-            except Exception as e:
-                print(f"⚠️  Error extracting {file_path}: {e}")
-                return ExtractionResult(
-                    nodes=[],
-                    edges=[],
-                    confidence="LOW",
-                    errors=[str(e)]
-                )
+        if not extractor:
+            # No extractor for this file type
+            return ExtractionResult(nodes=[], edges=[], confidence="LOW")
         
-        # No extractor for this file type
-        return ExtractionResult(nodes=[], edges=[], confidence="LOW")
+        raw = content.encode('utf-8') if isinstance(content, str) else content
+        
+        cache_key = None
+        if self.cache is not None and extractor.cacheable:
+            cache_key = ExtractionCache.make_key(
+                content_hash or git_blob_hash(raw),
+                f"{extractor.name}{ext.lower()}",
+                extractor.cache_version
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                source_path, result = cached
+                if source_path == file_path:
+                    return result
+                return extractor.retarget(result, source_path, file_path)
+        
+        try:
+            if extractor.reads_from_disk and not on_disk:
+                result = self._extract_via_temp_file(extractor, file_path, raw)
+            else:
+                result = extractor.extract(file_path, raw.decode('utf-8', errors='ignore'))
+        except Exception as e:
+            print(f"⚠️  Error extracting {file_path}: {e}")
+            return ExtractionResult(
+                nodes=[],
+                edges=[],
+                confidence="LOW",
+                errors=[str(e)]
+            )
+        
+        # Errors may be transient (timeouts, missing tools), so only clean results are cached
+        if cache_key is not None and not result.errors:
+            self.cache.put(cache_key, file_path, result)
+        return result
+
+    def retarget(self, result: ExtractionResult, old_path: str, new_path: str) -> ExtractionResult:
+        """
+        Adapt a result extracted from old_path to a file with identical content at new_path.
+        
+        Args:
+            result: Result extracted from old_path
+            old_path: Path the result was extracted from
+            new_path: Path of the identical file
+            
+        Returns:
+            ExtractionResult whose node IDs and file paths refer to new_path
+        """
+        _, ext = os.path.splitext(new_path)
+        extractor = self.extractors.get(ext.lower())
+        if extractor is None:
+            return result.retarget(old_path, new_path)
+        return extractor.retarget(result, old_path, new_path)
+
+    @staticmethod
+    def _extract_via_temp_file(extractor, file_path: str, raw: bytes) -> ExtractionResult:
+        """Run a disk-reading extractor on in-memory content"""
+        with tempfile.TemporaryDirectory(prefix="eonix-") as tmp_dir:
+            # Keep the file name: Java requires it to match the public class
+            tmp_path = os.path.join(tmp_dir, os.path.basename(file_path))
+            with open(tmp_path, 'wb') as f:
+                f.write(raw)
+            result = extractor.extract(tmp_path, raw.decode('utf-8', errors='ignore'))
+        return extractor.retarget(result, tmp_path, file_path)
 
-extraction_manager = ExtractionManager()
+extraction_manager = ExtractionManager(cache=default_cache())
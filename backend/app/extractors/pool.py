@@ -0,0 +1,726 @@
+"""
+Process-pool extraction for large repositories.
+Fans files out to worker processes that each own an ExtractionManager,
+so AST parsing scales across CPU cores instead of running on one.
+
+Workers are supervised: every file runs under a wall-clock limit, a worker
+that hangs or dies is killed and replaced, and workers are recycled after a
+number of files or once their memory grows too large. A file that hits a
+limit becomes a LOW-confidence result; the rest of its chunk still runs.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future, as_completed
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional,
+    Sequence, Tuple, Union
+)
+
+from app.core.config import settings
+from app.schemas.uas import ExtractionResult
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+if TYPE_CHECKING:
+    from app.services.git_objects import GitObjectReader
+    from app.services.scanner import FileInfo
+
+
+# One file of a chunk: (path, source) where source is the blob SHA to read
+# it from, its in-memory content, or None to read the path
+ChunkItem = Tuple[str, Optional[Union[str, bytes]]]
+
+
+@dataclass
+class ChunkResult:
+    """Results of one chunk, plus timings for pool metrics"""
+    results: List[Tuple[str, ExtractionResult]]
+    file_seconds: List[float]
+    seconds: float
+    worker_pid: Optional[int] = None
+    workers_replaced: int = 0  # Workers killed after hanging or dying on this chunk
+    workers_recycled: int = 0  # Workers retired after this chunk (task count or memory)
+    cache_hits: int = 0  # Files answered by the worker's extraction cache
+    cache_misses: int = 0  # Cacheable files that had to be parsed
+
+
+@dataclass
+class WorkerLimits:
+    """Resource limits applied to each extraction worker process"""
+    file_timeout: float  # Seconds per file, 0 = unlimited
+    kill_grace: float  # Extra seconds before a worker ignoring the timeout is killed
+    max_tasks: int  # Files per worker before it is recycled, 0 = never
+    max_rss_bytes: int  # RSS above which a worker is recycled, 0 = never
+    max_as_bytes: int  # RLIMIT_AS of the worker, 0 = unlimited
+
+    @classmethod
+    def from_settings(cls) -> "WorkerLimits":
+        return cls(
+            file_timeout=settings.EXTRACTION_FILE_TIMEOUT_SECONDS,
+            kill_grace=settings.EXTRACTION_TIMEOUT_GRACE_SECONDS,
+            max_tasks=settings.EXTRACTION_WORKER_MAX_TASKS,
+            max_rss_bytes=settings.EXTRACTION_WORKER_MAX_RSS_BYTES,
+            max_as_bytes=settings.EXTRACTION_WORKER_MAX_AS_BYTES,
+        )
+
+    @property
+    def kill_after(self) -> Optional[float]:
+        """Seconds the parent waits for one file before killing the worker"""
+        if not self.file_timeout:
+            return None
+        return self.file_timeout + self.kill_grace
+
+
+class ExtractionTimeout(BaseException):
+    """
+    Raised inside a worker when a file exceeds its time limit.
+
+    A BaseException so extractors' `except Exception` handlers cannot swallow it.
+    """
+
+
+class WorkerLostError(RuntimeError):
+    """A worker process hung past its deadline or died mid-file"""
+
+
+# Per-process manager, created once when the worker starts
+_worker_manager = None
+
+# Per-process cat-file readers, keyed by git directory
+_worker_readers: Dict[str, "GitObjectReader"] = {}
+
+
+def _init_worker(cache_path: Optional[str]) -> None:
+    """Build a dedicated ExtractionManager inside each worker process"""
+    global _worker_manager
+    from app.extractors.cache import ExtractionCache
+    from app.extractors.manager import ExtractionManager
+    _worker_manager = ExtractionManager(cache=ExtractionCache(cache_path) if cache_path else None)
+
+
+def _extract_in_worker(file_path: str) -> Tuple[str, ExtractionResult]:
+    """Worker entry point: extract one file with the worker's manager"""
+    return file_path, _worker_manager.extract_file(file_path)
+
+
+def _extract_blob_in_worker(git_dir: str, file_path: str, sha: str) -> Tuple[str, ExtractionResult]:
+    """Worker entry point: extract one blob read from the git object store"""
+    from app.services.git_objects import GitObjectReader
+    reader = _worker_readers.get(git_dir)
+    if reader is None:
+        reader = _worker_readers[git_dir] = GitObjectReader(git_dir)
+    content = reader.read_blob(sha)
+    return file_path, _worker_manager.extract_content(file_path, content, content_hash=sha)
+
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        if resource is None:
+            return 0
+        # Peak rather than current RSS, in KB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _raise_timeout(signum, frame) -> None:
+    raise ExtractionTimeout("extraction timed out")
+
+
+def _extract_with_timeout(
+    git_dir: Optional[str],
+    file_path: str,
+    source: Optional[Union[str, bytes]],
+    timeout: float
+) -> ExtractionResult:
+    """Extract one file, interrupted by SIGALRM after timeout seconds"""
+    armed = bool(timeout) and hasattr(signal, "setitimer")
+    if armed:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        if isinstance(source, bytes):
+            return _worker_manager.extract_content(file_path, source)
+        if source:
+            return _extract_blob_in_worker(git_dir, file_path, source)[1]
+        return _extract_in_worker(file_path)[1]
+    finally:
+        if armed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _worker_main(conn, limits: WorkerLimits, cache_path: Optional[str]) -> None:
+    """
+    Worker process loop.
+
+    Workers do not inherit the parent's state unless started with fork, so
+    everything they need beyond the environment arrives as arguments.
+
+    Receives (git_dir, items) chunks, or None to exit. Sends
+    ("file", path, result, seconds, cache_hits, cache_misses) as each
+    file finishes, then ("done", recycle) at the end of the chunk; a
+    worker asking to be recycled exits right after.
+    """
+    # The parent owns Ctrl-C and stops workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _raise_timeout)
+    if resource is not None and limits.max_as_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (limits.max_as_bytes, limits.max_as_bytes))
+    _init_worker(cache_path)
+    cache = _worker_manager.cache
+
+    files_done = 0
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+
+        git_dir, items = task
+        recycle = False
+        for file_path, source in items:
+            started = time.perf_counter()
+            hits, misses = (cache.stats.hits, cache.stats.misses) if cache is not None else (0, 0)
+            try:
+                result = _extract_with_timeout(git_dir, file_path, source, limits.file_timeout)
+            except ExtractionTimeout:
+                # An interrupted read leaves cat-file mid-stream; start readers afresh
+                for reader in _worker_readers.values():
+                    reader.close()
+                _worker_readers.clear()
+                result = ExtractionPool._failed_result(
+                    file_path, ExtractionTimeout(f"extraction timed out after {limits.file_timeout:g}s")
+                )
+            except MemoryError as e:
+                # The heap is in an unknown state after an allocation failure
+                result = ExtractionPool._failed_result(file_path, e)
+                recycle = True
+            except Exception as e:
+                result = ExtractionPool._failed_result(file_path, e)
+            files_done += 1
+            if cache is not None:
+                hits, misses = cache.stats.hits - hits, cache.stats.misses - misses
+            conn.send(("file", file_path, result, time.perf_counter() - started, hits, misses))
+
+        if cache is not None:
+            cache.flush_access()
+
+        if limits.max_tasks and files_done >= limits.max_tasks:
+            recycle = True
+        if limits.max_rss_bytes and _rss_bytes() > limits.max_rss_bytes:
+            recycle = True
+        conn.send(("done", recycle))
+        if recycle:
+            break
+    conn.close()
+
+
+# Serializes worker start-up so no child inherits another worker's pipe end, which
+# would hide that worker's death from the parent. This is only about pipe ends:
+# other threads' locks (logging, sqlite3) held at fork time are why workers are not
+# started with plain fork, see _worker_context()
+_spawn_lock = threading.Lock()
+
+
+def _worker_context():
+    """
+    Multiprocessing context for worker processes.
+
+    The parent runs supervisor, scan and to_thread threads, so a forked child
+    could inherit a lock another thread holds and deadlock on it. forkserver
+    forks from a single-threaded server instead; spawn is the fallback where it
+    is unavailable. fork is only used when EXTRACTION_START_METHOD asks for it.
+    """
+    method = settings.EXTRACTION_START_METHOD
+    if method not in multiprocessing.get_all_start_methods():
+        method = "spawn"
+    context = multiprocessing.get_context(method)
+    if method == "forkserver":
+        # Imported once in the server rather than by every worker
+        context.set_forkserver_preload(["app.extractors.pool", "app.extractors.manager"])
+    return context
+
+
+class _WorkerSlot:
+    """One supervised worker process, replaced whenever it hangs, dies or asks to be recycled"""
+
+    def __init__(self, context, limits: WorkerLimits, cache_path: Optional[str]):
+        self.context = context
+        self.limits = limits
+        self.cache_path = cache_path
+        self.process = None
+        self.conn = None
+
+    def _spawn(self) -> None:
+        with _spawn_lock:
+            parent_conn, child_conn = self.context.Pipe()
+            self.process = self.context.Process(
+                target=_worker_main,
+                args=(child_conn, self.limits, self.cache_path),
+                daemon=True,
+            )
+            self.process.start()
+            child_conn.close()
+        self.conn = parent_conn
+
+    def _receive(self) -> tuple:
+        timeout = self.limits.kill_after
+        try:
+            if not self.conn.poll(timeout):
+                raise WorkerLostError(f"extraction timed out after {timeout:g}s, worker killed")
+            return self.conn.recv()
+        except (EOFError, OSError):
+            self.process.join(1)
+            raise WorkerLostError(f"extraction worker died (exit code {self.process.exitcode})")
+
+    def kill(self) -> None:
+        """Kill the worker immediately"""
+        if self.process is None:
+            return
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self.process = self.conn = None
+
+    def stop(self) -> None:
+        """Ask the worker to exit, killing it if it does not"""
+        if self.process is None:
+            return
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass  # Already exiting after asking to be recycled
+        self.process.join(5)
+        self.kill()
+
+    def run(self, git_dir: Optional[str], items: List[ChunkItem]) -> ChunkResult:
+        """
+        Extract a chunk, replacing the worker as often as needed.
+
+        A file the worker hangs or dies on is recorded as a LOW result and
+        the remaining files go to a fresh worker.
+        """
+        started = time.perf_counter()
+        results: List[Tuple[str, ExtractionResult]] = []
+        file_seconds: List[float] = []
+        chunk = ChunkResult(results=results, file_seconds=file_seconds, seconds=0.0)
+        remaining = list(items)
+
+        while remaining:
+            if self.process is not None and not self.process.is_alive():
+                self.kill()  # Died while idle, e.g. OOM-killed
+            if self.process is None:
+                self._spawn()
+            chunk.worker_pid = self.process.pid
+            self.conn.send((git_dir, remaining))
+
+            while remaining:
+                file_started = time.perf_counter()
+                try:
+                    _, file_path, result, seconds, hits, misses = self._receive()
+                    chunk.cache_hits += hits
+                    chunk.cache_misses += misses
+                except WorkerLostError as e:
+                    file_path = remaining[0][0]
+                    result = ExtractionPool._failed_result(file_path, e)
+                    seconds = time.perf_counter() - file_started
+                    self.kill()
+                    chunk.workers_replaced += 1
+                results.append((file_path, result))
+                file_seconds.append(seconds)
+                remaining.pop(0)
+                if self.process is None:
+                    break
+            else:
+                try:
+                    _, recycle = self._receive()
+                except WorkerLostError:
+                    recycle = True
+                if recycle:
+                    self.stop()
+                    chunk.workers_recycled += 1
+
+        chunk.seconds = time.perf_counter() - started
+        return chunk
+
+
+def plan_chunks(
+    files: Sequence["FileInfo"],
+    workers: int,
+    target_bytes: Optional[int] = None,
+    max_files: Optional[int] = None
+) -> List[List["FileInfo"]]:
+    """
+    Order files largest-first and group small ones into chunks.
+
+    Largest-first (LPT) keeps one big file from starting last and leaving
+    every other worker idle. Small files are packed into chunks of about
+    target_bytes to cut per-task IPC overhead; the target shrinks for
+    small repos so there are still several chunks per worker to balance.
+
+    Args:
+        files: Files to extract
+        workers: Worker processes that will run the chunks
+        target_bytes: Upper bound for a chunk's bytes (default: settings.EXTRACTION_CHUNK_TARGET_BYTES)
+        max_files: Files per chunk (default: settings.EXTRACTION_CHUNK_MAX_FILES)
+
+    Returns:
+        Chunks in submission order, largest first
+    """
+    target_bytes = target_bytes or settings.EXTRACTION_CHUNK_TARGET_BYTES
+    max_files = max_files or settings.EXTRACTION_CHUNK_MAX_FILES
+    ordered = sorted(files, key=lambda f: f.size_bytes, reverse=True)
+    total_bytes = sum(f.size_bytes for f in ordered)
+    target = max(1, min(target_bytes, total_bytes // (max(workers, 1) * 4)))
+
+    chunks: List[List["FileInfo"]] = []
+    current: List["FileInfo"] = []
+    current_bytes = 0
+    for file_info in ordered:
+        if file_info.size_bytes >= target:
+            chunks.append([file_info])
+            continue
+        current.append(file_info)
+        current_bytes += file_info.size_bytes
+        if current_bytes >= target or len(current) >= max_files:
+            chunks.append(current)
+            current, current_bytes = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def stream_chunks(
+    files: AsyncIterable["FileInfo"],
+    target_bytes: Optional[int] = None,
+    max_files: Optional[int] = None
+) -> AsyncIterator[List["FileInfo"]]:
+    """
+    Group files into chunks as they arrive from a stream.
+
+    The counterpart of plan_chunks when the files are not known up front
+    (e.g. members of an uploaded archive): no largest-first ordering is
+    possible, but small files are still packed to cut per-task overhead.
+
+    Args:
+        files: Files in arrival order
+        target_bytes: Upper bound for a chunk's bytes (default: settings.EXTRACTION_CHUNK_TARGET_BYTES)
+        max_files: Files per chunk (default: settings.EXTRACTION_CHUNK_MAX_FILES)
+
+    Yields:
+        Chunks in arrival order
+    """
+    target_bytes = target_bytes or settings.EXTRACTION_CHUNK_TARGET_BYTES
+    max_files = max_files or settings.EXTRACTION_CHUNK_MAX_FILES
+    current: List["FileInfo"] = []
+    current_bytes = 0
+    async for file_info in files:
+        if file_info.size_bytes >= target_bytes:
+            yield [file_info]
+            continue
+        current.append(file_info)
+        current_bytes += file_info.size_bytes
+        if current_bytes >= target_bytes or len(current) >= max_files:
+            yield current
+            current, current_bytes = [], 0
+    if current:
+        yield current
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+@dataclass
+class PoolMetrics:
+    """Load balance and tail latency of one run's extraction tasks"""
+    tasks: int = 0
+    files: int = 0
+    task_seconds: List[float] = field(default_factory=list)
+    busy_seconds: Dict[int, float] = field(default_factory=dict)
+    slowest_files: List[Tuple[float, str]] = field(default_factory=list)
+    tail_seconds: float = 0.0  # From the last submission until the last task finished
+    workers_replaced: int = 0
+    workers_recycled: int = 0
+    cache_hits: int = 0  # Extraction cache lookups answered in the workers
+    cache_misses: int = 0
+
+    def record(self, chunk: ChunkResult) -> None:
+        self.tasks += 1
+        self.files += len(chunk.results)
+        self.cache_hits += chunk.cache_hits
+        self.cache_misses += chunk.cache_misses
+        self.task_seconds.append(chunk.seconds)
+        self.workers_replaced += chunk.workers_replaced
+        self.workers_recycled += chunk.workers_recycled
+        if chunk.worker_pid is not None:
+            self.busy_seconds[chunk.worker_pid] = \
+                self.busy_seconds.get(chunk.worker_pid, 0.0) + chunk.seconds
+        for (path, _), seconds in zip(chunk.results, chunk.file_seconds):
+            self.slowest_files.append((seconds, path))
+        self.slowest_files = sorted(self.slowest_files, reverse=True)[:5]
+
+    @property
+    def load_balance(self) -> float:
+        """Mean worker busy time over the busiest worker's (1.0 = perfectly even)"""
+        if not self.busy_seconds:
+            return 1.0
+        busiest = max(self.busy_seconds.values())
+        if not busiest:
+            return 1.0
+        return sum(self.busy_seconds.values()) / len(self.busy_seconds) / busiest
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "tasks": self.tasks,
+            "files": self.files,
+            "files_per_task": round(self.files / self.tasks, 2) if self.tasks else 0.0,
+            "workers_used": len(self.busy_seconds),
+            "load_balance": round(self.load_balance, 3),
+            "task_seconds_p50": round(_percentile(self.task_seconds, 0.5), 4),
+            "task_seconds_p95": round(_percentile(self.task_seconds, 0.95), 4),
+            "task_seconds_max": round(max(self.task_seconds, default=0.0), 4),
+            "tail_seconds": round(self.tail_seconds, 4),
+            "workers_replaced": self.workers_replaced,
+            "workers_recycled": self.workers_recycled,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": round(self.cache_hits / lookups, 3) if lookups else 0.0,
+            "slowest_files": [
+                {"path": path, "seconds": round(seconds, 4)} for seconds, path in self.slowest_files
+            ],
+        }
+
+
+def resolve_worker_count(max_workers: Optional[int] = None) -> int:
+    """Resolve the configured worker count (0 or None means one per core)"""
+    workers = max_workers if max_workers is not None else settings.EXTRACTION_WORKERS
+    if not workers or workers < 1:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def should_use_pool(file_count: int, max_workers: Optional[int] = None) -> bool:
+    """Whether a repository is large enough to amortize pool start-up"""
+    return (
+        resolve_worker_count(max_workers) > 1
+        and file_count >= settings.PARALLEL_EXTRACTION_MIN_FILES
+    )
+
+
+class ExtractionPool:
+    """
+    Parallel extraction backed by supervised worker processes.
+
+    Results are yielded as soon as each worker finishes, not in input order.
+
+    Usage:
+        with ExtractionPool() as pool:
+            for file_path, result in pool.extract_files(paths):
+                ...
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, limits: Optional[WorkerLimits] = None):
+        """
+        Args:
+            max_workers: Number of worker processes (default: settings.EXTRACTION_WORKERS)
+            limits: Per-worker resource limits (default: from settings)
+        """
+        self.max_workers = resolve_worker_count(max_workers)
+        self.limits = limits or WorkerLimits.from_settings()
+        self._context = _worker_context()
+        # Read here because workers do not see settings changed in this process
+        self._cache_path = settings.EXTRACTION_CACHE_PATH if settings.EXTRACTION_CACHE_ENABLED else None
+        self._tasks: Optional[queue.Queue] = None
+        self._supervisors: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "ExtractionPool":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.shutdown()
+
+    def start(self) -> None:
+        """Start one supervisor thread per worker; each spawns its process on first use"""
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self) -> None:
+        if self._tasks is not None:
+            return
+        self._tasks = queue.Queue()
+        for slot in range(self.max_workers):
+            supervisor = threading.Thread(
+                target=self._supervise,
+                args=(self._tasks, _WorkerSlot(self._context, self.limits, self._cache_path)),
+                name=f"extraction-worker-{slot}",
+                daemon=True,
+            )
+            supervisor.start()
+            self._supervisors.append(supervisor)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, cancelling anything not yet started"""
+        with self._lock:
+            tasks, supervisors = self._tasks, self._supervisors
+            self._tasks, self._supervisors = None, []
+        if tasks is None:
+            return
+        while True:
+            try:
+                task = tasks.get_nowait()
+            except queue.Empty:
+                break
+            task[0].cancel()
+        for _ in supervisors:
+            tasks.put(None)
+        for supervisor in supervisors:
+            supervisor.join()
+
+    @staticmethod
+    def _supervise(tasks: queue.Queue, slot: _WorkerSlot) -> None:
+        """Feed queued tasks to one worker slot until shutdown"""
+        try:
+            while True:
+                task = tasks.get()
+                if task is None:
+                    break
+                future, git_dir, items, single = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    chunk = slot.run(git_dir, items)
+                except Exception as e:
+                    # Broken pipe or failed spawn: drop the worker, fail this task
+                    slot.kill()
+                    future.set_exception(e)
+                    continue
+                future.set_result(chunk.results[0] if single else chunk)
+        finally:
+            slot.stop()
+
+    def _submit(self, git_dir: Optional[str], items: List[ChunkItem], single: bool) -> Future:
+        future: Future = Future()
+        with self._lock:
+            self._start_locked()
+            self._tasks.put((future, git_dir, list(items), single))
+        return future
+
+    def submit(self, file_path: str) -> Future:
+        """Queue a single file for extraction"""
+        return self._submit(None, [(file_path, None)], single=True)
+
+    def submit_blob(self, git_dir: str, file_path: str, sha: str) -> Future:
+        """Queue a blob from the git object store for extraction as file_path"""
+        return self._submit(git_dir, [(file_path, sha)], single=True)
+
+    def submit_chunk(self, items: List[ChunkItem], git_dir: Optional[str] = None) -> Future:
+        """Queue several files to be extracted by one worker in one task"""
+        return self._submit(git_dir, items, single=False)
+
+    async def extract_chunk_async(
+        self,
+        items: List[ChunkItem],
+        git_dir: Optional[str] = None
+    ) -> ChunkResult:
+        """Extract a chunk without blocking the event loop"""
+        started = time.perf_counter()
+        try:
+            return await asyncio.wrap_future(self.submit_chunk(items, git_dir))
+        except Exception as e:
+            return ChunkResult(
+                results=[(path, self._failed_result(path, e)) for path, _ in items],
+                file_seconds=[0.0] * len(items),
+                seconds=time.perf_counter() - started,
+            )
+
+    def extract_files(
+        self,
+        file_paths: Iterable[str]
+    ) -> Iterator[Tuple[str, ExtractionResult]]:
+        """
+        Extract files in parallel, yielding (file_path, result) as they finish.
+
+        Args:
+            file_paths: Paths of the files to extract
+
+        Yields:
+            (file_path, ExtractionResult) tuples in completion order
+        """
+        futures: Dict[Future, str] = {
+            self.submit(path): path for path in file_paths
+        }
+        for future in as_completed(futures):
+            yield self._collect(future, futures[future])
+
+    async def extract_files_async(
+        self,
+        file_paths: Iterable[str]
+    ) -> AsyncIterator[Tuple[str, ExtractionResult]]:
+        """Async variant of extract_files that never blocks the event loop"""
+        futures: Dict[asyncio.Future, str] = {
+            asyncio.wrap_future(self.submit(path)): path for path in file_paths
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                yield self._collect(future, futures[future])
+
+    async def extract_file_async(self, file_path: str) -> Tuple[str, ExtractionResult]:
+        """Extract a single file without blocking the event loop"""
+        try:
+            return await asyncio.wrap_future(self.submit(file_path))
+        except Exception as e:
+            return file_path, self._failed_result(file_path, e)
+
+    async def extract_blob_async(
+        self,
+        git_dir: str,
+        file_path: str,
+        sha: str
+    ) -> Tuple[str, ExtractionResult]:
+        """Extract a git blob without blocking the event loop"""
+        try:
+            return await asyncio.wrap_future(self.submit_blob(git_dir, file_path, sha))
+        except Exception as e:
+            return file_path, self._failed_result(file_path, e)
+
+    @classmethod
+    def _collect(cls, future, file_path: str) -> Tuple[str, ExtractionResult]:
+        """Unwrap a finished future, turning worker failures into LOW results"""
+        try:
+            return future.result()
+        except Exception as e:
+            return file_path, cls._failed_result(file_path, e)
+
+    @staticmethod
+    def _failed_result(file_path: str, error: BaseException) -> ExtractionResult:
+        message = str(error) or type(error).__name__
+        print(f"⚠️  Worker failed on {file_path}: {message}")
+        return ExtractionResult(
+            nodes=[],
+            edges=[],
+            confidence="LOW",
+            errors=[message]
+        )
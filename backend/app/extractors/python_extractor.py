@@ -9,7 +9,7 @@ import ast
 from typing import List, Optional, Dict, Any
 from app.extractors.base import BaseExtractor
 from app.schemas.uas import (
-    ExtractionResult, EndpointNode, ServiceNode, DatabaseModelNode,
+    ExtractionResult, EndpointNode, DatabaseModelNode,
     DependencyEdge, CacheNode, ExternalAPINode, Parameter
 )
 
@@ -26,6 +26,9 @@ class PythonExtractor(BaseExtractor):
     - Database connections
     """
     
+    name = "python"
+    version = "1"
+    
     def extract(self, file_path: str, content: str) -> ExtractionResult:
         nodes = []
         edges = []
@@ -90,6 +93,18 @@ class PythonExtractor(BaseExtractor):
         
         return imports
     
+    def retarget(self, result: ExtractionResult, old_path: str, new_path: str) -> ExtractionResult:
+        """Also remap the service name, which is derived from the parent directory"""
+        moved = result.retarget(old_path, new_path)
+        old_service = self._infer_service_name(old_path, {})
+        new_service = self._infer_service_name(new_path, {})
+        if old_service != new_service:
+            moved.edges = [
+                e.model_copy(update={"source_id": new_service}) if e.source_id == old_service else e
+                for e in moved.edges
+            ]
+        return moved
+    
     def _infer_service_name(self, file_path: str, imports: Dict[str, str]) -> str:
         """Infer service name from file path or imports"""
         # Simple heuristic: use directory name or "python-service"
@@ -29,6 +29,9 @@ class TypeScriptExtractor(BaseExtractor):
     - External API calls (axios, fetch)
     """
     
+    name = "typescript"
+    version = "1"
+    
     def __init__(self):
         """Initialize Tree-sitter parser"""
         try:
@@ -49,6 +52,11 @@ class TypeScriptExtractor(BaseExtractor):
             print(f"⚠️  Tree-sitter not available, falling back to regex: {e}")
             self.use_treesitter = False
     
+    @property
+    def cache_version(self) -> str:
+        # Tree-sitter and regex fallback produce different results
+        return f"{self.version}+{'treesitter' if self.use_treesitter else 'regex'}"
+    
     def extract(self, file_path: str, content: str) -> ExtractionResult:
         """Extract facts from TypeScript/JavaScript file"""
         
@@ -1,16 +1,21 @@
-from fastapi import FastAPI, BackgroundTasks, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional
-import uuid
-import os
-import shutil
+from typing import List, Optional, Union
+import asyncio
+import json
+import time
 
-from app.services.ingestion import ingestion_service, RepositoryScanner
-from app.extractors.manager import extraction_manager
+from app.core.config import settings
+from app.services.admission import BatchRepo, ingest_admission
 from app.services.graph_service import graph_service
-from app.services.detector import LanguageDetector
-from app.schemas.uas import ExtractionResult
+from app.services.archive import ArchiveError, multipart_file_chunks
+from app.services.history import history_service, history_store
+from app.services.ingestion import ingestion_service
+from app.services.job_queue import QueueFullError, job_queue
+from app.services.project_store import project_store
+from app.services.scheduler import JobPriority
 
 app = FastAPI(title="Eonix API", version="1.0.0")
 
@@ -25,13 +30,56 @@ app.add_middleware(
 
 class IngestRequest(BaseModel):
     repo_url: str
+    from_object_store: Optional[bool] = None  # Analyze blobs without a checkout
+    progressive: Optional[bool] = None  # Write routes, controllers and models first for a quick look
+    tenant: Optional[str] = None  # Team or customer the job is scheduled under
+    priority: JobPriority = JobPriority.NORMAL
+
+class IncrementalIngestRequest(BaseModel):
+    commit: Optional[str] = None
+    tenant: Optional[str] = None  # Default: tenant of the project's last job
+    priority: JobPriority = JobPriority.INTERACTIVE
+
+class HistoryIngestRequest(BaseModel):
+    repo_url: str
+    revs: Optional[List[str]] = None  # Commits or tags, oldest first
+    last_tags: Optional[int] = None  # Or: the most recent N tags
+    project_id: Optional[str] = None  # Extend an existing history project
+    tenant: Optional[str] = None
+    priority: JobPriority = JobPriority.BATCH
+
+class BatchRepoRequest(BaseModel):
+    repo_url: str
+    size_bytes: Optional[int] = None  # Size hint used to start large repositories first
+
+class BatchIngestRequest(BaseModel):
+    repos: List[Union[str, BatchRepoRequest]]  # Repository URLs, optionally with size hints
+    from_object_store: Optional[bool] = None
+    tenant: Optional[str] = None
+    priority: JobPriority = JobPriority.BATCH
+
+class LocalIngestRequest(BaseModel):
+    path: str  # Directory under one of LOCAL_INGEST_ROOTS
+    project_id: Optional[str] = None
+    tenant: Optional[str] = None
+    priority: JobPriority = JobPriority.NORMAL
 
 class IngestResponse(BaseModel):
     project_id: str
-    status: str
+    job_id: str
+    status: str  # queued, attached (to an identical in-flight job) or reused
+    commit: Optional[str] = None
+
+def too_busy(error: QueueFullError) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
 
 @app.on_event("startup")
 async def startup_event():
+    global graph_service
     try:
         await graph_service.initialize_schema()
         print("✅ Connected to Neo4j")
@@ -41,7 +89,6 @@ async def startup_event():
         
         # Re-initialize graph service in mock mode
         from app.services.graph_service import GraphService
-        global graph_service
         graph_service = GraphService(use_mock=True)
         await graph_service.initialize_schema()
 
@@ -50,17 +97,260 @@ def read_root():
     return {"status": "online", "system": "Eonix Static Analysis Engine"}
 
 @app.post("/api/v1/repos/ingest", response_model=IngestResponse)
-async def ingest_repository(request: IngestRequest, background_tasks: BackgroundTasks):
+async def ingest_repository(request: IngestRequest):
     """
-    Start ingestion of a git repository.
+    Queue ingestion of a git repository.
+    The job is picked up by an ingest worker (app/workers/ingest_worker.py):
     1. Clone
     2. Detect Language
     3. Extract Facts
     4. Save to Neo4j
+    
+    Requests for the same repository and commit are coalesced: they attach
+    to the job already in flight, or reuse the finished project. Returns
+    429 with Retry-After when the queue is saturated.
+    """
+    try:
+        submission = await ingest_admission.submit_ingest(
+            request.repo_url,
+            tenant=request.tenant,
+            priority=request.priority,
+            from_object_store=request.from_object_store,
+            progressive=request.progressive,
+        )
+    except QueueFullError as e:
+        raise too_busy(e)
+    job = submission.job
+    return {
+        "project_id": job.project_id,
+        "job_id": job.id,
+        "status": submission.outcome,
+        "commit": submission.commit,
+    }
+
+@app.post("/api/v1/repos/batch")
+async def ingest_batch(request: BatchIngestRequest):
+    """
+    Queue ingestion of many repositories (e.g. a whole organization) in one call.
+    Returns a batch ID and each repository's project and job. Every
+    repository is coalesced and reused like /api/v1/repos/ingest; new jobs
+    are queued largest first. Follow progress at /api/v1/batches/{batch_id}.
+    """
+    repos = [
+        BatchRepo(repo) if isinstance(repo, str) else BatchRepo(repo.repo_url, repo.size_bytes)
+        for repo in request.repos
+    ]
+    if not repos:
+        raise HTTPException(status_code=422, detail="No repositories given")
+    try:
+        submitted = await ingest_admission.submit_batch(
+            repos,
+            tenant=request.tenant,
+            priority=request.priority,
+            from_object_store=request.from_object_store,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except QueueFullError as e:
+        raise too_busy(e)
+    return {
+        "batch_id": submitted.batch.id,
+        "repos": [
+            {
+                "repo_url": item["repo_url"],
+                "project_id": item["project_id"],
+                "job_id": item["job_id"],
+                "status": item["outcome"],
+                "commit": item["commit"],
+            }
+            for item in submitted.batch.items
+        ],
+    }
+
+@app.get("/api/v1/batches/{batch_id}")
+def get_batch_status(batch_id: str):
+    """Get progress of a batch: job counts, files extracted and per-repository status"""
+    status = job_queue.batch_status(batch_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return status
+
+@app.post("/api/v1/repos/upload")
+async def upload_repository(
+    request: Request,
+    project_id: Optional[str] = None,
+    strip_components: int = 0,
+    tenant: Optional[str] = None,
+    priority: JobPriority = JobPriority.NORMAL
+):
+    """
+    Ingest a source archive (.tar.gz, .tar, .zip) sent as the request body,
+    raw or as the file field of a multipart form.
+    Members are extracted as they arrive and the archive is never written
+    to disk; the stream cannot outlive the request, so this API process
+    ingests it and the response is the result. With
+    UPLOAD_STAGE_FOR_WORKERS, the compressed archive is staged instead and
+    queued for a worker like any other job (an IngestResponse is returned;
+    identical archives share one job). Returns 429 with Retry-After when
+    the queue is saturated or too many uploads are in progress.
     """
-    project_id = str(uuid.uuid4())
-    background_tasks.add_task(process_repository, project_id, request.repo_url)
-    return {"project_id": project_id, "status": "processing_started"}
+    chunks = request.stream()
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        chunks = multipart_file_chunks(chunks, content_type)
+    try:
+        if not settings.UPLOAD_STAGE_FOR_WORKERS:
+            async with ingest_admission.upload_slot(tenant):
+                return await ingestion_service.ingest_archive(
+                    chunks,
+                    project_id=project_id,
+                    strip_components=strip_components,
+                    graph=graph_service,
+                )
+        submission = await ingest_admission.submit_archive(
+            chunks,
+            project_id=project_id,
+            strip_components=strip_components,
+            tenant=tenant,
+            priority=priority,
+        )
+    except ArchiveError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueueFullError as e:
+        raise too_busy(e)
+    return {
+        "project_id": submission.job.project_id,
+        "job_id": submission.job.id,
+        "status": submission.outcome,
+    }
+
+@app.post("/api/v1/repos/local", response_model=IngestResponse)
+def ingest_local_repository(request: LocalIngestRequest):
+    """
+    Queue an in-place ingest of a repository that is already mounted.
+    Nothing is cloned or copied; the path must lie under LOCAL_INGEST_ROOTS.
+    """
+    try:
+        submission = ingest_admission.submit_local(
+            request.path,
+            project_id=request.project_id,
+            tenant=request.tenant,
+            priority=request.priority,
+        )
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except QueueFullError as e:
+        raise too_busy(e)
+    return {
+        "project_id": submission.job.project_id,
+        "job_id": submission.job.id,
+        "status": submission.outcome,
+    }
+
+@app.post("/api/v1/repos/{project_id}/ingest", response_model=IngestResponse)
+def reingest_repository(project_id: str, request: IncrementalIngestRequest):
+    """
+    Queue an incremental re-ingest of an existing project.
+    Only files changed since the last ingested commit are re-extracted;
+    nodes of deleted files are removed from the graph.
+    """
+    state = project_store.get(project_id)
+    if state is None or not state.last_commit:
+        raise HTTPException(status_code=404, detail="Project has not been ingested yet")
+    
+    tenant = request.tenant
+    if tenant is None:
+        previous = job_queue.latest_for_project(project_id)
+        tenant = previous.tenant if previous else None
+    
+    try:
+        submission = ingest_admission.submit_incremental(
+            project_id, request.commit, tenant=tenant, priority=request.priority
+        )
+    except QueueFullError as e:
+        raise too_busy(e)
+    return {
+        "project_id": project_id,
+        "job_id": submission.job.id,
+        "status": submission.outcome,
+        "commit": request.commit,
+    }
+
+@app.get("/api/v1/repos/{project_id}/workspaces")
+def get_workspaces(project_id: str):
+    """List a monorepo project's workspaces and the commit each was last ingested at"""
+    return [
+        {"workspace": workspace, "commit": commit}
+        for workspace, commit in sorted(project_store.workspaces(project_id).items())
+    ]
+
+@app.post("/api/v1/repos/{project_id}/workspaces/{workspace:path}/ingest", response_model=IngestResponse)
+def reingest_workspace(project_id: str, workspace: str, request: IncrementalIngestRequest):
+    """
+    Queue a re-ingest of one monorepo workspace (e.g. packages/api).
+    Only that workspace's nodes are replaced; other workspaces are untouched.
+    """
+    if workspace not in project_store.workspaces(project_id):
+        raise HTTPException(status_code=404, detail="Unknown workspace")
+    
+    tenant = request.tenant
+    if tenant is None:
+        previous = job_queue.latest_for_project(project_id)
+        tenant = previous.tenant if previous else None
+    
+    try:
+        submission = ingest_admission.submit_workspace(
+            project_id, workspace, request.commit, tenant=tenant, priority=request.priority
+        )
+    except QueueFullError as e:
+        raise too_busy(e)
+    return {
+        "project_id": project_id,
+        "job_id": submission.job.id,
+        "status": submission.outcome,
+        "commit": request.commit,
+    }
+
+@app.post("/api/v1/repos/history", response_model=IngestResponse)
+def ingest_history(request: HistoryIngestRequest):
+    """
+    Queue architecture snapshots of several commits of a repository.
+    Each unique file version is extracted once and shared by every
+    snapshot that contains it.
+    """
+    if not request.revs and not request.last_tags:
+        raise HTTPException(status_code=422, detail="Give revs or last_tags")
+    try:
+        submission = ingest_admission.submit_history(
+            request.repo_url,
+            revs=request.revs,
+            last_tags=request.last_tags,
+            project_id=request.project_id,
+            tenant=request.tenant,
+            priority=request.priority,
+        )
+    except QueueFullError as e:
+        raise too_busy(e)
+    return {
+        "project_id": submission.job.project_id,
+        "job_id": submission.job.id,
+        "status": submission.outcome,
+    }
+
+@app.get("/api/v1/repos/{project_id}/history")
+def get_history(project_id: str):
+    """List the snapshots of a history project"""
+    return [s.to_dict() for s in history_store.snapshots(project_id)]
+
+@app.get("/api/v1/repos/{project_id}/history/{commit}")
+async def get_history_snapshot(project_id: str, commit: str):
+    """Get the nodes of one snapshot (by commit SHA or ref)"""
+    try:
+        return await history_service.snapshot_graph(project_id, commit, graph_service)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 @app.get("/api/v1/repos/{project_id}/graph")
 async def get_project_graph(project_id: str):
@@ -76,61 +366,57 @@ async def get_project_stats(project_id: str):
     """Get project statistics"""
     return await graph_service.get_project_statistics(project_id)
 
-async def process_repository(project_id: str, repo_url: str):
-    """Background task to process the repository"""
-    print(f"🚀 Starting processing for {project_id}...")
-    
-    # 1. Clone (Mocked for now or using ingestion service)
-    # real implementation would store in configured path
-    repo_path = f"/tmp/eonix_repos/{project_id}"
+@app.get("/api/v1/jobs/{job_id}")
+def get_job_status(job_id: str):
+    """Get status and progress of an ingestion job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.get("/api/v1/repos/{project_id}/status")
+def get_project_status(project_id: str):
+    """Get status and progress of the latest ingestion job for a project"""
+    job = job_queue.latest_for_project(project_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No jobs for project")
+    return job.to_dict()
+
+@app.get("/api/v1/repos/{project_id}/events")
+async def stream_project_events(project_id: str):
+    """
+    Server-Sent Events stream of the latest job's progress.
+    Emits a `progress` event whenever the job changes and a final `done`
+    event once it succeeds or fails. The queue is polled on a thread so a
+    writer holding the database lock does not stall the event loop.
+    """
+    if await asyncio.to_thread(job_queue.latest_for_project, project_id) is None:
+        raise HTTPException(status_code=404, detail="No jobs for project")
     
-    try:
-        if os.path.exists(repo_path):
-            shutil.rmtree(repo_path)
-        
-        # In a real scenario, use ingestion_service.clone_repo(repo_url)
-        # For now, we assume local path or use simple git clone
-        print(f"   Cloning {repo_url}...")
-        os.system(f"git clone {repo_url} {repo_path}")
-        
-        # 2. Detect
-        print("   Detecting language...")
-        detector = LanguageDetector(repo_path)
-        detection = detector.detect()
-        
-        # 3. Scan & Extract
-        print("   Scanning & Extracting...")
-        scanner = RepositoryScanner()
-        files = scanner.scan(repo_path)
-        
-        all_nodes = []
-        all_edges = []
-        
-        for file in files:
-            res = extraction_manager.extract_file(file.path)
-            # Add project_id to nodes for filtering
-            for node in res.nodes:
-                if not hasattr(node, 'project_id'):
-                    # Hack: dynamically add attribute if model allows extras
-                    # Ideally, ExtractionResult should carry context
-                    pass 
-            all_nodes.extend(res.nodes)
-            all_edges.extend(res.edges)
+    async def events():
+        last_sent = None
+        last_write = time.monotonic()
+        while True:
+            job = await asyncio.to_thread(job_queue.latest_for_project, project_id)
+            payload = job.to_dict()
+            snapshot = (payload["status"], json.dumps(payload["progress"], sort_keys=True))
             
-        # 4. Save
-        print("   Saving to Graph...")
-        result = ExtractionResult(
-            nodes=all_nodes, 
-            edges=all_edges, 
-            confidence="HIGH"
-        )
-        await graph_service.save_extraction_result(project_id, result)
-        
-        print(f"✅ Processing complete for {project_id}")
-        
-    except Exception as e:
-        print(f"❌ Processing failed: {e}")
-    finally:
-        # Cleanup if configured
-        # shutil.rmtree(repo_path)
-        pass
+            if snapshot != last_sent:
+                last_sent = snapshot
+                last_write = time.monotonic()
+                event = "done" if job.is_finished else "progress"
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+                if job.is_finished:
+                    return
+            elif time.monotonic() - last_write > settings.SSE_KEEPALIVE_SECONDS:
+                # Comment line keeps proxies from closing an idle stream
+                last_write = time.monotonic()
+                yield ": keep-alive\n\n"
+            
+            await asyncio.sleep(settings.SSE_POLL_INTERVAL)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -41,6 +41,7 @@ class UASNode(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
     confidence: ConfidenceLevel = ConfidenceLevel.HIGH
     extraction_method: str = "ast"  # "ast", "tree-sitter", "regex"
+    workspace: Optional[str] = None  # Monorepo workspace the file belongs to
 
 
 class Parameter(BaseModel):
@@ -169,3 +170,87 @@ class ExtractionResult(BaseModel):
     class Config:
         # Allow subclass instances in lists
         arbitrary_types_allowed = True
+
+    def to_json(self) -> str:
+        """
+        Serialize to JSON, recording each node/edge class so that
+        from_json() restores the exact subclasses.
+        """
+        import json
+        return json.dumps({
+            "nodes": [
+                {"cls": type(n).__name__, "data": n.model_dump(mode="json")}
+                for n in self.nodes
+            ],
+            "edges": [
+                {"cls": type(e).__name__, "data": e.model_dump(mode="json")}
+                for e in self.edges
+            ],
+            "confidence": self.confidence.value if isinstance(self.confidence, Enum) else self.confidence,
+            "errors": self.errors,
+            "warnings": self.warnings,
+        })
+
+    @classmethod
+    def from_json(cls, raw: str) -> "ExtractionResult":
+        """Inverse of to_json()"""
+        import json
+        data = json.loads(raw)
+        return cls(
+            nodes=[NODE_CLASSES[n["cls"]](**n["data"]) for n in data["nodes"]],
+            edges=[EDGE_CLASSES[e["cls"]](**e["data"]) for e in data["edges"]],
+            confidence=data["confidence"],
+            errors=data["errors"],
+            warnings=data["warnings"],
+        )
+
+    def retarget(self, old_path: str, new_path: str) -> "ExtractionResult":
+        """
+        Copy of this result as if it had been extracted from new_path.
+
+        Node IDs embed the file path, so IDs and edge endpoints starting
+        with old_path are rewritten along with each node's file_path.
+        """
+        def move(value: str) -> str:
+            if value == old_path or value.startswith(old_path + ":"):
+                return new_path + value[len(old_path):]
+            return value
+
+        return ExtractionResult(
+            nodes=[
+                n.model_copy(update={
+                    "id": move(n.id),
+                    "file_path": new_path if n.file_path == old_path else n.file_path,
+                })
+                for n in self.nodes
+            ],
+            edges=[
+                e.model_copy(update={
+                    "source_id": move(e.source_id),
+                    "target_id": move(e.target_id),
+                })
+                for e in self.edges
+            ],
+            confidence=self.confidence,
+            errors=list(self.errors),
+            warnings=list(self.warnings),
+        )
+
+
+# Class registries used to deserialize cached results
+NODE_CLASSES = {
+    cls.__name__: cls
+    for cls in (
+        UASNode, ServiceNode, EndpointNode, DatabaseModelNode, CacheNode,
+        EventNode, ExternalAPINode, ConfigNode,
+    )
+}
+
+EDGE_CLASSES = {
+    cls.__name__: cls
+    for cls in (
+        DependencyEdge, ServiceCallEdge, OwnershipEdge, CacheEdge,
+        EventEmitEdge, EventConsumeEdge,
+    )
+}
+
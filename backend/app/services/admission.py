@@ -0,0 +1,452 @@
+"""
+Admission control and single-flight deduplication of ingest requests.
+Requests are keyed by (tenant, repository, resolved commit): identical
+requests attach to the job already in flight, finished results for the
+same commit are reused, and new work is refused with a retry hint once
+the queue is saturated. Batches of repositories are admitted as a unit.
+"""
+
+import asyncio
+import subprocess
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.archive import remove_staged, stage_archive
+from app.services.job_queue import Batch, Job, JobQueue, QueueFullError, job_queue
+from app.services.project_store import ProjectStore, project_store
+from app.services.repo_store import (
+    GitCommandError, RepositoryStore, normalize_repo_url, repo_store, resolve_local_path,
+    resolve_remote_commit
+)
+from app.services.scheduler import DEFAULT_TENANT, JobPriority
+
+
+@dataclass
+class Submission:
+    """Outcome of submitting an ingest request"""
+    job: Job
+    outcome: str  # "queued", "attached" (to an in-flight job) or "reused" (finished job)
+    commit: Optional[str] = None
+
+
+@dataclass
+class BatchRepo:
+    """One repository of a batch request"""
+    repo_url: str
+    size_hint: Optional[int] = None  # Bytes, e.g. from the hosting provider's repo listing
+
+
+@dataclass
+class BatchSubmission:
+    """Outcome of submitting a batch of ingest requests"""
+    batch: Batch
+    submissions: List[Submission]  # In request order
+
+
+class CommitResolver:
+    """
+    Resolves remote refs to commits with a short-lived cache, so bursts of
+    identical requests cost one `git ls-remote`.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            ttl_seconds: How long a resolution is reused (default: settings.COMMIT_RESOLVE_TTL_SECONDS)
+        """
+        self.ttl_seconds = settings.COMMIT_RESOLVE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._cache: Dict[Tuple[str, str], Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, repo_url: str, rev: str = "HEAD") -> Optional[str]:
+        """Commit SHA of rev, or None if the remote cannot be queried"""
+        key = (normalize_repo_url(repo_url), rev)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and now - cached[0] < self.ttl_seconds:
+                return cached[1]
+
+        try:
+            commit = resolve_remote_commit(repo_url, rev)
+        except (GitCommandError, subprocess.TimeoutExpired) as e:
+            print(f"⚠️  Cannot resolve {rev} of {repo_url}: {e}")
+            return None
+
+        with self._lock:
+            self._cache[key] = (now, commit)
+        return commit
+
+
+def ingest_dedup_key(tenant: str, repo_url: str, commit: Optional[str]) -> str:
+    """Identity of a full ingest; unresolved commits only coalesce in-flight jobs"""
+    return f"{tenant}|ingest|{normalize_repo_url(repo_url)}@{commit or 'unresolved'}"
+
+
+class IngestAdmission:
+    """Front door for ingest requests"""
+
+    def __init__(
+        self,
+        queue: Optional[JobQueue] = None,
+        projects: Optional[ProjectStore] = None,
+        resolver: Optional[CommitResolver] = None,
+        repos: Optional[RepositoryStore] = None
+    ):
+        """
+        Args:
+            queue: Job queue (default: shared job_queue)
+            projects: Project state (default: shared project_store)
+            resolver: Remote ref resolver
+            repos: Mirror cache used to estimate repository sizes (default: shared repo_store)
+        """
+        self.queue = queue or job_queue
+        self.projects = projects or project_store
+        self.resolver = resolver or CommitResolver()
+        self.repos = repos or repo_store
+        self._uploads = 0  # Uploads in progress in this process
+
+    def _reusable(self, dedup_key: str, commit: Optional[str]) -> Optional[Job]:
+        """Finished job whose project still holds the requested commit"""
+        if not commit:
+            return None
+        finished = self.queue.latest_succeeded(dedup_key)
+        if finished is None:
+            return None
+        state = self.projects.get(finished.project_id)
+        if state is None or state.last_commit != commit:
+            return None
+        return finished
+
+    async def submit_ingest(
+        self,
+        repo_url: str,
+        tenant: Optional[str] = None,
+        priority: JobPriority = JobPriority.NORMAL,
+        from_object_store: Optional[bool] = None,
+        progressive: Optional[bool] = None
+    ) -> Submission:
+        """
+        Submit a full ingest of a repository's HEAD.
+
+        A progressive job writes high-value files (routes, models) first;
+        it still coalesces with other jobs for the same commit.
+
+        Raises:
+            QueueFullError: The request needs a new job and the queue is saturated
+        """
+        tenant = tenant or DEFAULT_TENANT
+        commit = await asyncio.to_thread(self.resolver.resolve, repo_url)
+        dedup_key = ingest_dedup_key(tenant, repo_url, commit)
+
+        finished = await asyncio.to_thread(self._reusable, dedup_key, commit)
+        if finished is not None:
+            return Submission(finished, "reused", commit)
+
+        job, created = await asyncio.to_thread(
+            self.queue.enqueue_or_attach,
+            "ingest",
+            str(uuid.uuid4()),
+            {
+                "repo_url": repo_url,
+                "commit": commit,
+                "from_object_store": from_object_store,
+                "progressive": progressive,
+            },
+            dedup_key,
+            tenant=tenant,
+            priority=priority,
+        )
+        return Submission(job, "queued" if created else "attached", commit)
+
+    async def submit_batch(
+        self,
+        repos: List[BatchRepo],
+        tenant: Optional[str] = None,
+        priority: JobPriority = JobPriority.BATCH,
+        from_object_store: Optional[bool] = None
+    ) -> BatchSubmission:
+        """
+        Submit full ingests of many repositories under one batch ID.
+
+        Each repository is deduplicated and reused like submit_ingest. The
+        new jobs are queued largest first (by size hint, else by the size of
+        an already cached mirror, with unknown sizes last), so the longest
+        ingests start early and the tail of the batch is made of small ones.
+
+        Raises:
+            ValueError: More than BATCH_MAX_REPOS repositories
+            QueueFullError: The batch needs new jobs and the queue is saturated
+        """
+        tenant = tenant or DEFAULT_TENANT
+        if len(repos) > settings.BATCH_MAX_REPOS:
+            raise ValueError(f"At most {settings.BATCH_MAX_REPOS} repositories per batch")
+        # A repository listed twice is one item
+        unique: Dict[str, BatchRepo] = {}
+        for repo in repos:
+            unique.setdefault(normalize_repo_url(repo.repo_url), repo)
+        repos = list(unique.values())
+
+        limit = asyncio.Semaphore(max(settings.BATCH_RESOLVE_CONCURRENCY, 1))
+
+        async def inspect(repo: BatchRepo) -> Tuple[Optional[str], Optional[int]]:
+            async with limit:
+                commit = await asyncio.to_thread(self.resolver.resolve, repo.repo_url)
+                size = repo.size_hint
+                if size is None:
+                    size = await asyncio.to_thread(self.repos.mirror_size, repo.repo_url)
+                return commit, size
+
+        inspected = await asyncio.gather(*[inspect(repo) for repo in repos])
+        dedup_keys = [
+            ingest_dedup_key(tenant, repo.repo_url, commit)
+            for repo, (commit, _) in zip(repos, inspected)
+        ]
+        reusable = await asyncio.to_thread(
+            lambda: [
+                self._reusable(dedup_key, commit)
+                for dedup_key, (commit, _) in zip(dedup_keys, inspected)
+            ]
+        )
+
+        submissions: Dict[str, Submission] = {}
+        sizes: Dict[str, Optional[int]] = {}
+        pending = []
+        for repo, (commit, size), dedup_key, finished in zip(repos, inspected, dedup_keys, reusable):
+            sizes[repo.repo_url] = size
+            if finished is not None:
+                submissions[repo.repo_url] = Submission(finished, "reused", commit)
+            else:
+                pending.append((repo, commit, dedup_key, size))
+
+        pending.sort(key=lambda entry: (entry[3] is None, -(entry[3] or 0)))
+        queued = await asyncio.to_thread(
+            self.queue.enqueue_many,
+            [
+                {
+                    "kind": "ingest",
+                    "project_id": str(uuid.uuid4()),
+                    "payload": {
+                        "repo_url": repo.repo_url,
+                        "commit": commit,
+                        "from_object_store": from_object_store,
+                    },
+                    "dedup_key": dedup_key,
+                }
+                for repo, commit, dedup_key, _ in pending
+            ],
+            tenant=tenant,
+            priority=priority,
+        )
+        for (repo, commit, _, _), (job, created) in zip(pending, queued):
+            submissions[repo.repo_url] = Submission(job, "queued" if created else "attached", commit)
+
+        ordered = [submissions[repo.repo_url] for repo in repos]
+        batch = Batch(
+            id=str(uuid.uuid4()),
+            tenant=tenant,
+            items=[
+                {
+                    "repo_url": repo.repo_url,
+                    "project_id": submission.job.project_id,
+                    "job_id": submission.job.id,
+                    "outcome": submission.outcome,
+                    "commit": submission.commit,
+                    "size_estimate": sizes[repo.repo_url],
+                }
+                for repo, submission in zip(repos, ordered)
+            ],
+            created_at=time.time(),
+        )
+        await asyncio.to_thread(self.queue.save_batch, batch)
+        new_jobs = sum(1 for s in ordered if s.outcome == "queued")
+        print(f"📦 Batch {batch.id}: {len(repos)} repositories, {new_jobs} new jobs")
+        return BatchSubmission(batch, ordered)
+
+    @asynccontextmanager
+    async def upload_slot(self, tenant: Optional[str] = None):
+        """
+        Hold one of this process's UPLOAD_MAX_CONCURRENT upload slots while
+        an upload is read, before its body is consumed.
+
+        Raises:
+            QueueFullError: All slots are taken, or the queue is saturated
+        """
+        if self._uploads >= max(settings.UPLOAD_MAX_CONCURRENT, 1):
+            raise QueueFullError("Too many uploads in progress", settings.INGEST_RETRY_AFTER_SECONDS)
+        self._uploads += 1
+        try:
+            await asyncio.to_thread(self.queue.check_admission, tenant or DEFAULT_TENANT)
+            yield
+        finally:
+            self._uploads -= 1
+
+    async def submit_archive(
+        self,
+        chunks: AsyncIterable[bytes],
+        project_id: Optional[str] = None,
+        strip_components: int = 0,
+        tenant: Optional[str] = None,
+        priority: JobPriority = JobPriority.NORMAL
+    ) -> Submission:
+        """
+        Stage an uploaded archive and submit its ingest as a job.
+
+        Used when UPLOAD_STAGE_FOR_WORKERS is set: the whole compressed
+        archive is written under UPLOAD_STAGING_PATH, which the workers
+        must share. The upload is refused before its body is read when the
+        queue is saturated or UPLOAD_MAX_CONCURRENT uploads are in
+        progress. Identical archives (by content) share one job and reuse
+        its finished project; the redundant staged copy is dropped.
+
+        Raises:
+            ArchiveError: The upload is larger than UPLOAD_MAX_BYTES
+            QueueFullError: Too many uploads in progress, or the queue is saturated
+        """
+        tenant = tenant or DEFAULT_TENANT
+        async with self.upload_slot(tenant):
+            path, digest = await stage_archive(chunks)
+
+        dedup_key = (
+            f"{tenant}|ingest_archive|{digest}|strip-{strip_components}|{project_id or 'new'}"
+        )
+        finished = await asyncio.to_thread(self.queue.latest_succeeded, dedup_key)
+        if finished is not None and \
+                await asyncio.to_thread(self.projects.get, finished.project_id) is not None:
+            remove_staged(path)
+            return Submission(finished, "reused")
+
+        try:
+            job, created = await asyncio.to_thread(
+                self.queue.enqueue_or_attach,
+                "ingest_archive",
+                project_id or str(uuid.uuid4()),
+                {"archive_path": path, "sha256": digest, "strip_components": strip_components},
+                dedup_key,
+                tenant=tenant,
+                priority=priority,
+            )
+        except BaseException:
+            remove_staged(path)
+            raise
+        if not created:
+            remove_staged(path)
+        return Submission(job, "queued" if created else "attached")
+
+    def submit_local(
+        self,
+        path: str,
+        project_id: Optional[str] = None,
+        tenant: Optional[str] = None,
+        priority: JobPriority = JobPriority.NORMAL
+    ) -> Submission:
+        """
+        Submit an in-place ingest of a mounted directory; identical requests share one job.
+
+        Raises:
+            PermissionError: The path is outside LOCAL_INGEST_ROOTS
+            FileNotFoundError: The path is not a directory
+            QueueFullError: The request needs a new job and the queue is saturated
+        """
+        tenant = tenant or DEFAULT_TENANT
+        path = resolve_local_path(path)
+        dedup_key = f"{tenant}|ingest_local|{path}|{project_id or 'new'}"
+        job, created = self.queue.enqueue_or_attach(
+            "ingest_local",
+            project_id or str(uuid.uuid4()),
+            {"path": path},
+            dedup_key,
+            tenant=tenant,
+            priority=priority,
+        )
+        return Submission(job, "queued" if created else "attached")
+
+    def submit_incremental(
+        self,
+        project_id: str,
+        commit: Optional[str] = None,
+        tenant: Optional[str] = None,
+        priority: JobPriority = JobPriority.INTERACTIVE
+    ) -> Submission:
+        """
+        Submit an incremental re-ingest; identical requests share one job.
+
+        Raises:
+            QueueFullError: The request needs a new job and the queue is saturated
+        """
+        tenant = tenant or DEFAULT_TENANT
+        dedup_key = f"{tenant}|ingest_incremental|{project_id}@{commit or 'HEAD'}"
+        job, created = self.queue.enqueue_or_attach(
+            "ingest_incremental",
+            project_id,
+            {"commit": commit},
+            dedup_key,
+            tenant=tenant,
+            priority=priority,
+        )
+        return Submission(job, "queued" if created else "attached", commit)
+
+    def submit_workspace(
+        self,
+        project_id: str,
+        workspace: str,
+        commit: Optional[str] = None,
+        tenant: Optional[str] = None,
+        priority: JobPriority = JobPriority.INTERACTIVE
+    ) -> Submission:
+        """
+        Submit a re-ingest of one monorepo workspace; identical requests share one job.
+
+        Raises:
+            QueueFullError: The request needs a new job and the queue is saturated
+        """
+        tenant = tenant or DEFAULT_TENANT
+        dedup_key = f"{tenant}|ingest_workspace|{project_id}#{workspace}@{commit or 'HEAD'}"
+        job, created = self.queue.enqueue_or_attach(
+            "ingest_workspace",
+            project_id,
+            {"workspace": workspace, "commit": commit},
+            dedup_key,
+            tenant=tenant,
+            priority=priority,
+        )
+        return Submission(job, "queued" if created else "attached", commit)
+
+    def submit_history(
+        self,
+        repo_url: str,
+        revs: Optional[List[str]] = None,
+        last_tags: Optional[int] = None,
+        project_id: Optional[str] = None,
+        tenant: Optional[str] = None,
+        priority: JobPriority = JobPriority.BATCH
+    ) -> Submission:
+        """
+        Submit a multi-commit history analysis; identical requests share one job.
+
+        Raises:
+            QueueFullError: The request needs a new job and the queue is saturated
+        """
+        tenant = tenant or DEFAULT_TENANT
+        target = ",".join(revs) if revs else f"last-{last_tags}-tags"
+        dedup_key = (
+            f"{tenant}|ingest_history|{normalize_repo_url(repo_url)}@{target}"
+            f"|{project_id or 'new'}"
+        )
+        job, created = self.queue.enqueue_or_attach(
+            "ingest_history",
+            project_id or str(uuid.uuid4()),
+            {"repo_url": repo_url, "revs": revs, "last_tags": last_tags},
+            dedup_key,
+            tenant=tenant,
+            priority=priority,
+        )
+        return Submission(job, "queued" if created else "attached")
+
+
+ingest_admission = IngestAdmission()
@@ -0,0 +1,592 @@
+"""
+Streaming reader for uploaded source archives.
+Tar (plain, gzip, bzip2 or xz) and zip archives are parsed member by
+member from a byte stream: members the scanner skips are read past, the
+rest are handed to the pipeline in memory, so an archive is never
+unpacked on disk. The API stages the compressed upload as one file for
+the ingest worker (stage_archive) and the worker streams it back in
+(staged_chunks).
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import posixpath
+import struct
+import tarfile
+import uuid
+import zlib
+from dataclasses import dataclass
+from typing import AsyncIterable, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.git_objects import TreeEntry
+from app.services.pipeline import iterate_in_thread
+
+
+class ArchiveError(ValueError):
+    """Raised for an unreadable, unsupported or oversized archive"""
+
+
+@dataclass
+class ArchiveMember:
+    """A regular file of an archive"""
+    path: str  # '/'-separated, with leading components stripped
+    size_bytes: int
+    content: Optional[bytes] = None  # None when the member was read past
+
+
+def member_path(name: str, strip_components: int = 0) -> Optional[str]:
+    """
+    Safe '/'-separated path of an archive member.
+
+    Returns:
+        None for absolute paths, paths escaping the root with '..', and
+        paths with nothing left after stripping
+    """
+    name = name.replace("\\", "/")
+    if name.startswith("/"):
+        return None
+    parts = [p for p in posixpath.normpath(name).split("/") if p not in ("", ".")]
+    if ".." in parts:
+        return None
+    parts = parts[strip_components:]
+    return "/".join(parts) if parts else None
+
+
+class AsyncByteStream(io.RawIOBase):
+    """
+    Blocking file object over an async iterator of byte chunks (e.g. a
+    request body), for a parser running in a worker thread. Each read pulls
+    the next chunk through the event loop, so the body is only consumed as
+    fast as the parser goes.
+    """
+
+    def __init__(
+        self,
+        chunks: AsyncIterable[bytes],
+        loop: asyncio.AbstractEventLoop,
+        max_bytes: Optional[int] = None
+    ):
+        """
+        Args:
+            chunks: Byte chunks, e.g. Request.stream()
+            loop: Event loop the chunks are iterated on
+            max_bytes: Fail once more bytes than this were read (0 = unlimited)
+        """
+        self._chunks = chunks.__aiter__()
+        self._loop = loop
+        self._buffer = memoryview(b"")
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer:
+            chunk = asyncio.run_coroutine_threadsafe(self._pull(), self._loop).result()
+            if chunk is None:
+                return 0
+            self._buffer = memoryview(chunk)
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    async def _pull(self) -> Optional[bytes]:
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+        self.bytes_read += len(chunk)
+        if self.max_bytes and self.bytes_read > self.max_bytes:
+            raise ArchiveError(f"Upload is larger than {self.max_bytes} bytes")
+        return bytes(chunk)
+
+
+class _PushbackReader:
+    """Reader that can return bytes it read too far (zip members without sizes)"""
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        self._pending = b""
+
+    def read(self, size: int) -> bytes:
+        if self._pending:
+            data, self._pending = self._pending[:size], self._pending[size:]
+            return data
+        return self._fileobj.read(size)
+
+    def read_full(self, size: int) -> bytes:
+        """Read size bytes, or fewer only at the end of the stream"""
+        data = b""
+        while len(data) < size:
+            chunk = self.read(size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    def read_exact(self, size: int) -> bytes:
+        data = self.read_full(size)
+        if len(data) < size:
+            raise ArchiveError("Truncated archive")
+        return data
+
+    def skip(self, size: int) -> None:
+        while size > 0:
+            chunk = self.read(min(size, 1024 * 1024))
+            if not chunk:
+                raise ArchiveError("Truncated archive")
+            size -= len(chunk)
+
+    def unread(self, data: bytes) -> None:
+        self._pending = data + self._pending
+
+
+_ZIP_LOCAL_SIGNATURE = b"PK\x03\x04"
+_ZIP_EMPTY_SIGNATURE = b"PK\x05\x06"
+_ZIP_DESCRIPTOR_SIGNATURE = b"PK\x07\x08"
+# Local file header after its signature
+_ZIP_LOCAL_HEADER = struct.Struct("<HHHHHIIIHH")
+_ZIP_STORED, _ZIP_DEFLATED = 0, 8
+_ZIP64_EXTRA_ID = 0x0001
+
+
+def _zip64_sizes(extra: bytes, size: int, compressed: int) -> tuple:
+    """
+    Sizes from a zip64 extra field, for the header fields set to 0xFFFFFFFF.
+
+    Returns:
+        (size, compressed size, whether the member is zip64)
+    """
+    offset = 0
+    while offset + 4 <= len(extra):
+        header_id, length = struct.unpack_from("<HH", extra, offset)
+        offset += 4
+        if header_id == _ZIP64_EXTRA_ID:
+            values = iter(struct.unpack_from(f"<{length // 8}Q", extra, offset))
+            if size == 0xFFFFFFFF:
+                size = next(values, size)
+            if compressed == 0xFFFFFFFF:
+                compressed = next(values, compressed)
+            return size, compressed, True
+        offset += length
+    return size, compressed, False
+
+
+def _inflate(
+    reader: _PushbackReader,
+    compressed: Optional[int],
+    keep: bool,
+    max_bytes: Optional[int]
+) -> Optional[bytes]:
+    """
+    Decompress one deflated zip member.
+
+    Without a known compressed size, the deflate stream's own end marks the
+    end of the member; bytes read past it are pushed back.
+    """
+    inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+    output: List[bytes] = []
+    produced = 0
+    remaining = compressed
+    while not inflater.eof:
+        want = 64 * 1024 if remaining is None else min(64 * 1024, remaining)
+        data = reader.read(want) if want else b""
+        if not data:
+            raise ArchiveError("Truncated zip member")
+        if remaining is not None:
+            remaining -= len(data)
+        try:
+            chunk = inflater.decompress(data)
+        except zlib.error as e:
+            raise ArchiveError(f"Corrupt zip member: {e}")
+        produced += len(chunk)
+        if keep and max_bytes and produced > max_bytes:
+            keep, output = False, []
+        if keep:
+            output.append(chunk)
+    if inflater.unused_data:
+        reader.unread(inflater.unused_data)
+    if remaining:
+        reader.skip(remaining)
+    return b"".join(output) if keep else None
+
+
+def _read_stored(
+    reader: _PushbackReader,
+    keep: bool,
+    max_bytes: Optional[int],
+    zip64: bool
+) -> Optional[bytes]:
+    """
+    Read one stored zip member whose size only follows it, in its data descriptor.
+
+    The member ends at the first descriptor signature followed by the CRC
+    and size of the bytes before it, so content that merely contains the
+    signature is not mistaken for the end. The descriptor is consumed.
+    """
+    descriptor = struct.Struct("<IQQ" if zip64 else "<III")
+    output = bytearray()
+    crc = size = 0
+    pending = b""  # Read, but not yet known to be member content
+    while True:
+        index = pending.find(_ZIP_DESCRIPTOR_SIGNATURE)
+        while index != -1 and len(pending) >= index + 4 + descriptor.size:
+            crc_field, compressed, _ = descriptor.unpack_from(pending, index + 4)
+            if compressed == size + index and crc_field == zlib.crc32(pending[:index], crc):
+                if keep:
+                    output += pending[:index]
+                reader.unread(pending[index + 4 + descriptor.size:])
+                return bytes(output) if keep and not (max_bytes and len(output) > max_bytes) else None
+            index = pending.find(_ZIP_DESCRIPTOR_SIGNATURE, index + 1)
+        # Everything before a possible (partial) descriptor is content
+        cut = index if index != -1 else max(len(pending) - len(_ZIP_DESCRIPTOR_SIGNATURE) + 1, 0)
+        crc = zlib.crc32(pending[:cut], crc)
+        size += cut
+        if keep:
+            output += pending[:cut]
+            if max_bytes and len(output) > max_bytes:
+                keep, output = False, bytearray()
+        pending = pending[cut:]
+        chunk = reader.read(64 * 1024)
+        if not chunk:
+            raise ArchiveError("Truncated zip member")
+        pending += chunk
+
+
+def _iter_zip(
+    reader: _PushbackReader,
+    accept: Callable[[str], bool],
+    strip_components: int,
+    max_member_bytes: Optional[int]
+) -> Iterator[ArchiveMember]:
+    """
+    Read a zip archive front to back through its local file headers.
+
+    The central directory at the end is never needed, so no seeking is
+    required. Members written with a trailing data descriptor (sizes
+    unknown up front, as streaming zip writers do) are supported too.
+    """
+    while True:
+        if reader.read_full(4) != _ZIP_LOCAL_SIGNATURE:
+            # Central directory: every member has been read
+            return
+        (_, flags, method, _, _, _, compressed, size,
+         name_length, extra_length) = _ZIP_LOCAL_HEADER.unpack(reader.read_exact(_ZIP_LOCAL_HEADER.size))
+        raw_name = reader.read_exact(name_length)
+        extra = reader.read_exact(extra_length)
+        size, compressed, zip64 = _zip64_sizes(extra, size, compressed)
+        if flags & 0x1:
+            raise ArchiveError("Encrypted zip archives are not supported")
+        has_descriptor = bool(flags & 0x8)
+        if method not in (_ZIP_STORED, _ZIP_DEFLATED) and has_descriptor:
+            raise ArchiveError(f"Unsupported zip compression method {method}")
+
+        name = raw_name.decode("utf-8" if flags & 0x800 else "cp437")
+        path = None if name.endswith("/") else member_path(name, strip_components)
+        keep = path is not None and accept(path)
+        if keep and not has_descriptor and max_member_bytes and size > max_member_bytes:
+            keep = False
+
+        if method == _ZIP_DEFLATED:
+            content = _inflate(reader, None if has_descriptor else compressed, keep, max_member_bytes)
+        elif method == _ZIP_STORED and has_descriptor:
+            content = _read_stored(reader, keep, max_member_bytes, zip64)
+            has_descriptor = False  # Consumed while looking for the end
+        elif method == _ZIP_STORED and keep:
+            content = reader.read_exact(compressed)
+        else:
+            if method != _ZIP_STORED:
+                print(f"⚠️  Skipping {name}: unsupported zip compression method {method}")
+            reader.skip(compressed)
+            content = None
+
+        if has_descriptor:
+            head = reader.read_exact(4)
+            if head != _ZIP_DESCRIPTOR_SIGNATURE:
+                reader.unread(head)
+            # CRC-32, then compressed and uncompressed sizes
+            reader.skip(4 + (16 if zip64 else 8))
+        if path is not None:
+            yield ArchiveMember(path, len(content) if content is not None else size, content)
+
+
+def _iter_tar(
+    reader: _PushbackReader,
+    accept: Callable[[str], bool],
+    strip_components: int,
+    max_member_bytes: Optional[int]
+) -> Iterator[ArchiveMember]:
+    """Read a (compressed) tar archive in stream mode"""
+    try:
+        with tarfile.open(fileobj=reader, mode="r|*") as tar:
+            for info in tar:
+                if not info.isfile():
+                    continue
+                path = member_path(info.name, strip_components)
+                if path is None:
+                    continue
+                content = None
+                if accept(path) and not (max_member_bytes and info.size > max_member_bytes):
+                    content = tar.extractfile(info).read()
+                yield ArchiveMember(path, info.size, content)
+    except tarfile.TarError as e:
+        raise ArchiveError(f"Unreadable tar archive: {e}")
+
+
+def iter_archive(
+    fileobj,
+    accept: Callable[[str], bool],
+    strip_components: int = 0,
+    max_member_bytes: Optional[int] = None
+) -> Iterator[ArchiveMember]:
+    """
+    Read the regular files of a tar or zip archive in order, without seeking.
+
+    The format is sniffed from the first bytes.
+
+    Args:
+        fileobj: Readable binary stream
+        accept: Whether a member's content is needed (others are read past)
+        strip_components: Leading path components to drop, like tar --strip-components
+        max_member_bytes: Larger members are read past (default: settings.UPLOAD_MAX_MEMBER_BYTES)
+
+    Yields:
+        ArchiveMember per regular file, with content when accepted
+    """
+    if max_member_bytes is None:
+        max_member_bytes = settings.UPLOAD_MAX_MEMBER_BYTES
+    reader = _PushbackReader(fileobj)
+    head = reader.read_full(4)
+    reader.unread(head)
+    if head == _ZIP_EMPTY_SIGNATURE:
+        return iter(())
+    if head == _ZIP_LOCAL_SIGNATURE:
+        return _iter_zip(reader, accept, strip_components, max_member_bytes)
+    return _iter_tar(reader, accept, strip_components, max_member_bytes)
+
+
+async def read_members(
+    chunks: AsyncIterable[bytes],
+    accept: Callable[[str], bool],
+    strip_components: int = 0,
+    max_bytes: Optional[int] = None
+) -> AsyncIterator[ArchiveMember]:
+    """
+    Parse an archive arriving as byte chunks, yielding members as they complete.
+
+    Parsing runs on a thread that pulls chunks on demand; at most
+    UPLOAD_BUFFER_MEMBERS parsed members wait for the consumer, so a slow
+    consumer slows the upload instead of buffering it.
+
+    Args:
+        chunks: Archive bytes, e.g. Request.stream()
+        accept: Whether a member's content is needed
+        strip_components: Leading path components to drop
+        max_bytes: Upload size limit (default: settings.UPLOAD_MAX_BYTES)
+
+    Raises:
+        ArchiveError: The archive is unreadable, unsupported or too large
+    """
+    stream = AsyncByteStream(
+        chunks, asyncio.get_running_loop(),
+        settings.UPLOAD_MAX_BYTES if max_bytes is None else max_bytes
+    )
+
+    def members() -> Iterator[ArchiveMember]:
+        # iter_archive reads the header, so even that must run on the reader thread
+        yield from iter_archive(stream, accept, strip_components)
+
+    async for member in iterate_in_thread(members(), settings.UPLOAD_BUFFER_MEMBERS, "archive-reader"):
+        yield member
+    print(f"📦 Read {stream.bytes_read} archive bytes")
+
+
+async def stage_archive(
+    chunks: AsyncIterable[bytes],
+    directory: Optional[str] = None,
+    max_bytes: Optional[int] = None
+) -> Tuple[str, str]:
+    """
+    Write an upload to a staging file for an ingest job.
+
+    Args:
+        chunks: Archive bytes, e.g. Request.stream()
+        directory: Staging directory shared with the ingest workers
+            (default: settings.UPLOAD_STAGING_PATH)
+        max_bytes: Upload size limit (default: settings.UPLOAD_MAX_BYTES, 0 = unlimited)
+
+    Returns:
+        (path of the staged file, SHA-256 of its content)
+
+    Raises:
+        ArchiveError: The upload is larger than max_bytes
+    """
+    directory = directory or settings.UPLOAD_STAGING_PATH
+    max_bytes = settings.UPLOAD_MAX_BYTES if max_bytes is None else max_bytes
+    os.makedirs(directory, exist_ok=True)
+    # A unique name per upload: identical uploads may be staged (and removed) concurrently
+    path = os.path.join(directory, f"{uuid.uuid4()}.upload")
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        with open(path, "wb") as f:
+            async for chunk in chunks:
+                written += len(chunk)
+                if max_bytes and written > max_bytes:
+                    raise ArchiveError(f"Upload is larger than {max_bytes} bytes")
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        remove_staged(path)
+        raise
+    print(f"📥 Staged {written} upload bytes at {path}")
+    return path, digest.hexdigest()
+
+
+async def staged_chunks(path: str, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+    """Content of a staged upload, read on a thread one chunk at a time"""
+    with open(path, "rb") as f:
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def remove_staged(path: str) -> None:
+    """Delete a staged upload, if it is still there"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ArchiveSnapshot:
+    """
+    What language detection needs from an archive that has already streamed
+    past: every member's path and size, and the head of the files that were
+    read, up to a memory budget. Acts as the blob reader of a GitTreeDetector.
+    """
+
+    HEAD_BYTES = 64 * 1024
+
+    def __init__(self, budget_bytes: Optional[int] = None):
+        """
+        Args:
+            budget_bytes: Memory kept for file heads (default: settings.UPLOAD_DETECTION_BYTES)
+        """
+        self.entries: List[TreeEntry] = []
+        self._heads: Dict[str, bytes] = {}
+        self._budget = settings.UPLOAD_DETECTION_BYTES if budget_bytes is None else budget_bytes
+
+    def add(self, member: ArchiveMember) -> None:
+        # The path doubles as the "blob SHA" the detector asks the reader for
+        self.entries.append(TreeEntry(member.path, member.path, member.size_bytes))
+        if member.content is not None and self._budget > 0:
+            head = member.content[:self.HEAD_BYTES]
+            self._heads[member.path] = head
+            self._budget -= len(head)
+
+    def read_text(self, path: str) -> str:
+        head = self._heads.get(path)
+        if head is None:
+            raise FileNotFoundError(path)
+        return head.decode("utf-8", errors="ignore")
+
+    def detector(self, repo_path: str):
+        """
+        GitTreeDetector over the archive.
+
+        Archives often wrap the project in one top-level directory
+        (e.g. repo-<sha>/); detection then runs from inside it.
+        """
+        from app.services.detector import GitTreeDetector
+
+        entries = self.entries
+        tops = {entry.path.split("/", 1)[0] for entry in entries}
+        if len(tops) == 1 and all("/" in entry.path for entry in entries):
+            prefix = tops.pop()
+            repo_path = os.path.join(repo_path, prefix)
+            entries = [
+                TreeEntry(entry.path[len(prefix) + 1:], entry.sha, entry.size_bytes)
+                for entry in entries
+            ]
+        return GitTreeDetector(repo_path, entries, self)
+
+
+async def multipart_file_chunks(chunks: AsyncIterable[bytes], content_type: str) -> AsyncIterator[bytes]:
+    """
+    Content of the first file field of a multipart/form-data body, yielded
+    as it is parsed (unlike UploadFile, which spools it to disk first).
+
+    Args:
+        chunks: The raw request body
+        content_type: The request's Content-Type header, with its boundary
+
+    Raises:
+        ArchiveError: No boundary, or no file field in the body
+    """
+    from multipart.multipart import MultipartParser, parse_options_header
+
+    _, params = parse_options_header(content_type)
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise ArchiveError("Multipart upload without a boundary")
+
+    state = {"field": b"", "value": b"", "is_file": False, "active": False, "done": False}
+    data: List[bytes] = []
+
+    def on_part_begin() -> None:
+        state["is_file"] = False
+
+    def on_header_field(buffer: bytes, start: int, end: int) -> None:
+        state["field"] += buffer[start:end]
+
+    def on_header_value(buffer: bytes, start: int, end: int) -> None:
+        state["value"] += buffer[start:end]
+
+    def on_header_end() -> None:
+        if state["field"].lower() == b"content-disposition":
+            _, options = parse_options_header(state["value"])
+            state["is_file"] = b"filename" in options
+        state["field"] = state["value"] = b""
+
+    def on_headers_finished() -> None:
+        state["active"] = state["is_file"] and not state["done"]
+
+    def on_part_data(buffer: bytes, start: int, end: int) -> None:
+        if state["active"]:
+            data.append(buffer[start:end])
+
+    def on_part_end() -> None:
+        if state["active"]:
+            state["active"] = False
+            state["done"] = True
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    found = False
+    async for chunk in chunks:
+        parser.write(chunk)
+        if data:
+            found = True
+            yield b"".join(data)
+            data.clear()
+    parser.finalize()
+    if data:
+        found = True
+        yield b"".join(data)
+    if not found and not state["done"]:
+        raise ArchiveError("No file in multipart upload")
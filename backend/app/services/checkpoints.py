@@ -0,0 +1,80 @@
+"""
+Per-file ingestion checkpoints.
+Records which files of a run have been extracted and written to the graph,
+so a restarted or retried ingest skips them and resumes where it stopped.
+"""
+
+import time
+from typing import Iterable, Optional, Set
+
+from app.core.config import settings
+from app.db.sqlite import LocalConnections, transaction
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    scope TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    written_at REAL NOT NULL,
+    PRIMARY KEY (scope, file_path)
+);
+CREATE INDEX IF NOT EXISTS checkpoints_age_idx ON checkpoints (written_at);
+"""
+
+
+def ingest_scope(project_id: str, commit: str, base_commit: Optional[str] = None) -> str:
+    """
+    Checkpoint scope of one ingest run.
+
+    A retry only resumes when it targets the same commit (and, for
+    incremental runs, the same base commit); anything else starts fresh.
+    """
+    if base_commit:
+        return f"{project_id}@{base_commit}..{commit}"
+    return f"{project_id}@{commit}"
+
+
+class CheckpointStore:
+    """SQLite-backed set of completed files per ingest run"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: SQLite database file (default: settings.CHECKPOINT_PATH)
+        """
+        self.path = path or settings.CHECKPOINT_PATH
+        self._conn = LocalConnections(self.path, _SCHEMA).connection
+
+    def completed(self, scope: str) -> Set[str]:
+        """Files already written to the graph in this scope"""
+        with self._conn() as conn:
+            return {
+                row["file_path"]
+                for row in conn.execute(
+                    "SELECT file_path FROM checkpoints WHERE scope = ?", (scope,)
+                )
+            }
+
+    def mark_done(self, scope: str, file_paths: Iterable[str]) -> None:
+        """Record files whose nodes and edges are safely in the graph"""
+        now = time.time()
+        rows = [(scope, path, now) for path in file_paths]
+        if not rows:
+            return
+        with self._conn() as conn, transaction(conn):
+            conn.executemany(
+                "INSERT OR REPLACE INTO checkpoints (scope, file_path, written_at) VALUES (?, ?, ?)",
+                rows
+            )
+
+    def clear(self, scope: str) -> None:
+        """Forget a finished run, and any run abandoned longer than CHECKPOINT_TTL_SECONDS"""
+        with self._conn() as conn:
+            conn.execute("DELETE FROM checkpoints WHERE scope = ?", (scope,))
+            conn.execute(
+                "DELETE FROM checkpoints WHERE written_at < ?",
+                (time.time() - settings.CHECKPOINT_TTL_SECONDS,)
+            )
+
+
+checkpoint_store = CheckpointStore()
@@ -5,13 +5,18 @@ Deterministic detection based on config files, imports, and code patterns.
 NO AI. Just file and pattern matching.
 """
 
+import fnmatch
+import json
 import os
 import re
 from pathlib import Path
-from typing import List, Dict, Set, Optional
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, List, Dict, Set, Optional
+from dataclasses import dataclass, field
 from enum import Enum
 
+if TYPE_CHECKING:
+    from app.services.git_objects import GitObjectReader, TreeEntry
+
 
 class Language(str, Enum):
     """Supported programming languages"""
@@ -53,6 +58,7 @@ class DetectionResult:
     evidence: Dict[str, List[str]]  # What led to detection
     is_monorepo: bool = False
     architecture_type: str = "unknown"  # "monolith", "microservices", "unknown"
+    workspaces: List[str] = field(default_factory=list)  # Monorepo workspace dirs, '/'-separated
 
 
 class LanguageDetector:
@@ -188,6 +194,7 @@ class LanguageDetector:
         # Phase 5: Detect architecture type
         is_monorepo = self._is_monorepo()
         architecture_type = self._detect_architecture_type()
+        workspaces = self._detect_workspaces() if is_monorepo else []
         
         return DetectionResult(
             primary_language=primary_language,
@@ -197,6 +204,7 @@ class LanguageDetector:
             evidence=self.evidence,
             is_monorepo=is_monorepo,
             architecture_type=architecture_type,
+            workspaces=workspaces,
         )
     
     def _detect_languages_from_config(self) -> Set[Language]:
@@ -239,7 +247,7 @@ class LanguageDetector:
         sampled_files = 0
         max_samples = 1000
         
-        for root, dirs, files in os.walk(self.repo_path):
+        for root, dirs, files in self._walk():
             # Skip common non-source directories
             dirs[:] = [d for d in dirs if d not in {
                 "node_modules", ".git", "venv", "dist", "build"
@@ -369,7 +377,7 @@ class LanguageDetector:
         files_checked = 0
         max_files = 50  # Limit search for performance
         
-        for root, dirs, files in os.walk(self.repo_path):
+        for root, dirs, files in self._walk():
             # Skip non-source directories
             dirs[:] = [d for d in dirs if d not in {
                 "node_modules", ".git", "venv", "dist", "build"
@@ -383,17 +391,16 @@ class LanguageDetector:
                 file_path = os.path.join(root, filename)
                 
                 try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read(10000)  # Read first 10KB
-                        
-                        for pattern in patterns:
-                            if re.search(pattern, content):
-                                relative_path = os.path.relpath(file_path, self.repo_path)
-                                evidence.append(f"Import in {relative_path}")
-                                return evidence  # Found it, exit early
+                    content = self._read_head(file_path, 10000)  # Read first 10KB
                 except (OSError, IOError):
                     continue
                 
+                for pattern in patterns:
+                    if re.search(pattern, content):
+                        relative_path = os.path.relpath(file_path, self.repo_path)
+                        evidence.append(f"Import in {relative_path}")
+                        return evidence  # Found it, exit early
+                
                 files_checked += 1
                 if files_checked >= max_files:
                     break
@@ -417,11 +424,89 @@ class LanguageDetector:
                 return True
         
         # Check for packages/ or apps/ directory structure
-        has_packages = os.path.isdir(os.path.join(self.repo_path, "packages"))
-        has_apps = os.path.isdir(os.path.join(self.repo_path, "apps"))
+        has_packages = self._dir_exists("packages")
+        has_apps = self._dir_exists("apps")
         
         return has_packages or has_apps
     
+    def _detect_workspaces(self) -> List[str]:
+        """
+        Workspace directories of a monorepo, relative to the repo root.
+        
+        Patterns come from pnpm-workspace.yaml, lerna.json and the
+        package.json "workspaces" field; nx layouts and bare packages/ or
+        apps/ folders fall back to their immediate subdirectories.
+        """
+        patterns = self._pnpm_workspace_patterns()
+        for config_file, key in (("lerna.json", "packages"), ("package.json", "workspaces")):
+            config = self._read_json(config_file)
+            value = config.get(key) if isinstance(config, dict) else None
+            if isinstance(value, dict):
+                # Yarn's {"packages": [...], "nohoist": [...]} form
+                value = value.get("packages")
+            if isinstance(value, list):
+                patterns.extend(p for p in value if isinstance(p, str))
+        
+        if not patterns:
+            patterns = ["apps/*", "libs/*", "packages/*"]
+        
+        workspaces: Set[str] = set()
+        for pattern in patterns:
+            if not pattern.startswith("!"):
+                workspaces.update(self._expand_workspace_pattern(pattern))
+        if workspaces:
+            self._add_evidence("workspaces", sorted(workspaces))
+        return sorted(workspaces)
+    
+    def _pnpm_workspace_patterns(self) -> List[str]:
+        """Entries of the packages: list in pnpm-workspace.yaml"""
+        if not self._file_exists("pnpm-workspace.yaml"):
+            return []
+        try:
+            text = self._read_head(os.path.join(self.repo_path, "pnpm-workspace.yaml"), 64 * 1024)
+        except (OSError, IOError):
+            return []
+        
+        patterns: List[str] = []
+        in_packages = False
+        for line in text.splitlines():
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            if not line[0].isspace() and not stripped.startswith("-"):
+                in_packages = stripped.startswith("packages:")
+            elif in_packages and stripped.startswith("-"):
+                patterns.append(stripped[1:].strip().strip("'\""))
+        return patterns
+    
+    def _read_json(self, filename: str) -> Any:
+        """Parse a JSON file in the repo root, or None"""
+        if not self._file_exists(filename):
+            return None
+        try:
+            return json.loads(self._read_head(os.path.join(self.repo_path, filename), 1024 * 1024))
+        except (OSError, IOError, ValueError):
+            return None
+    
+    def _expand_workspace_pattern(self, pattern: str) -> List[str]:
+        """Directories matched by a workspace glob such as packages/* or apps/web"""
+        pattern = pattern.strip().strip("/")
+        if pattern.startswith("./"):
+            pattern = pattern[2:]
+        if pattern.endswith("/**"):
+            pattern = pattern[:-1]
+        
+        base, _, leaf = pattern.rpartition("/")
+        if any(c in base for c in "*?["):
+            return []  # Nested wildcards are not expanded
+        if not any(c in leaf for c in "*?["):
+            return [pattern] if self._dir_exists(pattern) else []
+        return [
+            f"{base}/{name}" if base else name
+            for name in self._list_dirs(base)
+            if fnmatch.fnmatch(name, leaf) and not name.startswith(".")
+        ]
+    
     def _detect_architecture_type(self) -> str:
         """Detect if monolith or microservices"""
         # Check for Dockerfile or docker-compose
@@ -430,8 +515,8 @@ class LanguageDetector:
                       self._file_exists("docker-compose.yaml")
         
         # Check for Kubernetes configs
-        has_k8s = os.path.isdir(os.path.join(self.repo_path, "k8s")) or \
-                  os.path.isdir(os.path.join(self.repo_path, "kubernetes"))
+        has_k8s = self._dir_exists("k8s") or \
+                  self._dir_exists("kubernetes")
         
         # If multiple services detected, likely microservices
         if has_k8s:
@@ -451,6 +536,27 @@ class LanguageDetector:
         """Check if file exists in repo root"""
         return os.path.isfile(os.path.join(self.repo_path, filename))
     
+    def _dir_exists(self, dirname: str) -> bool:
+        """Check if directory exists in repo root"""
+        return os.path.isdir(os.path.join(self.repo_path, dirname))
+    
+    def _list_dirs(self, dirname: str) -> List[str]:
+        """Names of the subdirectories of a repo directory ('' for the root)"""
+        path = os.path.join(self.repo_path, dirname)
+        try:
+            return [e.name for e in os.scandir(path) if e.is_dir()]
+        except OSError:
+            return []
+    
+    def _walk(self):
+        """Walk the repository top-down like os.walk"""
+        return os.walk(self.repo_path)
+    
+    def _read_head(self, file_path: str, limit: int) -> str:
+        """Read the first `limit` characters of a file"""
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read(limit)
+    
     def _add_evidence(self, category: str, evidence: any) -> None:
         """Add evidence to detection result"""
         if category not in self.evidence:
@@ -462,6 +568,64 @@ class LanguageDetector:
             self.evidence[category].append(evidence)
 
 
+class GitTreeDetector(LanguageDetector):
+    """
+    LanguageDetector that reads a git tree listing and blobs instead of a
+    checked-out working tree.
+    """
+    
+    def __init__(self, repo_path: str, entries: List["TreeEntry"], reader: "GitObjectReader"):
+        """
+        Args:
+            repo_path: Notional repository root (used for relative paths)
+            entries: Output of git_objects.list_tree
+            reader: Reader for the repository's blobs
+        """
+        super().__init__(repo_path)
+        self.reader = reader
+        self._blobs: Dict[str, str] = {}
+        self._tree: Dict[str, tuple] = {"": (set(), [])}
+        
+        for entry in entries:
+            parts = entry.path.split("/")
+            self._blobs[entry.path] = entry.sha
+            for depth in range(len(parts) - 1):
+                parent = "/".join(parts[:depth])
+                child = "/".join(parts[:depth + 1])
+                self._tree[parent][0].add(parts[depth])
+                self._tree.setdefault(child, (set(), []))
+            self._tree["/".join(parts[:-1])][1].append(parts[-1])
+    
+    def _file_exists(self, filename: str) -> bool:
+        return filename in self._blobs
+    
+    def _dir_exists(self, dirname: str) -> bool:
+        return dirname in self._tree
+    
+    def _list_dirs(self, dirname: str) -> List[str]:
+        return sorted(self._tree.get(dirname, (set(), []))[0])
+    
+    def _walk(self):
+        # Top-down, honouring in-place pruning of `dirs` like os.walk
+        pending = [""]
+        while pending:
+            directory = pending.pop()
+            subdirs, files = self._tree[directory]
+            dirs = sorted(subdirs)
+            root = os.path.join(self.repo_path, *directory.split("/")) if directory else self.repo_path
+            yield root, dirs, list(files)
+            pending.extend(
+                f"{directory}/{d}" if directory else d for d in reversed(dirs)
+            )
+    
+    def _read_head(self, file_path: str, limit: int) -> str:
+        relative_path = os.path.relpath(file_path, self.repo_path).replace(os.sep, "/")
+        sha = self._blobs.get(relative_path)
+        if sha is None:
+            raise FileNotFoundError(file_path)
+        return self.reader.read_text(sha)[:limit]
+
+
 def detect_language_and_frameworks(repo_path: str) -> DetectionResult:
     """
     Convenience function to detect language and frameworks.
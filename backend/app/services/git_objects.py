@@ -0,0 +1,209 @@
+"""
+Direct access to a repository's git object store.
+Lists trees with `git ls-tree` and streams blob contents through a single
+long-lived `git cat-file --batch` process, so files can be analyzed
+without materializing a working tree.
+"""
+
+import subprocess
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.services.repo_store import GitCommandError, run_git
+
+
+# Regular files; symlinks (120000) and submodules (160000) are skipped
+_BLOB_MODES = {"100644", "100755"}
+
+
+@dataclass
+class TreeEntry:
+    """A file blob in a commit's tree"""
+    path: str  # '/'-separated, relative to the repo root
+    sha: str
+    size_bytes: int
+
+
+def list_tree(git_dir: str, rev: str = "HEAD") -> List[TreeEntry]:
+    """
+    List every regular file in a commit's tree.
+
+    `ls-tree -l` would read every blob for its size, which in a partial
+    clone means one lazy fetch per blob. Instead, the commit's missing
+    blobs are fetched in one request (see prefetch_blobs), then sizes
+    come from a single `cat-file --batch-check`.
+
+    Args:
+        git_dir: Repository (bare or not) containing the commit
+        rev: Commit, tag or branch to list
+
+    Returns:
+        TreeEntry for each regular file
+    """
+    output = run_git("ls-tree", "-r", "-z", "--full-tree", rev, cwd=git_dir)
+    listed = []
+    for record in output.split("\0"):
+        if not record:
+            continue
+        # <mode> SP <type> SP <sha> TAB <path>
+        meta, path = record.split("\t", 1)
+        mode, obj_type, sha = meta.split()
+        if obj_type != "blob" or mode not in _BLOB_MODES:
+            continue
+        listed.append((path, sha))
+
+    prefetch_blobs(git_dir, rev)
+    sizes = blob_sizes(git_dir, {sha for _, sha in listed})
+    return [TreeEntry(path=path, sha=sha, size_bytes=sizes[sha]) for path, sha in listed]
+
+
+def _promisor_remote(git_dir: str) -> Optional[str]:
+    """Remote that lazily serves a partial clone's missing objects, or None for a full clone"""
+    try:
+        output = run_git("config", "--get-regexp", r"^remote\..*\.promisor$", cwd=git_dir)
+    except GitCommandError:
+        output = ""  # No such keys
+    for line in output.splitlines():
+        key, _, value = line.partition(" ")
+        if value.strip().lower() in ("true", "yes", "on", "1"):
+            return key[len("remote."):-len(".promisor")]
+    try:
+        return run_git("config", "--get", "extensions.partialClone", cwd=git_dir).strip() or None
+    except GitCommandError:
+        return None
+
+
+def prefetch_blobs(git_dir: str, rev: str = "HEAD") -> int:
+    """
+    Fetch all blobs of a commit's tree missing from a partial clone in one request.
+
+    Does nothing in a full clone.
+
+    Returns:
+        Number of blobs fetched
+    """
+    remote = _promisor_remote(git_dir)
+    if remote is None:
+        return 0
+    listing = run_git("rev-list", "--objects", "--no-walk", "--missing=print", rev, cwd=git_dir)
+    missing = [line[1:].strip() for line in listing.splitlines() if line.startswith("?")]
+    if missing:
+        # What git runs for a single lazy fetch, given every object at once
+        run_git(
+            "-c", "fetch.negotiationAlgorithm=noop",
+            "fetch", remote, "--no-tags", "--no-write-fetch-head",
+            "--recurse-submodules=no", "--filter=blob:none", "--stdin",
+            cwd=git_dir,
+            timeout=settings.CLONE_TIMEOUT_SECONDS,
+            input="\n".join(missing) + "\n",
+        )
+        print(f"📥 Prefetched {len(missing)} blobs of {rev}")
+    return len(missing)
+
+
+def blob_sizes(git_dir: str, shas: Iterable[str]) -> Dict[str, int]:
+    """Sizes of blobs, read in one `git cat-file --batch-check`"""
+    shas = list(shas)
+    if not shas:
+        return {}
+    output = run_git(
+        "cat-file", "--batch-check=%(objectname) %(objectsize)",
+        cwd=git_dir,
+        input="\n".join(shas) + "\n",
+    )
+    sizes = {}
+    for line in output.splitlines():
+        sha, size = line.split()
+        if size == "missing":
+            raise GitCommandError(f"git cat-file cannot read {sha}: missing")
+        sizes[sha] = int(size)
+    return sizes
+
+
+class GitObjectReader:
+    """
+    Reads blobs through one persistent `git cat-file --batch` process.
+
+    Thread-safe: requests are serialized over the process's stdin/stdout.
+
+    Usage:
+        with GitObjectReader(mirror) as reader:
+            content = reader.read_blob(sha)
+    """
+
+    def __init__(self, git_dir: str):
+        """
+        Args:
+            git_dir: Repository whose objects are read
+        """
+        self.git_dir = git_dir
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "GitObjectReader":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Spawn the cat-file process"""
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=self.git_dir,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+
+    def close(self) -> None:
+        """Stop the cat-file process"""
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+                self._process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self._process.kill()
+            self._process = None
+
+    def read_blob(self, sha: str) -> bytes:
+        """
+        Read the contents of a blob.
+
+        Args:
+            sha: Object name of the blob
+
+        Returns:
+            Raw blob bytes
+        """
+        with self._lock:
+            self.start()
+            stdin, stdout = self._process.stdin, self._process.stdout
+            try:
+                stdin.write(sha.encode("ascii") + b"\n")
+                stdin.flush()
+                header = stdout.readline().decode("ascii").split()
+            except (OSError, ValueError) as e:
+                self.close()
+                raise GitCommandError(f"git cat-file died reading {sha}: {e}")
+
+            if len(header) != 3:
+                # "<sha> missing" / "<sha> ambiguous", or EOF if the process exited
+                if not header:
+                    self.close()
+                raise GitCommandError(f"git cat-file cannot read {sha}: {' '.join(header)}")
+
+            _, obj_type, size = header
+            data = stdout.read(int(size))
+            stdout.read(1)  # trailing newline
+            if obj_type != "blob":
+                raise GitCommandError(f"{sha} is a {obj_type}, not a blob")
+            return data
+
+    def read_text(self, sha: str) -> str:
+        """Read a blob as UTF-8 text, ignoring undecodable bytes"""
+        return self.read_blob(sha).decode("utf-8", errors="ignore")
@@ -3,6 +3,7 @@ Enhanced Neo4j Graph Service for architecture storage and querying.
 Handles schema creation, batch insertion, and cypher queries.
 """
 
+import os
 from typing import List, Dict, Any, Optional
 from app.db.neo4j import neo4j_client
 from app.schemas.uas import ExtractionResult, UASNode, DependencyEdge
@@ -49,6 +50,7 @@ class GraphService:
             "CREATE INDEX node_type_idx IF NOT EXISTS FOR (n:CodeNode) ON (n.type)",
             "CREATE INDEX node_file_path_idx IF NOT EXISTS FOR (n:CodeNode) ON (n.file_path)",
             "CREATE INDEX project_id_idx IF NOT EXISTS FOR (n:CodeNode) ON (n.project_id)",
+            "CREATE INDEX workspace_idx IF NOT EXISTS FOR (n:CodeNode) ON (n.project_id, n.workspace)",
             "CREATE INDEX endpoint_method_idx IF NOT EXISTS FOR (n:Endpoint) ON (n.method)",
             "CREATE INDEX endpoint_path_idx IF NOT EXISTS FOR (n:Endpoint) ON (n.path)",
             "CREATE INDEX model_table_idx IF NOT EXISTS FOR (n:DatabaseModel) ON (n.table_name)",
@@ -127,6 +129,7 @@ class GraphService:
                 n.file_path = node.file_path,
                 n.line_number = node.line_number,
                 n.project_id = $project_id,
+                n.workspace = node.workspace,
                 n.confidence = node.confidence,
                 n.metadata = node.metadata,
                 n.method = node.method,
@@ -150,6 +153,7 @@ class GraphService:
                 if self.use_mock:
                     # Mock insertion
                     for node in nodes_data:
+                        node['project_id'] = project_id
                         self._mock_nodes[node['id']] = node
                         logger.debug(f"  [MOCK] Saved node {node['id']}")
                 else:
@@ -252,6 +256,28 @@ class GraphService:
         result = await neo4j_client.execute_query(query, {"project_id": project_id})
         return [dict(record) for record in result.records] if result.records else []
     
+    async def get_nodes_in_files(self, project_id: str, file_paths: List[str]) -> List[Dict[str, Any]]:
+        """Get all nodes extracted from the given files"""
+        if not file_paths:
+            return []
+        
+        if self.use_mock:
+            paths = set(file_paths)
+            return [dict(n) for n in self._mock_nodes.values()
+                    if n.get('project_id') == project_id and n.get('file_path') in paths]
+        
+        query = """
+        MATCH (n:CodeNode {project_id: $project_id})
+        WHERE n.file_path IN $file_paths
+        RETURN properties(n) as node
+        """
+        
+        result = await neo4j_client.execute_query(
+            query,
+            {"project_id": project_id, "file_paths": file_paths}
+        )
+        return [dict(record["node"]) for record in result.records] if result.records else []
+    
     async def get_all_database_models(self, project_id: str) -> List[Dict[str, Any]]:
         """Get all database models for a project"""
         if self.use_mock:
@@ -430,6 +456,78 @@ class GraphService:
                 
         return {"nodes": nodes, "edges": edges}
 
+    async def delete_file_nodes(self, project_id: str, file_paths: List[str]):
+        """Delete all nodes (and their relationships) extracted from the given files"""
+        if not file_paths:
+            return
+        
+        if self.use_mock:
+            paths = set(file_paths)
+            removed = {
+                node_id for node_id, n in self._mock_nodes.items()
+                if n.get('project_id') == project_id and n.get('file_path') in paths
+            }
+            for node_id in removed:
+                del self._mock_nodes[node_id]
+            self._mock_edges = [
+                e for e in self._mock_edges
+                if e['source_id'] not in removed and e['target_id'] not in removed
+            ]
+            logger.info(f"🗑️  [MOCK] Deleted {len(removed)} nodes from {len(paths)} files")
+            return
+        
+        query = """
+        MATCH (n:CodeNode {project_id: $project_id})
+        WHERE n.file_path IN $file_paths
+        DETACH DELETE n
+        """
+        
+        await neo4j_client.execute_query(
+            query,
+            {"project_id": project_id, "file_paths": file_paths}
+        )
+        logger.info(f"🗑️  Deleted nodes from {len(file_paths)} files for project {project_id}")
+
+    async def delete_workspace_nodes(self, project_id: str, workspace: str, workspace_dir: str):
+        """
+        Delete the nodes of one monorepo workspace.
+        
+        Nodes written before workspaces were tagged are matched by path
+        under workspace_dir; nodes tagged with another (nested) workspace
+        are kept.
+        """
+        prefix = workspace_dir.rstrip(os.sep) + os.sep
+        
+        if self.use_mock:
+            removed = {
+                node_id for node_id, n in self._mock_nodes.items()
+                if n.get('project_id') == project_id and (
+                    n.get('workspace') == workspace
+                    or (n.get('workspace') is None and n.get('file_path', '').startswith(prefix))
+                )
+            }
+            for node_id in removed:
+                del self._mock_nodes[node_id]
+            self._mock_edges = [
+                e for e in self._mock_edges
+                if e['source_id'] not in removed and e['target_id'] not in removed
+            ]
+            logger.info(f"🗑️  [MOCK] Deleted {len(removed)} nodes of workspace {workspace}")
+            return
+        
+        query = """
+        MATCH (n:CodeNode {project_id: $project_id})
+        WHERE n.workspace = $workspace
+           OR (n.workspace IS NULL AND n.file_path STARTS WITH $prefix)
+        DETACH DELETE n
+        """
+        
+        await neo4j_client.execute_query(
+            query,
+            {"project_id": project_id, "workspace": workspace, "prefix": prefix}
+        )
+        logger.info(f"🗑️  Deleted nodes of workspace {workspace} for project {project_id}")
+
     async def delete_project(self, project_id: str):
         """Delete all nodes and relationships for a project"""
         query = """
@@ -0,0 +1,311 @@
+"""
+Multi-commit history analysis.
+Ingests a list of commits (e.g. the last N release tags) into one project.
+Each distinct file version, a (path, blob) pair, is extracted and written
+to the graph once; a commit's snapshot is a manifest of references to the
+versions it contains. Cost grows with changed blobs, not commits x files.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.sqlite import LocalConnections, transaction
+from app.services.checkpoints import checkpoint_store, ingest_scope
+from app.services.progress import IngestStage, ProgressReporter
+from app.services.repo_store import repo_store, run_git, run_git_async
+from app.services.scanner import FileInfo, RepositoryScanner
+from app.services.scheduler import WorkerShare
+from app.services.sniffer import SkipReason
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history_snapshots (
+    project_id TEXT NOT NULL,
+    commit_sha TEXT NOT NULL,
+    ref TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    primary_language TEXT,
+    frameworks TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (project_id, commit_sha)
+);
+CREATE TABLE IF NOT EXISTS history_files (
+    project_id TEXT NOT NULL,
+    commit_sha TEXT NOT NULL,
+    relative_path TEXT NOT NULL,
+    version_path TEXT NOT NULL,
+    PRIMARY KEY (project_id, commit_sha, relative_path)
+);
+CREATE INDEX IF NOT EXISTS history_versions_idx ON history_files (project_id, version_path);
+"""
+
+
+def version_path(root: str, relative_path: str, blob_sha: str) -> str:
+    """
+    File path a file version's nodes are stored under.
+
+    Node IDs embed the file path, so every version of a file needs its own
+    path for its nodes to coexist in the graph.
+    """
+    return os.path.join(root, "versions", blob_sha, *relative_path.split(os.sep))
+
+
+@dataclass
+class HistorySnapshot:
+    """One analysed commit of a history run"""
+    ref: str
+    commit: str
+    position: int
+    files: Dict[str, str]  # relative path -> version path
+    new_versions: int = 0  # Versions first seen at this commit
+    primary_language: Optional[str] = None
+    frameworks: Optional[List[str]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ref": self.ref,
+            "commit": self.commit,
+            "position": self.position,
+            "files": len(self.files),
+            "new_versions": self.new_versions,
+            "primary_language": self.primary_language,
+            "frameworks": self.frameworks or [],
+        }
+
+
+class HistoryStore:
+    """SQLite-backed snapshot manifests of history runs"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: SQLite database file (default: settings.HISTORY_STORE_PATH)
+        """
+        self.path = path or settings.HISTORY_STORE_PATH
+        self._conn = LocalConnections(self.path, _SCHEMA).connection
+
+    def save(self, project_id: str, snapshot: HistorySnapshot) -> None:
+        """Record (or replace) a commit's snapshot"""
+        with self._conn() as conn, transaction(conn):
+            conn.execute(
+                "DELETE FROM history_files WHERE project_id = ? AND commit_sha = ?",
+                (project_id, snapshot.commit)
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO history_snapshots "
+                "(project_id, commit_sha, ref, position, primary_language, frameworks, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (project_id, snapshot.commit, snapshot.ref, snapshot.position,
+                 snapshot.primary_language, ",".join(snapshot.frameworks or []), time.time())
+            )
+            conn.executemany(
+                "INSERT INTO history_files (project_id, commit_sha, relative_path, version_path) "
+                "VALUES (?, ?, ?, ?)",
+                [(project_id, snapshot.commit, rel, path) for rel, path in snapshot.files.items()]
+            )
+
+    def snapshots(self, project_id: str) -> List[HistorySnapshot]:
+        """Snapshots of a project in history order, without their manifests"""
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT * FROM history_snapshots WHERE project_id = ? ORDER BY position",
+                (project_id,)
+            ).fetchall()
+        return [
+            HistorySnapshot(
+                ref=row["ref"],
+                commit=row["commit_sha"],
+                position=row["position"],
+                files={},
+                primary_language=row["primary_language"],
+                frameworks=[f for f in (row["frameworks"] or "").split(",") if f],
+            )
+            for row in rows
+        ]
+
+    def files(self, project_id: str, commit: str) -> Dict[str, str]:
+        """Manifest of a snapshot: relative path -> version path"""
+        with self._conn() as conn:
+            return {
+                row["relative_path"]: row["version_path"]
+                for row in conn.execute(
+                    "SELECT relative_path, version_path FROM history_files "
+                    "WHERE project_id = ? AND commit_sha = ?",
+                    (project_id, commit)
+                )
+            }
+
+    def version_paths(self, project_id: str) -> set:
+        """Every version referenced by a saved snapshot (and so already in the graph)"""
+        with self._conn() as conn:
+            return {
+                row["version_path"]
+                for row in conn.execute(
+                    "SELECT DISTINCT version_path FROM history_files WHERE project_id = ?",
+                    (project_id,)
+                )
+            }
+
+
+class HistoryService:
+    """Ingests several commits of a repository, sharing extraction across them"""
+
+    def __init__(self, store: Optional[HistoryStore] = None):
+        """
+        Args:
+            store: Snapshot manifests (default: shared history_store)
+        """
+        self.store = store or history_store
+
+    async def ingest_history(
+        self,
+        repo_url: str,
+        revs: Optional[List[str]] = None,
+        last_tags: Optional[int] = None,
+        project_id: Optional[str] = None,
+        graph=None,
+        progress: Optional[ProgressReporter] = None,
+        share: Optional[WorkerShare] = None
+    ) -> Dict[str, Any]:
+        """
+        Build architecture snapshots of several commits.
+
+        Commits are read from the mirror's object store, so nothing is
+        checked out. Versions already in the graph from an earlier run of
+        the same project are not extracted again.
+
+        Args:
+            repo_url: Repository to analyse
+            revs: Commits, tags or branches, oldest first
+            last_tags: Analyse the most recent N tags instead of revs
+            project_id: Existing history project (a new uuid is generated if omitted)
+            graph: GraphService to write to (default: shared graph_service)
+            progress: Reporter for stage and per-file progress
+            share: Fair share of an ingest worker's extraction pool
+        """
+        from app.services.ingestion import ingestion_service
+
+        project_id = project_id or str(uuid.uuid4())
+        progress = progress or ProgressReporter()
+        root = os.path.join(settings.REPO_STORAGE_PATH, project_id)
+
+        async with repo_store.in_use(repo_url):
+            progress.set_stage(IngestStage.CLONE)
+            git_dir = await repo_store.ensure_mirror_async(repo_url, progress.clone_progress)
+            await repo_store.evict_async(keep=git_dir)
+            if last_tags:
+                revs = await asyncio.to_thread(self._recent_tags, git_dir, last_tags)
+            if not revs:
+                raise ValueError("No commits to analyse")
+            if len(revs) > settings.HISTORY_MAX_COMMITS:
+                raise ValueError(f"At most {settings.HISTORY_MAX_COMMITS} commits per history run")
+            commits = [
+                (rev, (await run_git_async("rev-parse", "--verify", f"{rev}^{{commit}}", cwd=git_dir)).strip())
+                for rev in revs
+            ]
+
+            written = self.store.version_paths(project_id)
+            # Commits seen by an earlier run keep their place; new ones go after them
+            positions = {s.commit: s.position for s in self.store.snapshots(project_id)}
+            next_position = max(positions.values(), default=-1) + 1
+            versions: Dict[str, FileInfo] = {}
+            snapshots: List[HistorySnapshot] = []
+            sniffed: Dict[str, Optional[SkipReason]] = {}  # Blob SHA -> outcome, shared by the commits
+            for rev, commit in commits:
+                position = positions.get(commit)
+                if position is None:
+                    position, next_position = next_position, next_position + 1
+                detection_result, _, files = await asyncio.to_thread(
+                    ingestion_service._scan_object_store, git_dir, commit, root, progress, sniffed
+                )
+                snapshot = HistorySnapshot(
+                    ref=rev,
+                    commit=commit,
+                    position=position,
+                    files={},
+                    primary_language=detection_result.primary_language.value,
+                    frameworks=[f.name for f in detection_result.frameworks],
+                )
+                for file_info in files:
+                    path = version_path(root, file_info.relative_path, file_info.blob_sha)
+                    snapshot.files[file_info.relative_path] = path
+                    if path not in written and path not in versions:
+                        versions[path] = replace(file_info, path=path)
+                        snapshot.new_versions += 1
+                snapshots.append(snapshot)
+                print(f"🏷️  {rev} ({commit[:12]}): {len(files)} files, {snapshot.new_versions} new versions")
+
+            # Identical blobs at different paths are extracted once too
+            to_extract = await asyncio.to_thread(RepositoryScanner().deduplicate, list(versions.values()))
+            scope = ingest_scope(project_id, self._run_key(commits))
+            await ingestion_service.process_repo(
+                project_id, root, to_extract, graph=graph, progress=progress,
+                git_dir=git_dir, share=share, checkpoint_scope=scope
+            )
+
+            for snapshot in snapshots:
+                self.store.save(project_id, snapshot)
+            checkpoint_store.clear(scope)
+
+            file_refs = sum(len(s.files) for s in snapshots)
+            return {
+                "project_id": project_id,
+                "snapshots": [s.to_dict() for s in snapshots],
+                "file_references": file_refs,
+                "versions_new": len(versions),
+                "versions_extracted": len(to_extract),
+                "sharing_ratio": round(1 - len(to_extract) / file_refs, 4) if file_refs else 0.0,
+                "metrics": progress.progress.metrics,
+                "status": "success"
+            }
+
+    async def snapshot_graph(self, project_id: str, commit: str, graph=None) -> Dict[str, Any]:
+        """
+        Nodes of one snapshot, with file paths mapped back to the commit's paths.
+
+        Args:
+            project_id: History project
+            commit: Commit SHA or ref recorded in the snapshot
+        """
+        if graph is None:
+            from app.services.graph_service import graph_service
+            graph = graph_service
+        snapshot = next(
+            (s for s in self.store.snapshots(project_id) if commit in (s.commit, s.ref)),
+            None
+        )
+        if snapshot is None:
+            raise KeyError(f"No snapshot of {commit} in {project_id}")
+
+        files = self.store.files(project_id, snapshot.commit)
+        relative = {path: rel for rel, path in files.items()}
+        nodes = await graph.get_nodes_in_files(project_id, list(relative))
+        for node in nodes:
+            node["relative_path"] = relative.get(node.get("file_path"))
+        return {**snapshot.to_dict(), "files": len(files), "nodes": nodes}
+
+    @staticmethod
+    def _recent_tags(git_dir: str, count: int) -> List[str]:
+        """The newest count tags, oldest first"""
+        output = run_git(
+            "for-each-ref", "--sort=-creatordate", f"--count={count}",
+            "--format=%(refname:short)", "refs/tags",
+            cwd=git_dir
+        )
+        return list(reversed(output.split()))
+
+    @staticmethod
+    def _run_key(commits: List[Tuple[str, str]]) -> str:
+        """Checkpoint identity of a run over these commits"""
+        digest = hashlib.sha1(",".join(commit for _, commit in commits).encode()).hexdigest()
+        return f"history-{digest[:16]}"
+
+
+history_store = HistoryStore()
+history_service = HistoryService()
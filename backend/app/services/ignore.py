@@ -0,0 +1,173 @@
+"""
+Gitignore-compatible path matching.
+Compiles the patterns of an ignore file (.gitignore, .eonixignore or the
+scanner's built-in list) into one regular expression, so a path is tested
+against every pattern in a single match instead of a loop over patterns.
+"""
+
+import re
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+
+def _translate(pattern: str) -> str:
+    """Regex body for one glob (no negation, trailing slash or leading slash)"""
+    out: List[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            j = i
+            while j < n and pattern[j] == '*':
+                j += 1
+            whole_segment = (i == 0 or pattern[i - 1] == '/') and (j == n or pattern[j] == '/')
+            if j - i >= 2 and whole_segment:
+                if j == n:
+                    # "dir/**": everything inside
+                    out.append('.*')
+                else:
+                    # "**/": zero or more directories
+                    out.append('(?:.*/)?')
+                    j += 1
+            else:
+                out.append('[^/]*')
+            i = j
+            continue
+        if c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            j = i + 1
+            if j < n and pattern[j] in '!^':
+                j += 1
+            if j < n and pattern[j] == ']':
+                j += 1
+            while j < n and pattern[j] != ']':
+                j += 1
+            if j >= n:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j].replace('\\', '\\\\')
+                if body[0] in '!^':
+                    body = '^' + body[1:]
+                out.append(f'(?!/)[{body}]')
+                i = j + 1
+                continue
+        elif c == '\\' and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+            continue
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+def compile_pattern(line: str, base: str = "") -> Optional[Tuple[str, bool, bool]]:
+    """
+    Translate one ignore-file line.
+
+    Args:
+        line: Line of the ignore file
+        base: '/'-separated directory the ignore file lives in ("" for the root)
+
+    Returns:
+        (regex matching '/'-separated paths relative to the root, negated,
+        directories only), or None for blank lines and comments
+    """
+    line = line.rstrip('\r\n')
+    # Trailing spaces are dropped unless escaped
+    while line.endswith(' ') and not line.endswith('\\ '):
+        line = line[:-1]
+    if not line or line.startswith('#'):
+        return None
+
+    negate = line.startswith('!')
+    if negate:
+        line = line[1:]
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+
+    # A slash anywhere but the end anchors the pattern to the file's directory
+    anchored = '/' in line
+    if line.startswith('/'):
+        line = line[1:]
+    regex = _translate(line)
+    if not anchored:
+        regex = '(?:.*/)?' + regex
+    if base:
+        regex = re.escape(base.strip('/')) + '/' + regex
+    return regex, negate, dir_only
+
+
+class IgnoreRules:
+    """
+    The compiled patterns of one ignore file.
+
+    Later patterns override earlier ones, as in git: a path takes the
+    verdict of the last pattern matching it. All patterns are joined into
+    one alternation, last pattern first, so the first alternative that
+    matches is that last pattern and its group number gives its verdict.
+    """
+
+    def __init__(self, patterns: Iterable[str], base: str = ""):
+        """
+        Args:
+            patterns: Lines in gitignore syntax
+            base: '/'-separated directory the patterns are relative to
+        """
+        compiled = [c for c in (compile_pattern(p, base) for p in patterns) if c is not None]
+        self.size = len(compiled)
+        self._dirs = self._combine(compiled)
+        self._files = self._combine([c for c in compiled if not c[2]])
+
+    @classmethod
+    def from_text(cls, text: str, base: str = "") -> "IgnoreRules":
+        """Rules of an ignore file's content"""
+        return cls(text.splitlines(), base)
+
+    @staticmethod
+    def _combine(compiled: Sequence[Tuple[str, bool, bool]]):
+        if not compiled:
+            return None
+        ordered = list(reversed(compiled))
+        regex = re.compile('|'.join(f'({c[0]})' for c in ordered), re.DOTALL)
+        return regex, [c[1] for c in ordered]
+
+    def match(self, path: str, is_dir: bool) -> Optional[bool]:
+        """
+        Verdict of the last matching pattern.
+
+        Args:
+            path: '/'-separated path relative to the root
+            is_dir: Whether the path is a directory (for "dir/" patterns)
+
+        Returns:
+            True if ignored, False if re-included by a "!" pattern, None if
+            no pattern matches
+        """
+        combined = self._dirs if is_dir else self._files
+        if combined is None:
+            return None
+        regex, negated = combined
+        match = regex.fullmatch(path)
+        if match is None:
+            return None
+        return not negated[match.lastindex - 1]
+
+
+def is_ignored(layers: Sequence[IgnoreRules], path: str, is_dir: bool) -> bool:
+    """
+    Whether a path is ignored by a stack of rule sets.
+
+    Args:
+        layers: Rule sets from lowest to highest precedence (e.g. built-ins,
+            then .gitignore files from the root down, then .eonixignore)
+        path: '/'-separated path relative to the root
+        is_dir: Whether the path is a directory
+    """
+    for rules in reversed(layers):
+        verdict = rules.match(path, is_dir)
+        if verdict is not None:
+            return verdict
+    return False
@@ -1,86 +1,810 @@
+import asyncio
 import os
-import shutil
+import time
 import uuid
-import git
-from typing import Dict, Any
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Collection, Dict, List, Optional, Tuple, Union
+)
 from app.core.config import settings
-from app.services.scanner import RepositoryScanner
-from app.services.detector import LanguageDetector
+from app.services.checkpoints import checkpoint_store, ingest_scope
+from app.services.project_store import ProjectState, project_store
+from app.services.repo_store import repo_store, resolve_local_path, run_git, run_git_async
+from app.services.pipeline import iterate_in_thread
+from app.services.scanner import (
+    FileInfo, RepositoryScanner, assign_workspaces, count_files, split_by_workspace, without_paths
+)
+from app.services.detector import DetectionResult, GitTreeDetector, LanguageDetector
+from app.services.sniffer import SkipReason
+from app.services.git_objects import GitObjectReader, list_tree
+from app.services.progress import IngestStage, ProgressReporter
+from app.extractors.pool import ExtractionPool, should_use_pool
+from app.services.scheduler import FairShare, JobPriority, WorkerShare
 
 class IngestionService:
     def __init__(self):
         self.storage_path = settings.REPO_STORAGE_PATH
         os.makedirs(self.storage_path, exist_ok=True)
 
-    async def ingest_repo(self, repo_url: str) -> Dict[str, Any]:
+    async def ingest_repo(
+        self,
+        repo_url: str,
+        project_id: Optional[str] = None,
+        commit: Optional[str] = None,
+        graph=None,
+        progress: Optional[ProgressReporter] = None,
+        from_object_store: Optional[bool] = None,
+        share: Optional[WorkerShare] = None,
+        progressive: Optional[bool] = None
+    ) -> Dict[str, Any]:
         """
-        Clones a repo to a unique path and performs full analysis.
+        Checks out a repo (via the local mirror store) to a unique path and
+        performs full analysis.
         Returns the project_id (uuid) and analysis results.
+        
+        Args:
+            repo_url: Repository to clone
+            project_id: Existing project id (a new uuid is generated if omitted)
+            commit: Commit to ingest (default: the fetched remote HEAD)
+            graph: GraphService to write to (default: shared graph_service)
+            progress: Reporter for stage and per-file progress
+            from_object_store: Read blobs straight from the mirror instead of
+                checking out a worktree (default: settings.INGEST_FROM_OBJECT_STORE)
+            share: Fair share of an ingest worker's extraction pool
+            progressive: Write high-value files to the graph before the rest
+                (default: settings.INGEST_PROGRESSIVE)
         """
-        project_id = str(uuid.uuid4())
+        project_id = project_id or str(uuid.uuid4())
+        progress = progress or ProgressReporter()
         repo_path = os.path.join(self.storage_path, project_id)
+        if from_object_store is None:
+            from_object_store = settings.INGEST_FROM_OBJECT_STORE
+        git_dir = None
         
-        print(f"🔄 Cloning {repo_url} to {repo_path}")
-        try:
-            # Clone repository
-            git.Repo.clone_from(repo_url, repo_path)
+        async with repo_store.in_use(repo_url):
+            try:
+                progress.set_stage(IngestStage.CLONE)
+                if from_object_store:
+                    print(f"🔄 Reading {repo_url} from the mirror object store")
+                    git_dir = await repo_store.ensure_mirror_async(repo_url, progress.clone_progress)
+                    commit = (await run_git_async(
+                        "rev-parse", "--verify", f"{commit or 'HEAD'}^{{commit}}", cwd=git_dir
+                    )).strip()
+                    await repo_store.evict_async(keep=git_dir)
+                    detection_result, scanner, files = await asyncio.to_thread(
+                        self._scan_object_store, git_dir, commit, repo_path, progress
+                    )
+                else:
+                    # Fetch into the mirror and check out a worktree; replaces any
+                    # checkout left by a previous attempt of a retried job
+                    print(f"🔄 Checking out {repo_url} to {repo_path}")
+                    commit = await repo_store.checkout_async(
+                        repo_url, repo_path, commit, on_progress=progress.clone_progress
+                    )
+                    # Progressive runs order files up front, so they need the full scan
+                    stream = settings.SCAN_STREAMING and not (
+                        settings.INGEST_PROGRESSIVE if progressive is None else progressive
+                    )
+                    detection_result, scanner, files = await asyncio.to_thread(
+                        self._scan_checkout, repo_path, progress, stream
+                    )
             
-            # Phase 1: Language & Framework Detection
-            print(f"🔍 Detecting language and frameworks...")
-            detector = LanguageDetector(repo_path)
-            detection_result = detector.detect()
+                # Monorepos run one sub-job per workspace
+                workspaces = detection_result.workspaces if settings.MONOREPO_SPLIT_WORKSPACES else []
+                streamed = hasattr(files, "__aiter__")
+                groups = await self._group_files(scanner, files, workspaces)
             
-            print(f"✅ Detected: {detection_result.primary_language.value}")
-            print(f"📦 Frameworks: {[f.name for f in detection_result.frameworks]}")
+                print(f"✅ Detected: {detection_result.primary_language.value}")
+                print(f"📦 Frameworks: {[f.name for f in detection_result.frameworks]}")
+                if not streamed:
+                    self._report_scan(scanner, progress)
             
-            # Phase 2: File Scanning
-            print(f"📁 Scanning files...")
-            scanner = RepositoryScanner()
-            scanner.load_eonixignore(repo_path)
+                # Phase 3: Extraction
+                print(f"⚙️  Extracting architectural facts...")
+                # Files written by an earlier attempt at this commit are skipped
+                scope = ingest_scope(project_id, commit)
+                await self._process_workspaces(
+                    project_id, repo_path, groups, graph=graph, progress=progress,
+                    git_dir=git_dir, share=share, checkpoint_scope=scope, progressive=progressive
+                )
+                if streamed:
+                    self._report_scan(scanner, progress)
+            
+                # Remember the checkout so later runs can be incremental
+                project_store.save(ProjectState(
+                    project_id=project_id,
+                    repo_url=repo_url,
+                    repo_path=repo_path,
+                    last_commit=commit,
+                ))
+                project_store.save_workspaces(project_id, workspaces, commit)
+                checkpoint_store.clear(scope)
+
+                return {
+                    "project_id": project_id,
+                    "path": repo_path,
+                    "commit": commit,
+                    "primary_language": detection_result.primary_language.value,
+                    "frameworks": [f.name for f in detection_result.frameworks],
+                    "total_files": scanner.get_statistics().total_files,
+                    "confidence": detection_result.confidence.value,
+                    "is_monorepo": detection_result.is_monorepo,
+                    "workspaces": workspaces,
+                    "architecture_type": detection_result.architecture_type,
+                    "metrics": progress.progress.metrics,
+                    "status": "success"
+                }
+            except Exception as e:
+                # Cleanup on failure
+                if not from_object_store:
+                    await asyncio.to_thread(repo_store.remove_worktree, repo_path)
+                raise e
+
+    @staticmethod
+    def _scan_checkout(
+        repo_path: str,
+        progress: ProgressReporter,
+        stream: bool = False
+    ) -> Tuple[DetectionResult, RepositoryScanner, Union[list, AsyncIterator[FileInfo]]]:
+        """
+        Detect and scan a working tree on disk.
+        
+        With stream, a repository that is not split into workspaces is
+        scanned on a thread while the caller consumes the files, so
+        extraction starts before the walk ends. Streamed files are not
+        deduplicated up front; the content-addressed extraction cache
+        still parses identical files once.
+        
+        Returns:
+            (DetectionResult, scanner, FileInfo list or async stream)
+        """
+        # Phase 1: Language & Framework Detection
+        print(f"🔍 Detecting language and frameworks...")
+        progress.set_stage(IngestStage.DETECT)
+        detection_result = LanguageDetector(repo_path).detect()
+        
+        # Phase 2: File Scanning
+        print(f"📁 Scanning files...")
+        progress.set_stage(IngestStage.SCAN)
+        scanner = RepositoryScanner()
+        scanner.load_eonixignore(repo_path)
+        if stream and not (settings.MONOREPO_SPLIT_WORKSPACES and detection_result.workspaces):
+            files = iterate_in_thread(scanner.scan_iter(repo_path), settings.SCAN_STREAM_BUFFER, "scanner")
+        else:
             files = scanner.scan(repo_path)
-            scanner.print_statistics()
+        return detection_result, scanner, files
+    
+    @staticmethod
+    async def _group_files(
+        scanner: RepositoryScanner,
+        files: list,
+        workspaces: List[str]
+    ) -> Dict[Optional[str], list]:
+        """Split files by monorepo workspace, deduplicating each group"""
+        if hasattr(files, "__aiter__"):
+            return {None: files}
+        assign_workspaces(files, workspaces)
+        groups = split_by_workspace(files)
+        if settings.INGEST_DEDUP_FILES:
+            groups = {
+                workspace: await asyncio.to_thread(scanner.deduplicate, group)
+                for workspace, group in groups.items()
+            }
+        return groups
+    
+    @staticmethod
+    def _scan_object_store(
+        git_dir: str,
+        commit: str,
+        repo_path: str,
+        progress: ProgressReporter,
+        sniffed: Optional[Dict[str, Optional[SkipReason]]] = None
+    ) -> Tuple[DetectionResult, RepositoryScanner, list]:
+        """
+        Detect and scan a commit from its git tree without a checkout.
+        
+        Blobs are sniffed like files of a checkout; pass the same sniffed
+        dict for several commits to sniff each blob once.
+        
+        Returns:
+            (DetectionResult, scanner, blob-backed FileInfo list)
+        """
+        entries = list_tree(git_dir, commit)
+        with GitObjectReader(git_dir) as reader:
+            print(f"🔍 Detecting language and frameworks...")
+            progress.set_stage(IngestStage.DETECT)
+            detection_result = GitTreeDetector(repo_path, entries, reader).detect()
             
-            # Phase 3: Extraction
-            print(f"⚙️  Extracting architectural facts...")
-            await self.process_repo(project_id, repo_path, files)
+            print(f"📁 Scanning {len(entries)} tree entries...")
+            progress.set_stage(IngestStage.SCAN)
+            scanner = RepositoryScanner()
+            ignore_file = next((e for e in entries if e.path == ".eonixignore"), None)
+            if ignore_file is not None:
+                scanner.add_ignore_patterns(reader.read_text(ignore_file.sha))
+            files = scanner.scan_tree(repo_path, entries, reader, sniffed)
+        return detection_result, scanner, files
+
+    def _report_scan(self, scanner: RepositoryScanner, progress: ProgressReporter) -> None:
+        """Print scan statistics and attach them to the job"""
+        scanner.print_statistics()
+        progress.set_metrics("scan", self._scan_metrics(scanner))
+
+    @staticmethod
+    def _scan_metrics(scanner: RepositoryScanner) -> Dict[str, Any]:
+        stats = scanner.get_statistics()
+        return {
+            "total_files": stats.total_files,
+            "total_size_bytes": stats.total_size_bytes,
+            "duplicate_files": stats.duplicate_files,
+            "duplicate_bytes": stats.duplicate_bytes,
+            "dedup_ratio": round(stats.dedup_ratio, 4),
+            "skipped_files": len(stats.skipped_files),
+            "skipped_bytes": stats.skipped_bytes,
+            "skipped_by_reason": stats.skipped_by_reason,
+        }
 
+    async def ingest_incremental(
+        self,
+        project_id: str,
+        commit: Optional[str] = None,
+        graph=None,
+        progress: Optional[ProgressReporter] = None,
+        share: Optional[WorkerShare] = None
+    ) -> Dict[str, Any]:
+        """
+        Re-ingest only the files that changed since the last ingested commit.
+        
+        Fetches the project's existing checkout, diffs the last ingested commit
+        against the new one, deletes graph nodes of removed and modified files,
+        and re-extracts added and modified files.
+        
+        Args:
+            project_id: Project previously ingested with ingest_repo
+            commit: Commit to move to (default: the fetched remote HEAD)
+            graph: GraphService to write to (default: shared graph_service)
+            progress: Reporter for stage and per-file progress
+            share: Fair share of an ingest worker's extraction pool
+        """
+        if graph is None:
+            from app.services.graph_service import graph_service
+            graph = graph_service
+        progress = progress or ProgressReporter()
+        
+        state = project_store.get(project_id)
+        if state is None or not state.last_commit:
+            raise ValueError(f"Project {project_id} has no previous ingest to update")
+        
+        async with repo_store.in_use(state.repo_url):
+            progress.set_stage(IngestStage.CLONE)
+            mirror = await repo_store.ensure_mirror_async(state.repo_url, progress.clone_progress)
+            if repo_store.worktree_owner(state.repo_path) != mirror:
+                # Checkout was evicted or predates the mirror store: restore the old commit
+                await repo_store.checkout_async(
+                    state.repo_url, state.repo_path, state.last_commit, fetch=False
+                )
+            new_commit = (await run_git_async(
+                "rev-parse", "--verify", f"{commit or 'HEAD'}^{{commit}}", cwd=mirror
+            )).strip()
+        
+            if new_commit == state.last_commit:
+                print(f"✅ {project_id} already at {new_commit[:12]}")
+                progress.set_stage(IngestStage.DONE)
+                return {"project_id": project_id, "commit": new_commit, "status": "unchanged"}
+        
+            print(f"🔀 Diffing {state.last_commit[:12]}..{new_commit[:12]}")
+            changed, removed = await asyncio.to_thread(
+                self._diff_commits, state.repo_path, state.last_commit, new_commit
+            )
+            await run_git_async(
+                "checkout", "--force", "--detach", new_commit,
+                cwd=state.repo_path, timeout=settings.CLONE_TIMEOUT_SECONDS
+            )
+        
+            # Modified files are deleted too, so nodes that disappeared from them go away.
+            # Files rewritten by an earlier attempt of this update are already current.
+            progress.set_stage(IngestStage.SCAN)
+            scope = ingest_scope(project_id, new_commit, state.last_commit)
+            rewritten = checkpoint_store.completed(scope)
+            stale_paths = [
+                path for path in (os.path.join(state.repo_path, p) for p in changed + removed)
+                if path not in rewritten
+            ]
+            await graph.delete_file_nodes(project_id, stale_paths)
+        
+            workspaces = list(project_store.workspaces(project_id))
+            scanner, files = await asyncio.to_thread(
+                self._scan_changed, state.repo_path, changed, workspaces
+            )
+            progress.set_metrics("scan", self._scan_metrics(scanner))
+            print(f"📁 {count_files(files)} changed files to extract, {len(removed)} removed")
+        
+            await self.process_repo(
+                project_id, state.repo_path, files, graph=graph, progress=progress,
+                share=share, checkpoint_scope=scope
+            )
+        
+            state.last_commit = new_commit
+            project_store.save(state)
+            project_store.save_workspaces(project_id, workspaces, new_commit)
+            checkpoint_store.clear(scope)
+        
             return {
                 "project_id": project_id,
-                "path": repo_path,
-                "primary_language": detection_result.primary_language.value,
-                "frameworks": [f.name for f in detection_result.frameworks],
-                "total_files": len(files),
-                "confidence": detection_result.confidence.value,
-                "is_monorepo": detection_result.is_monorepo,
-                "architecture_type": detection_result.architecture_type,
+                "commit": new_commit,
+                "files_extracted": count_files(files),
+                "files_removed": len(removed),
+                "metrics": progress.progress.metrics,
                 "status": "success"
             }
-        except Exception as e:
-            # Cleanup on failure
-            if os.path.exists(repo_path):
-                shutil.rmtree(repo_path)
-            raise e
-
-    async def process_repo(self, project_id: str, repo_path: str, files: list):
-        """Process repository files and extract facts"""
-        from app.extractors.manager import extraction_manager
-        from app.services.graph_service import graph_service
-        
-        total_files = len(files)
-        processed = 0
-        
-        for file_info in files:
-            # Extract architectural facts
-            result = extraction_manager.extract_file(file_info.path)
-            
-            # Save to Graph (Async)
-            if result and result.nodes:
-                await graph_service.save_extraction_result(project_id, result)
-            
-            processed += 1
-            if processed % 10 == 0:
-                print(f"  Progress: {processed}/{total_files} files processed")
+
+    @staticmethod
+    def _scan_changed(
+        repo_path: str,
+        changed: List[str],
+        workspaces: List[str]
+    ) -> Tuple[RepositoryScanner, list]:
+        """
+        Scan the files an update changed (runs on a thread).
+        
+        Returns:
+            (scanner, FileInfo list tagged with workspaces and deduplicated)
+        """
+        scanner = RepositoryScanner()
+        scanner.load_eonixignore(repo_path)
+        files = scanner.scan_paths(repo_path, changed)
+        assign_workspaces(files, workspaces)
+        if settings.INGEST_DEDUP_FILES:
+            files = scanner.deduplicate(files)
+        return scanner, files
+
+    @staticmethod
+    def _scan_workspace(repo_path: str, workspace: str, workspaces: List[str]) -> list:
+        """
+        Scan one workspace, leaving out nested workspaces (runs on a thread).
+        
+        Returns:
+            Deduplicated FileInfo list of the workspace's own files
+        """
+        scanner = RepositoryScanner()
+        scanner.load_eonixignore(repo_path)
+        files = scanner.scan(repo_path, subdir=workspace)
+        assign_workspaces(files, workspaces)
+        # Nested workspaces are ingested on their own
+        files = [f for f in files if f.workspace == workspace]
+        if settings.INGEST_DEDUP_FILES:
+            files = scanner.deduplicate(files)
+        return files
+
+    @staticmethod
+    def _diff_commits(repo_path: str, old_commit: str, new_commit: str) -> Tuple[List[str], List[str]]:
+        """
+        Files changed between two commits.
+        
+        Returns:
+            (added or modified paths, deleted paths), relative to the repo root
+        """
+        output = run_git(
+            "diff", "--name-status", "--no-renames", "-z", old_commit, new_commit,
+            cwd=repo_path
+        )
+        fields = [f for f in output.split("\0") if f]
+        changed, removed = [], []
+        for status, path in zip(fields[0::2], fields[1::2]):
+            if status.startswith("D"):
+                removed.append(path)
+            else:
+                changed.append(path)
+        return changed, removed
+
+    async def process_repo(
+        self,
+        project_id: str,
+        repo_path: str,
+        files: list,
+        graph=None,
+        progress: Optional[ProgressReporter] = None,
+        git_dir: Optional[str] = None,
+        share: Optional[WorkerShare] = None,
+        checkpoint_scope: Optional[str] = None,
+        workspace: Optional[str] = None,
+        progressive: Optional[bool] = None
+    ):
+        """
+        Process repository files and extract facts.
+        
+        Files carrying a blob_sha are read from git_dir's object store.
+        With a checkpoint_scope, files are checkpointed once written to the
+        graph, and files already checkpointed in that scope are skipped.
+        Several calls may share one progress reporter (e.g. one per
+        monorepo workspace); totals add up. A progressive run writes
+        high-value files (routes, controllers, models) before the rest
+        (default: settings.INGEST_PROGRESSIVE).
+        
+        files may also be an async stream (e.g. a scan still in progress);
+        the total then grows as files arrive.
+        """
+        from app.services.pipeline import IngestionPipeline
+        
+        if progressive is None:
+            progressive = settings.INGEST_PROGRESSIVE
+        progress = progress or ProgressReporter()
+        label = f"[{workspace}] " if workspace else ""
+        completed = checkpoint_store.completed(checkpoint_scope) if checkpoint_scope else set()
         
-        print(f"✅ Extraction complete: {processed} files processed")
+        if hasattr(files, "__aiter__"):
+            files = self._count_stream(files, progress, completed, label)
+        else:
+            total_files = count_files(files)
+            progress.add_total(total_files)
+            if completed:
+                files = without_paths(files, completed)
+                resumed = total_files - count_files(files)
+                print(f"⏩ {label}Resuming: {resumed}/{total_files} files already written")
+                progress.resume(resumed)
+        
+        progress.set_stage(IngestStage.EXTRACT)
+        
+        def report(file_path, result):
+            progress.file_done(file_path, result)
+            if pipeline.stats.files_extracted % 10 == 0:
+                print(f"  {label}Progress: {pipeline.stats.files_extracted}/"
+                      f"{progress.progress.files_total} files processed")
+        
+        def written(paths):
+            progress.batch_written(paths)
+            if checkpoint_scope:
+                checkpoint_store.mark_done(checkpoint_scope, paths)
+        
+        def quick_look():
+            files_first = pipeline.stats.quick_look_files
+            seconds = round(pipeline.stats.quick_look_seconds, 3)
+            print(f"👀 {label}Quick look ready: {files_first} high-value files written in {seconds}s")
+            progress.set_metrics(
+                f"quick_look[{workspace}]" if workspace else "quick_look",
+                {"files": files_first, "seconds": seconds}
+            )
+        
+        # Extraction and graph writes run concurrently through bounded queues
+        pipeline = IngestionPipeline(
+            project_id,
+            graph=graph,
+            git_dir=git_dir,
+            share=share,
+            on_file_done=report,
+            on_extract_complete=lambda: progress.set_stage(IngestStage.SAVE),
+            on_batch_written=written,
+            progressive=progressive,
+            on_quick_look=quick_look
+        )
+        stats = await pipeline.run(files)
+        if stats.pool_metrics is not None:
+            pool_metrics = stats.pool_metrics.to_dict()
+            progress.set_metrics(
+                f"extraction_pool[{workspace}]" if workspace else "extraction_pool", pool_metrics
+            )
+            print(f"⚖️  {label}Pool load balance {pool_metrics['load_balance']}, "
+                  f"p95 task {pool_metrics['task_seconds_p95']}s, tail {pool_metrics['tail_seconds']}s")
+        
+        print(f"✅ {label}Extraction complete: {stats.files_extracted} files processed")
+        return stats
+
+    @staticmethod
+    async def _count_stream(
+        files: AsyncIterable[FileInfo],
+        progress: ProgressReporter,
+        completed: Collection[str],
+        label: str = ""
+    ) -> AsyncIterator[FileInfo]:
+        """
+        Add streamed files to the job total, skipping those already checkpointed.
+        
+        Streamed files are not deduplicated, so each one is a single path.
+        """
+        total_files = resumed = 0
+        async for file_info in files:
+            total_files += 1
+            progress.add_total(1, force=False)
+            if file_info.path in completed:
+                resumed += 1
+                progress.resume(1, force=False)
+                continue
+            yield file_info
+        if resumed:
+            print(f"⏩ {label}Resuming: {resumed}/{total_files} files already written")
+    
+    async def _process_workspaces(
+        self,
+        project_id: str,
+        repo_path: str,
+        groups: Dict[Optional[str], list],
+        graph=None,
+        progress: Optional[ProgressReporter] = None,
+        git_dir: Optional[str] = None,
+        share: Optional[WorkerShare] = None,
+        checkpoint_scope: Optional[str] = None,
+        progressive: Optional[bool] = None
+    ) -> None:
+        """
+        Run one pipeline per monorepo workspace, several at once.
+        
+        Workspaces split the job's extraction capacity through a FairShare,
+        so a large workspace cannot starve the small ones; files outside
+        every workspace run as their own group.
+        """
+        progress = progress or ProgressReporter()
+        if len(groups) <= 1:
+            for workspace, files in groups.items():
+                await self.process_repo(
+                    project_id, repo_path, files, graph=graph, progress=progress,
+                    git_dir=git_dir, share=share, checkpoint_scope=checkpoint_scope,
+                    workspace=workspace, progressive=progressive
+                )
+            return
+        
+        pool = share.pool if share is not None else None
+        owns_pool = False
+        total = sum(count_files(files) for files in groups.values())
+        if pool is None and should_use_pool(total):
+            pool = ExtractionPool()
+            pool.start()
+            owns_pool = True
+        capacity = share.max_in_flight() if share is not None else (pool.max_workers * 2 if pool else 1)
+        fair_share = FairShare(capacity)
+        limit = asyncio.Semaphore(max(1, settings.MONOREPO_PARALLEL_WORKSPACES))
+        summary: Dict[str, Dict[str, Any]] = {}
+        
+        async def run(workspace: Optional[str], files: list) -> None:
+            key = workspace or "."
+            async with limit:
+                fair_share.join(key, ".", JobPriority.NORMAL)
+                started = time.perf_counter()
+                try:
+                    stats = await self.process_repo(
+                        project_id, repo_path, files, graph=graph, progress=progress,
+                        git_dir=git_dir,
+                        share=WorkerShare(pool, fair_share, key) if pool is not None else None,
+                        checkpoint_scope=checkpoint_scope, workspace=workspace,
+                        progressive=progressive
+                    )
+                finally:
+                    fair_share.leave(key)
+            summary[key] = {
+                "files": count_files(files),
+                "seconds": round(time.perf_counter() - started, 3),
+                "errors": len(stats.errors),
+            }
+        
+        print(f"🧩 Ingesting {len(groups)} workspaces")
+        try:
+            outcomes = await asyncio.gather(
+                *(run(workspace, files) for workspace, files in groups.items()),
+                return_exceptions=True
+            )
+        finally:
+            if owns_pool:
+                pool.shutdown()
+        progress.set_metrics("workspaces", summary)
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+
+    async def ingest_workspace(
+        self,
+        project_id: str,
+        workspace: str,
+        commit: Optional[str] = None,
+        graph=None,
+        progress: Optional[ProgressReporter] = None,
+        share: Optional[WorkerShare] = None
+    ) -> Dict[str, Any]:
+        """
+        Re-ingest a single monorepo workspace.
+        
+        Moves the project's checkout to commit, replaces the workspace's
+        nodes and leaves every other workspace untouched.
+        
+        Args:
+            project_id: Project previously ingested with ingest_repo
+            workspace: Workspace directory, e.g. "packages/api"
+            commit: Commit to move to (default: the fetched remote HEAD)
+            graph: GraphService to write to (default: shared graph_service)
+            progress: Reporter for stage and per-file progress
+            share: Fair share of an ingest worker's extraction pool
+        """
+        if graph is None:
+            from app.services.graph_service import graph_service
+            graph = graph_service
+        progress = progress or ProgressReporter()
+        
+        state = project_store.get(project_id)
+        if state is None or not state.last_commit:
+            raise ValueError(f"Project {project_id} has no previous ingest to update")
+        
+        async with repo_store.in_use(state.repo_url):
+            progress.set_stage(IngestStage.CLONE)
+            mirror = await repo_store.ensure_mirror_async(state.repo_url, progress.clone_progress)
+            if repo_store.worktree_owner(state.repo_path) != mirror:
+                await repo_store.checkout_async(
+                    state.repo_url, state.repo_path, state.last_commit, fetch=False
+                )
+            new_commit = (await run_git_async(
+                "rev-parse", "--verify", f"{commit or 'HEAD'}^{{commit}}", cwd=mirror
+            )).strip()
+            await run_git_async(
+                "checkout", "--force", "--detach", new_commit,
+                cwd=state.repo_path, timeout=settings.CLONE_TIMEOUT_SECONDS
+            )
+        
+            progress.set_stage(IngestStage.DETECT)
+            detection_result = await asyncio.to_thread(LanguageDetector(state.repo_path).detect)
+            workspaces = detection_result.workspaces
+            if workspace not in workspaces:
+                raise ValueError(f"{workspace} is not a workspace of {project_id} at {new_commit[:12]}")
+        
+            progress.set_stage(IngestStage.SCAN)
+            files = await asyncio.to_thread(
+                self._scan_workspace, state.repo_path, workspace, workspaces
+            )
+        
+            workspace_dir = os.path.join(state.repo_path, *workspace.split("/"))
+            await graph.delete_workspace_nodes(project_id, workspace, workspace_dir)
+            print(f"🧩 Re-ingesting {workspace}: {count_files(files)} files at {new_commit[:12]}")
+        
+            scope = f"{ingest_scope(project_id, new_commit)}#{workspace}"
+            await self.process_repo(
+                project_id, state.repo_path, files, graph=graph, progress=progress,
+                share=share, checkpoint_scope=scope, workspace=workspace
+            )
+            project_store.save_workspaces(project_id, [workspace], new_commit)
+            checkpoint_store.clear(scope)
+        
+            return {
+                "project_id": project_id,
+                "workspace": workspace,
+                "commit": new_commit,
+                "files_extracted": count_files(files),
+                "metrics": progress.progress.metrics,
+                "status": "success"
+            }
+
+    
+    async def ingest_local(
+        self,
+        path: str,
+        project_id: Optional[str] = None,
+        graph=None,
+        progress: Optional[ProgressReporter] = None,
+        share: Optional[WorkerShare] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze a repository that is already mounted, in place.
+        
+        Nothing is cloned or copied, and the directory does not have to be
+        a git repository. Only paths under LOCAL_INGEST_ROOTS are allowed.
+        
+        Args:
+            path: Directory to analyze
+            project_id: Existing project id (a new uuid is generated if omitted)
+            graph: GraphService to write to (default: shared graph_service)
+            progress: Reporter for stage and per-file progress
+            share: Fair share of an ingest worker's extraction pool
+        """
+        project_id = project_id or str(uuid.uuid4())
+        progress = progress or ProgressReporter()
+        repo_path = resolve_local_path(path)
+        print(f"📂 Analyzing {repo_path} in place")
+        
+        detection_result, scanner, files = await asyncio.to_thread(
+            self._scan_checkout,
+            repo_path, progress, settings.SCAN_STREAMING and not settings.INGEST_PROGRESSIVE
+        )
+        workspaces = detection_result.workspaces if settings.MONOREPO_SPLIT_WORKSPACES else []
+        streamed = hasattr(files, "__aiter__")
+        groups = await self._group_files(scanner, files, workspaces)
+        if not streamed:
+            self._report_scan(scanner, progress)
+        
+        await self._process_workspaces(
+            project_id, repo_path, groups, graph=graph, progress=progress, share=share
+        )
+        if streamed:
+            self._report_scan(scanner, progress)
+        
+        return {
+            "project_id": project_id,
+            "path": repo_path,
+            "primary_language": detection_result.primary_language.value,
+            "frameworks": [f.name for f in detection_result.frameworks],
+            "total_files": scanner.get_statistics().total_files,
+            "confidence": detection_result.confidence.value,
+            "is_monorepo": detection_result.is_monorepo,
+            "workspaces": workspaces,
+            "architecture_type": detection_result.architecture_type,
+            "metrics": progress.progress.metrics,
+            "status": "success"
+        }
+    
+    async def ingest_archive(
+        self,
+        chunks: AsyncIterable[bytes],
+        project_id: Optional[str] = None,
+        strip_components: int = 0,
+        graph=None,
+        progress: Optional[ProgressReporter] = None,
+        share: Optional[WorkerShare] = None,
+        source: str = "upload"
+    ) -> Dict[str, Any]:
+        """
+        Ingest a source archive (.tar.gz, .tar, .zip, ...) while it streams in.
+        
+        Members go from the byte stream through the pipeline in memory;
+        nothing is unpacked to disk. Files are extracted in arrival order,
+        so there is no largest-first ordering, deduplication or workspace
+        split, and language detection runs once the whole archive is read.
+        
+        Args:
+            chunks: Archive bytes, e.g. a staged upload (archive.staged_chunks)
+            project_id: Existing project id (a new uuid is generated if omitted)
+            strip_components: Leading path components to drop from member paths
+            graph: GraphService to write to (default: shared graph_service)
+            progress: Reporter for stage and per-file progress
+            share: Fair share of an ingest worker's extraction pool
+            source: Recorded as the project's repo_url, e.g. "upload:<sha256>"
+        """
+        from app.services.archive import ArchiveSnapshot, read_members
+        from app.services.pipeline import IngestionPipeline
+        
+        project_id = project_id or str(uuid.uuid4())
+        progress = progress or ProgressReporter()
+        # Notional root: node IDs look like those of a checkout, but no file is written
+        repo_path = os.path.join(self.storage_path, project_id)
+        scanner = RepositoryScanner()
+        snapshot = ArchiveSnapshot()
+        
+        async def files():
+            async for member in read_members(chunks, scanner.accepts, strip_components):
+                snapshot.add(member)
+                if member.content is None:
+                    continue
+                file_info = scanner.scan_content(repo_path, member.path, member.content)
+                if file_info is not None:
+                    progress.add_total(1, force=False)
+                    yield file_info
+        
+        print(f"📦 Streaming archive into project {project_id}")
+        progress.set_stage(IngestStage.EXTRACT)
+        pipeline = IngestionPipeline(
+            project_id,
+            graph=graph,
+            share=share,
+            on_file_done=progress.file_done,
+            on_extract_complete=lambda: progress.set_stage(IngestStage.SAVE),
+        )
+        stats = await pipeline.run(files())
+        if stats.pool_metrics is not None:
+            progress.set_metrics("extraction_pool", stats.pool_metrics.to_dict())
+        
+        progress.set_stage(IngestStage.DETECT)
+        detection_result = snapshot.detector(repo_path).detect()
+        scanner.print_statistics()
+        progress.set_metrics("scan", self._scan_metrics(scanner))
+        print(f"✅ Archive extraction complete: {stats.files_extracted} of "
+              f"{len(snapshot.entries)} members processed")
+        # No commit: the project cannot be updated incrementally
+        project_store.save(ProjectState(project_id=project_id, repo_url=source, repo_path=repo_path))
+        
+        return {
+            "project_id": project_id,
+            "path": repo_path,
+            "primary_language": detection_result.primary_language.value,
+            "frameworks": [f.name for f in detection_result.frameworks],
+            "total_files": stats.files_extracted,
+            "archive_members": len(snapshot.entries),
+            "confidence": detection_result.confidence.value,
+            "is_monorepo": detection_result.is_monorepo,
+            "architecture_type": detection_result.architecture_type,
+            "metrics": progress.progress.metrics,
+            "status": "success"
+        }
+
 
 ingestion_service = IngestionService()
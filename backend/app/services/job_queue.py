@@ -0,0 +1,677 @@
+"""
+Durable ingestion job queue.
+Jobs are persisted in SQLite and claimed by standalone worker processes
+under a renewable lease, so a crashed worker's job is picked up again
+instead of being lost with the API process.
+"""
+
+import json
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.sqlite import LocalConnections, ensure_columns, transaction
+from app.services.scheduler import DEFAULT_TENANT, Candidate, JobPriority, pick_next
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the queue is saturated and a new job is not admitted"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class JobStatus(str, Enum):
+    """Lifecycle states of a job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """A unit of ingestion work"""
+    id: str
+    kind: str
+    project_id: str
+    payload: Dict[str, Any]
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = 0
+    max_attempts: int = 3
+    worker_id: Optional[str] = None
+    lease_expires_at: Optional[float] = None
+    error: Optional[str] = None
+    result: Dict[str, Any] = field(default_factory=dict)
+    progress: Dict[str, Any] = field(default_factory=dict)
+    tenant: str = DEFAULT_TENANT
+    priority: JobPriority = JobPriority.NORMAL
+    dedup_key: Optional[str] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "project_id": self.project_id,
+            "tenant": self.tenant,
+            "priority": self.priority.value,
+            "status": self.status.value,
+            "attempts": self.attempts,
+            "error": self.error,
+            "result": self.result,
+            "progress": self.progress,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+@dataclass
+class Batch:
+    """Jobs submitted together, e.g. every repository of an organization"""
+    id: str
+    tenant: str
+    items: List[Dict[str, Any]]  # repo_url, project_id, job_id, outcome, size_estimate
+    created_at: float = 0.0
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    project_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker_id TEXT,
+    lease_expires_at REAL,
+    error TEXT,
+    result TEXT NOT NULL DEFAULT '{}',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_idx ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_project_idx ON jobs (project_id, created_at);
+CREATE TABLE IF NOT EXISTS batches (
+    id TEXT PRIMARY KEY,
+    tenant TEXT NOT NULL,
+    items TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+# Columns added after the first schema version
+_MIGRATIONS = {
+    "progress": "TEXT NOT NULL DEFAULT '{}'",
+    "tenant": f"TEXT NOT NULL DEFAULT '{DEFAULT_TENANT}'",
+    "priority": f"TEXT NOT NULL DEFAULT '{JobPriority.NORMAL.value}'",
+    "dedup_key": "TEXT",
+}
+
+# Indexes on migrated columns
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS jobs_dedup_idx ON jobs (dedup_key, status);
+"""
+
+
+def _migrate(conn) -> None:
+    ensure_columns(conn, "jobs", _MIGRATIONS)
+    conn.executescript(_INDEXES)
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue shared by the API and ingest workers.
+
+    A worker claims a job by taking a lease. It must renew the lease with
+    heartbeat() while the job runs; once a lease expires, the job becomes
+    claimable again and is retried up to max_attempts times.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: SQLite database file (default: settings.JOB_QUEUE_PATH)
+        """
+        self.path = path or settings.JOB_QUEUE_PATH
+        self._conn = LocalConnections(self.path, _SCHEMA, _migrate).connection
+
+    def enqueue(
+        self,
+        kind: str,
+        project_id: str,
+        payload: Dict[str, Any],
+        max_attempts: Optional[int] = None,
+        tenant: Optional[str] = None,
+        priority: JobPriority = JobPriority.NORMAL,
+        dedup_key: Optional[str] = None
+    ) -> Job:
+        """
+        Persist a new job.
+
+        Args:
+            kind: Handler name, e.g. "ingest"
+            project_id: Project the job works on
+            payload: JSON-serializable job arguments
+            max_attempts: Retries before the job is marked failed
+            tenant: Team or customer the job is scheduled under
+            priority: Priority class used by the scheduler
+            dedup_key: Identity of the work, used to coalesce identical requests
+
+        Returns:
+            The queued Job
+        """
+        with self._conn() as conn:
+            return self._insert(
+                conn, kind, project_id, payload, max_attempts, tenant, priority, dedup_key
+            )
+
+    def enqueue_or_attach(
+        self,
+        kind: str,
+        project_id: str,
+        payload: Dict[str, Any],
+        dedup_key: str,
+        max_attempts: Optional[int] = None,
+        tenant: Optional[str] = None,
+        priority: JobPriority = JobPriority.NORMAL
+    ) -> Tuple[Job, bool]:
+        """
+        Single-flight enqueue: return the queued or running job with the same
+        dedup_key, or admit a new one if the queue has room.
+
+        Raises:
+            QueueFullError: No matching job is in flight and the queue is saturated
+
+        Returns:
+            (job, created) - created is False when attached to an existing job
+        """
+        tenant = tenant or DEFAULT_TENANT
+        with self._conn() as conn, transaction(conn):
+            row = conn.execute(
+                """
+                SELECT * FROM jobs WHERE dedup_key = ? AND status IN (?, ?)
+                ORDER BY created_at LIMIT 1
+                """,
+                (dedup_key, JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+            ).fetchone()
+            if row is not None:
+                return self._row_to_job(row), False
+
+            self._admit(conn, tenant)
+            job = self._insert(
+                conn, kind, project_id, payload, max_attempts, tenant, priority, dedup_key
+            )
+            return job, True
+
+    def check_admission(self, tenant: Optional[str] = None) -> None:
+        """
+        Fail early if a new job for tenant would be refused, e.g. before
+        accepting an upload that would only be queued afterwards.
+
+        Raises:
+            QueueFullError: The global or tenant backlog is full
+        """
+        with self._conn() as conn:
+            self._admit(conn, tenant or DEFAULT_TENANT)
+
+    def enqueue_many(
+        self,
+        entries: List[Dict[str, Any]],
+        tenant: Optional[str] = None,
+        priority: JobPriority = JobPriority.NORMAL
+    ) -> List[Tuple[Job, bool]]:
+        """
+        Single-flight enqueue of several jobs in one transaction.
+
+        The entries are admitted as a unit: the global backlog limit is
+        checked once, and the per-tenant backlog limit does not apply, so a
+        batch larger than TENANT_MAX_QUEUED_JOBS is not refused halfway.
+        Jobs are created in entry order, which is the order they are claimed in.
+
+        Args:
+            entries: Dicts with kind, project_id, payload and dedup_key
+
+        Raises:
+            QueueFullError: Some entry needs a new job and the queue is saturated
+
+        Returns:
+            (job, created) per entry
+        """
+        tenant = tenant or DEFAULT_TENANT
+        results: List[Tuple[Job, bool]] = []
+        admitted = False
+        with self._conn() as conn, transaction(conn):
+            for entry in entries:
+                row = conn.execute(
+                    """
+                    SELECT * FROM jobs WHERE dedup_key = ? AND status IN (?, ?)
+                    ORDER BY created_at LIMIT 1
+                    """,
+                    (entry["dedup_key"], JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+                ).fetchone()
+                if row is not None:
+                    results.append((self._row_to_job(row), False))
+                    continue
+                if not admitted:
+                    self._admit(conn, tenant, per_tenant=False)
+                    admitted = True
+                job = self._insert(
+                    conn, entry["kind"], entry["project_id"], entry["payload"], None,
+                    tenant, priority, entry["dedup_key"]
+                )
+                results.append((job, True))
+        return results
+
+    def save_batch(self, batch: Batch) -> None:
+        """Persist the membership of a batch"""
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO batches (id, tenant, items, created_at) VALUES (?, ?, ?, ?)",
+                (batch.id, batch.tenant, json.dumps(batch.items), batch.created_at or time.time())
+            )
+
+    def get_batch(self, batch_id: str) -> Optional[Batch]:
+        """Fetch a batch by id"""
+        with self._conn() as conn:
+            row = conn.execute("SELECT * FROM batches WHERE id = ?", (batch_id,)).fetchone()
+        if row is None:
+            return None
+        return Batch(
+            id=row["id"],
+            tenant=row["tenant"],
+            items=json.loads(row["items"]),
+            created_at=row["created_at"],
+        )
+
+    def batch_status(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Progress of a batch: job counts per status, files extracted across
+        its jobs, and the state of each repository.
+
+        Returns:
+            None if the batch does not exist
+        """
+        batch = self.get_batch(batch_id)
+        if batch is None:
+            return None
+        jobs = self.get_many([item["job_id"] for item in batch.items])
+
+        counts = {status.value: 0 for status in JobStatus}
+        files_done = files_total = 0
+        repos = []
+        for item in batch.items:
+            job = jobs.get(item["job_id"])
+            status = job.status.value if job else JobStatus.FAILED.value
+            counts[status] += 1
+            progress = job.progress if job else {}
+            if job is not None and job.status == JobStatus.SUCCEEDED:
+                # Reused and finished jobs count as fully extracted
+                total = progress.get("files_total") or job.result.get("files_extracted", 0)
+                done = total
+            else:
+                total = progress.get("files_total", 0)
+                done = progress.get("files_done", 0)
+            files_done += done
+            files_total += total
+            repos.append({
+                **item,
+                "status": status,
+                "stage": progress.get("stage"),
+                "files_done": done,
+                "files_total": total,
+                "error": job.error if job else "Job not found",
+            })
+
+        finished = counts[JobStatus.SUCCEEDED.value] + counts[JobStatus.FAILED.value]
+        return {
+            "batch_id": batch.id,
+            "tenant": batch.tenant,
+            "created_at": batch.created_at,
+            "total": len(batch.items),
+            "jobs": counts,
+            "finished": finished,
+            "done": finished == len(batch.items),
+            "files_done": files_done,
+            "files_total": files_total,
+            "repos": repos,
+        }
+
+    def latest_succeeded(self, dedup_key: str) -> Optional[Job]:
+        """Most recent successful job for a dedup_key"""
+        with self._conn() as conn:
+            row = conn.execute(
+                """
+                SELECT * FROM jobs WHERE dedup_key = ? AND status = ?
+                ORDER BY updated_at DESC LIMIT 1
+                """,
+                (dedup_key, JobStatus.SUCCEEDED.value)
+            ).fetchone()
+            return self._row_to_job(row) if row else None
+
+    def _admit(self, conn, tenant: str, per_tenant: bool = True) -> None:
+        """Reject new work when the global or (optionally) per-tenant backlog is full"""
+        queued = {
+            row["tenant"]: row["n"]
+            for row in conn.execute(
+                "SELECT tenant, COUNT(*) AS n FROM jobs WHERE status = ? GROUP BY tenant",
+                (JobStatus.QUEUED.value,)
+            )
+        }
+        if settings.INGEST_MAX_QUEUED_JOBS and \
+                sum(queued.values()) >= settings.INGEST_MAX_QUEUED_JOBS:
+            raise QueueFullError("Ingest queue is full", settings.INGEST_RETRY_AFTER_SECONDS)
+        if per_tenant and settings.TENANT_MAX_QUEUED_JOBS and \
+                queued.get(tenant, 0) >= settings.TENANT_MAX_QUEUED_JOBS:
+            raise QueueFullError(
+                f"Tenant {tenant} has too many queued jobs", settings.INGEST_RETRY_AFTER_SECONDS
+            )
+
+    def _insert(
+        self,
+        conn,
+        kind: str,
+        project_id: str,
+        payload: Dict[str, Any],
+        max_attempts: Optional[int],
+        tenant: Optional[str],
+        priority: JobPriority,
+        dedup_key: Optional[str]
+    ) -> Job:
+        now = time.time()
+        job = Job(
+            id=str(uuid.uuid4()),
+            kind=kind,
+            project_id=project_id,
+            payload=payload,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            tenant=tenant or DEFAULT_TENANT,
+            priority=JobPriority(priority),
+            dedup_key=dedup_key,
+            created_at=now,
+            updated_at=now,
+        )
+        conn.execute(
+            """
+            INSERT INTO jobs (id, kind, project_id, payload, status, max_attempts,
+                              tenant, priority, dedup_key, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (job.id, kind, project_id, json.dumps(payload), job.status.value,
+             job.max_attempts, job.tenant, job.priority.value, dedup_key, now, now)
+        )
+        return job
+
+    def claim(
+        self,
+        worker_id: str,
+        lease_seconds: Optional[float] = None,
+        min_priority: Optional[JobPriority] = None
+    ) -> Optional[Job]:
+        """
+        Atomically claim the next runnable job chosen by the scheduler.
+
+        Runnable means queued, or running with an expired lease (its worker died).
+        See scheduler.pick_next for the ordering and per-tenant caps.
+
+        Args:
+            worker_id: Identifier of the claiming worker
+            lease_seconds: How long the claim is valid without a heartbeat
+            min_priority: Only claim jobs of this class or more urgent
+
+        Returns:
+            The claimed Job, or None if nothing is runnable
+        """
+        lease_seconds = lease_seconds or settings.JOB_LEASE_SECONDS
+        now = time.time()
+        with self._conn() as conn, transaction(conn):
+            self._fail_exhausted(conn, now)
+            candidates = [
+                Candidate(
+                    job_id=row["id"],
+                    tenant=row["tenant"],
+                    priority=JobPriority(row["priority"]),
+                    created_at=row["created_at"],
+                )
+                for row in conn.execute(
+                    """
+                    SELECT id, tenant, priority, created_at FROM jobs
+                    WHERE status = ?
+                       OR (status = ? AND lease_expires_at < ?)
+                    """,
+                    (JobStatus.QUEUED.value, JobStatus.RUNNING.value, now)
+                )
+            ]
+            running = {
+                row["tenant"]: row["n"]
+                for row in conn.execute(
+                    """
+                    SELECT tenant, COUNT(*) AS n FROM jobs
+                    WHERE status = ? AND lease_expires_at >= ?
+                    GROUP BY tenant
+                    """,
+                    (JobStatus.RUNNING.value, now)
+                )
+            }
+            chosen = pick_next(candidates, running, now, min_priority)
+            if chosen is None:
+                return None
+
+            conn.execute(
+                """
+                UPDATE jobs
+                SET status = ?, worker_id = ?, lease_expires_at = ?,
+                    attempts = attempts + 1, updated_at = ?
+                WHERE id = ?
+                """,
+                (JobStatus.RUNNING.value, worker_id, now + lease_seconds, now, chosen.job_id)
+            )
+            return self._get(conn, chosen.job_id)
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: Optional[float] = None) -> bool:
+        """
+        Extend a running job's lease.
+
+        Returns:
+            False if the worker no longer owns the job
+        """
+        lease_seconds = lease_seconds or settings.JOB_LEASE_SECONDS
+        now = time.time()
+        with self._conn() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs SET lease_expires_at = ?, updated_at = ?
+                WHERE id = ? AND worker_id = ? AND status = ?
+                """,
+                (now + lease_seconds, now, job_id, worker_id, JobStatus.RUNNING.value)
+            )
+            return cursor.rowcount == 1
+
+    def complete(
+        self,
+        job_id: str,
+        result: Optional[Dict[str, Any]] = None,
+        worker_id: Optional[str] = None
+    ) -> bool:
+        """
+        Mark a running job as succeeded.
+
+        Args:
+            job_id: Finished job
+            result: Result to record
+            worker_id: When given, only complete the job if this worker still owns it
+
+        Returns:
+            False if the job is no longer running (or owned by worker_id),
+            e.g. after its lease expired and another worker reclaimed it
+        """
+        query = """
+            UPDATE jobs SET status = ?, result = ?, error = NULL,
+                            lease_expires_at = NULL, updated_at = ?
+            WHERE id = ? AND status = ?
+        """
+        params = [JobStatus.SUCCEEDED.value, json.dumps(result or {}), time.time(),
+                  job_id, JobStatus.RUNNING.value]
+        if worker_id is not None:
+            query += " AND worker_id = ?"
+            params.append(worker_id)
+        with self._conn() as conn:
+            return conn.execute(query, params).rowcount == 1
+
+    def fail(
+        self,
+        job_id: str,
+        error: str,
+        retry: bool = True,
+        worker_id: Optional[str] = None
+    ) -> bool:
+        """
+        Record a running job's failure, requeueing it while attempts remain.
+
+        Args:
+            job_id: Failed job
+            error: Error message to record
+            retry: Whether the failure is worth retrying
+            worker_id: When given, only fail the job if this worker still owns it
+
+        Returns:
+            False if the job is no longer running (or owned by worker_id)
+        """
+        with self._conn() as conn, transaction(conn):
+            job = self._get(conn, job_id)
+            if job is None:
+                return False
+            retryable = retry and job.attempts < job.max_attempts
+            status = JobStatus.QUEUED if retryable else JobStatus.FAILED
+            query = """
+                UPDATE jobs SET status = ?, error = ?, worker_id = NULL,
+                                lease_expires_at = NULL, updated_at = ?
+                WHERE id = ? AND status = ?
+            """
+            params = [status.value, error, time.time(), job_id, JobStatus.RUNNING.value]
+            if worker_id is not None:
+                query += " AND worker_id = ?"
+                params.append(worker_id)
+            return conn.execute(query, params).rowcount == 1
+
+    def update_progress(
+        self,
+        job_id: str,
+        progress: Dict[str, Any],
+        worker_id: Optional[str] = None
+    ) -> bool:
+        """
+        Store the latest progress snapshot of a job.
+
+        Args:
+            job_id: Job being reported on
+            progress: Snapshot to store
+            worker_id: When given, only update the job while this worker runs it
+
+        Returns:
+            False if the snapshot was not stored
+        """
+        query = "UPDATE jobs SET progress = ?, updated_at = ? WHERE id = ?"
+        params = [json.dumps(progress), time.time(), job_id]
+        if worker_id is not None:
+            query += " AND worker_id = ? AND status = ?"
+            params += [worker_id, JobStatus.RUNNING.value]
+        with self._conn() as conn:
+            return conn.execute(query, params).rowcount == 1
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Fetch a job by id"""
+        with self._conn() as conn:
+            return self._get(conn, job_id)
+
+    def get_many(self, job_ids: List[str]) -> Dict[str, Job]:
+        """Fetch several jobs by id"""
+        jobs: Dict[str, Job] = {}
+        with self._conn() as conn:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(job_ids), 500):
+                chunk = job_ids[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT * FROM jobs WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for row in rows:
+                    jobs[row["id"]] = self._row_to_job(row)
+        return jobs
+
+    def list_for_project(self, project_id: str) -> List[Job]:
+        """All jobs for a project, newest first"""
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE project_id = ? ORDER BY created_at DESC",
+                (project_id,)
+            ).fetchall()
+            return [self._row_to_job(row) for row in rows]
+
+    def latest_for_project(self, project_id: str) -> Optional[Job]:
+        """Most recently created job for a project"""
+        with self._conn() as conn:
+            row = conn.execute(
+                """
+                SELECT * FROM jobs WHERE project_id = ?
+                ORDER BY created_at DESC LIMIT 1
+                """,
+                (project_id,)
+            ).fetchone()
+            return self._row_to_job(row) if row else None
+
+    def _fail_exhausted(self, conn, now: float) -> None:
+        """Give up on abandoned jobs that have used every attempt"""
+        conn.execute(
+            """
+            UPDATE jobs SET status = ?, error = COALESCE(error, 'Worker lease expired'),
+                            updated_at = ?
+            WHERE status = ? AND lease_expires_at < ? AND attempts >= max_attempts
+            """,
+            (JobStatus.FAILED.value, now, JobStatus.RUNNING.value, now)
+        )
+
+    def _get(self, conn, job_id: str) -> Optional[Job]:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    @staticmethod
+    def _row_to_job(row) -> Job:
+        return Job(
+            id=row["id"],
+            kind=row["kind"],
+            project_id=row["project_id"],
+            payload=json.loads(row["payload"]),
+            status=JobStatus(row["status"]),
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            worker_id=row["worker_id"],
+            lease_expires_at=row["lease_expires_at"],
+            error=row["error"],
+            result=json.loads(row["result"]),
+            progress=json.loads(row["progress"]),
+            tenant=row["tenant"],
+            priority=JobPriority(row["priority"]),
+            dedup_key=row["dedup_key"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+
+
+def default_worker_id() -> str:
+    """hostname:pid identifier for a worker process"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+job_queue = JobQueue()
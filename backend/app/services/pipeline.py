@@ -0,0 +1,502 @@
+"""
+Streaming ingestion pipeline.
+Connects scan → extract → batch → graph write with bounded asyncio queues,
+so graph writes overlap extraction and memory stays flat regardless of repo size.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional,
+    Tuple, TypeVar, Union
+)
+
+from app.core.config import settings
+from app.extractors.pool import (
+    ExtractionPool, PoolMetrics, plan_chunks, resolve_worker_count, should_use_pool, stream_chunks
+)
+from app.schemas.uas import ExtractionResult, UASNode, DependencyEdge
+from app.services.git_objects import GitObjectReader
+from app.services.scanner import FileInfo, count_files, split_quick_look
+
+if TYPE_CHECKING:
+    from app.services.scheduler import WorkerShare
+
+
+# Marks the end of a stream between stages
+_DONE = object()
+
+# Marks the end of a progressive run's high-value files: write what is batched
+_FLUSH = object()
+
+T = TypeVar("T")
+
+
+async def iterate_in_thread(
+    iterator: Iterator[T],
+    buffer_size: int,
+    name: str = "producer"
+) -> AsyncIterator[T]:
+    """
+    Drive a blocking iterator on its own thread and yield its items.
+
+    At most buffer_size items wait for the consumer, so a slow consumer
+    pauses the producer instead of letting it run ahead. An exception
+    raised by the iterator is re-raised here. If the consumer stops early,
+    the producer stops at its next item and closes the iterator.
+
+    Args:
+        iterator: Blocking source, e.g. a directory walk or archive parser
+        buffer_size: Items handed over but not yet consumed
+        name: Name of the producer thread
+    """
+    items: queue.Queue = queue.Queue(maxsize=max(buffer_size, 1))
+    stopped = threading.Event()
+
+    def hand_over(item) -> bool:
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterator:
+                if not hand_over(item):
+                    return
+            end = _DONE
+        except BaseException as e:
+            end = e
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+        hand_over(end)
+
+    def take():
+        # Wakes up to notice a consumer that stopped (e.g. was cancelled)
+        # while this executor thread waited, instead of blocking forever
+        while not stopped.is_set():
+            try:
+                return items.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    threading.Thread(target=produce, name=name, daemon=True).start()
+    try:
+        while True:
+            # One thread hop per burst of ready items, not per item
+            batch = [await asyncio.to_thread(take)]
+            while True:
+                try:
+                    batch.append(items.get_nowait())
+                except queue.Empty:
+                    break
+            for item in batch:
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+    finally:
+        stopped.set()
+
+
+@dataclass
+class PipelineStats:
+    """Counters collected while the pipeline runs"""
+    files_total: int = 0
+    files_extracted: int = 0
+    nodes_written: int = 0
+    edges_written: int = 0
+    batches_written: int = 0
+    files_retargeted: int = 0  # Duplicate files whose result was copied instead of extracted
+    quick_look_files: int = 0  # High-value files a progressive run wrote first
+    quick_look_seconds: Optional[float] = None  # Run time until those files were in the graph
+    errors: List[str] = field(default_factory=list)
+    pool_metrics: Optional[PoolMetrics] = None  # Set when extraction ran on a process pool
+
+
+class IngestionPipeline:
+    """
+    Bounded, backpressured extraction-to-graph pipeline.
+
+    Stages:
+    1. Extract - files go to the process pool largest-first, small files
+                 grouped into chunks (or run in-process for small repos);
+                 each result is re-targeted to the file's duplicates
+    2. Batch   - per-file results are merged into graph-sized batches
+    3. Write   - batches are saved through GraphService
+
+    Each stage is joined by a bounded queue. When the graph writer falls
+    behind, the queues fill up and extraction stops submitting new files.
+
+    In progressive mode, high-value files (routes, controllers, models) are
+    extracted and written before any other file, so a first look at the
+    graph is possible long before the run finishes.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        graph=None,
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        git_dir: Optional[str] = None,
+        share: Optional["WorkerShare"] = None,
+        on_file_done: Optional[Callable[[str, ExtractionResult], None]] = None,
+        on_extract_complete: Optional[Callable[[], None]] = None,
+        on_batch_written: Optional[Callable[[List[str]], None]] = None,
+        progressive: bool = False,
+        on_quick_look: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Args:
+            project_id: Project the extracted nodes belong to
+            graph: GraphService used for writes (default: shared graph_service)
+            queue_size: Capacity of each inter-stage queue
+            batch_size: Nodes accumulated before a graph write
+            max_workers: Extraction worker processes
+            git_dir: Repository that blob-backed files (FileInfo.blob_sha)
+                are read from
+            share: Slice of a worker's shared extraction pool; when set, the
+                pool is used as-is and in-flight files follow its fair quota
+            on_file_done: Callback invoked after each file is extracted
+            on_extract_complete: Callback invoked once every file is extracted
+                and only graph writes remain
+            on_batch_written: Callback invoked with the paths of the files
+                whose nodes and edges were all just written (for checkpoints)
+            progressive: Extract and write high-value files first (ignored
+                for streamed files, whose order is fixed by the stream)
+            on_quick_look: Callback invoked once a progressive run's
+                high-value files are all in the graph
+        """
+        if graph is None:
+            from app.services.graph_service import graph_service
+            graph = graph_service
+
+        self.project_id = project_id
+        self.graph = graph
+        self.queue_size = queue_size or settings.PIPELINE_QUEUE_SIZE
+        self.batch_size = batch_size or settings.GRAPH_WRITE_BATCH_SIZE
+        self.max_workers = max_workers
+        self.git_dir = git_dir
+        self.share = share
+        self.on_file_done = on_file_done
+        self.on_extract_complete = on_extract_complete
+        self.on_batch_written = on_batch_written
+        self.progressive = progressive
+        self.on_quick_look = on_quick_look
+        self.stats = PipelineStats()
+        self._reader: Optional[GitObjectReader] = None
+        self._copies: Dict[str, List[str]] = {}  # Representative path -> paths of its duplicates
+        self._workspaces: Dict[str, str] = {}  # File path -> monorepo workspace
+        self._started = 0.0
+
+    async def run(self, files: Union[List[FileInfo], AsyncIterable[FileInfo]]) -> PipelineStats:
+        """
+        Stream files through extraction into the graph.
+
+        Args:
+            files: Files produced by RepositoryScanner, or an async stream of
+                files that arrive while the pipeline runs (e.g. archive
+                members). A stream is pulled only as fast as extraction
+                keeps up, so its producer is backpressured too.
+
+        Returns:
+            PipelineStats for the run
+        """
+        self._started = time.perf_counter()
+        streamed = hasattr(files, "__aiter__")
+        if streamed:
+            files = self._track(files)
+        else:
+            self._track_files(files)
+        extracted: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        batches: asyncio.Queue = asyncio.Queue(maxsize=2)
+
+        pool = None
+        owns_pool = False
+        if self.share is not None:
+            pool = self.share.pool
+        elif (resolve_worker_count(self.max_workers) > 1 if streamed
+              else should_use_pool(len(files), self.max_workers)):
+            pool = ExtractionPool(self.max_workers)
+            pool.start()
+            owns_pool = True
+        elif self.git_dir:
+            self._reader = GitObjectReader(self.git_dir)
+
+        stages = [
+            asyncio.create_task(self._extract_stage(files, extracted, pool)),
+            asyncio.create_task(self._batch_stage(extracted, batches)),
+            asyncio.create_task(self._write_stage(batches)),
+        ]
+        try:
+            await asyncio.gather(*stages)
+        except BaseException:
+            for stage in stages:
+                stage.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            raise
+        finally:
+            if owns_pool:
+                pool.shutdown()
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+        return self.stats
+
+    def _track_files(self, files: List[FileInfo]) -> None:
+        """Count files and note their copies and workspaces"""
+        self.stats.files_total += count_files(files)
+        for file_info in files:
+            if file_info.duplicates:
+                self._copies[file_info.path] = [d.path for d in file_info.duplicates]
+            for member in (file_info, *file_info.duplicates):
+                if member.workspace:
+                    self._workspaces[member.path] = member.workspace
+
+    async def _track(self, files: AsyncIterable[FileInfo]) -> AsyncIterator[FileInfo]:
+        """_track_files for files arriving from a stream"""
+        async for file_info in files:
+            self._track_files([file_info])
+            yield file_info
+
+    async def _extract_stage(
+        self,
+        files: Union[Iterable[FileInfo], AsyncIterable[FileInfo]],
+        out: asyncio.Queue,
+        pool: Optional[ExtractionPool]
+    ) -> None:
+        """Extract files, keeping at most a bounded number of tasks in flight"""
+        def max_in_flight() -> int:
+            if self.share is not None:
+                return self.share.max_in_flight()
+            return pool.max_workers * 2 if pool else 1
+
+        in_flight = set()
+
+        async def drain(return_when) -> None:
+            nonlocal in_flight
+            done, in_flight = await asyncio.wait(in_flight, return_when=return_when)
+            failure = None
+            for task in done:
+                try:
+                    results = task.result()
+                except Exception as e:
+                    # Deliver the rest of the batch before failing the stage
+                    failure = failure or e
+                    continue
+                # Blocks when downstream is full, which pauses submissions
+                for file_path, result in results:
+                    await out.put((file_path, result))
+                    for copy_path in self._copies.get(file_path, ()):
+                        self.stats.files_retargeted += 1
+                        await out.put((copy_path, self._retarget(result, file_path, copy_path)))
+            if failure is not None:
+                raise failure
+
+        try:
+            streamed = hasattr(files, "__aiter__")
+            progressive = self.progressive and not streamed
+            if progressive:
+                first, rest = split_quick_look(list(files))
+                self.stats.quick_look_files = count_files(first)
+                phases = [first, rest]
+            else:
+                phases = [files]
+
+            if pool is not None:
+                self.stats.pool_metrics = PoolMetrics()
+
+                def chunked(phase):
+                    if streamed:
+                        return stream_chunks(phase)
+                    return iter(plan_chunks(list(phase), pool.max_workers))
+
+                def extract(chunk):
+                    return self._extract_chunk(chunk, pool)
+            else:
+                def chunked(phase):
+                    return phase.__aiter__() if streamed else iter(phase)
+
+                extract = self._extract_one
+
+            for index, phase in enumerate(phases):
+                chunks = chunked(phase)
+                # Wait until under the fair quota (which shrinks when other jobs join)
+                # before pulling the next chunk, so a streamed source waits too
+                while True:
+                    while len(in_flight) >= max_in_flight() or any(task.done() for task in in_flight):
+                        await drain(asyncio.FIRST_COMPLETED)
+                    chunk = await self._next(chunks)
+                    if chunk is _DONE:
+                        break
+                    in_flight.add(asyncio.ensure_future(extract(chunk)))
+                if progressive and index == 0:
+                    # The rest only starts once every high-value file is extracted
+                    if in_flight:
+                        await drain(asyncio.ALL_COMPLETED)
+                    await out.put(_FLUSH)
+
+            last_submitted = time.perf_counter()
+            if in_flight:
+                await drain(asyncio.ALL_COMPLETED)
+            if self.stats.pool_metrics is not None:
+                self.stats.pool_metrics.tail_seconds = time.perf_counter() - last_submitted
+            await out.put(_DONE)
+        finally:
+            # A failed or cancelled stage must not leave extractions running unobserved
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+    @staticmethod
+    async def _next(items):
+        """Next item of a sync or async iterator, or _DONE when exhausted"""
+        if hasattr(items, "__anext__"):
+            try:
+                return await items.__anext__()
+            except StopAsyncIteration:
+                return _DONE
+        return next(items, _DONE)
+
+    async def _extract_chunk(
+        self,
+        chunk: List[FileInfo],
+        pool: ExtractionPool
+    ) -> List[Tuple[str, ExtractionResult]]:
+        items = [(f.path, self._source(f)) for f in chunk]
+        result = await pool.extract_chunk_async(items, self.git_dir)
+        self.stats.pool_metrics.record(result)
+        return result.results
+
+    def _source(self, file_info: FileInfo):
+        """What a worker extracts a file from: its content, its blob, or its path"""
+        if file_info.content is not None:
+            return file_info.content
+        return file_info.blob_sha if self.git_dir else None
+
+    async def _extract_one(self, file_info: FileInfo) -> List[Tuple[str, ExtractionResult]]:
+        return [await self._extract(file_info)]
+
+    async def _extract(self, file_info: FileInfo) -> Tuple[str, ExtractionResult]:
+        """Extract one file in-process, on the default thread pool"""
+        file_path = file_info.path
+        blob_sha = file_info.blob_sha if self.git_dir else None
+        loop = asyncio.get_running_loop()
+        if file_info.content is not None:
+            from app.extractors.manager import extraction_manager
+            future = loop.run_in_executor(
+                None, extraction_manager.extract_content, file_path, file_info.content
+            )
+        elif blob_sha:
+            future = loop.run_in_executor(None, self._extract_blob, file_path, blob_sha)
+        else:
+            from app.extractors.manager import extraction_manager
+            future = loop.run_in_executor(None, extraction_manager.extract_file, file_path)
+
+        timeout = settings.EXTRACTION_FILE_TIMEOUT_SECONDS
+        wait = timeout + settings.EXTRACTION_TIMEOUT_GRACE_SECONDS if timeout else None
+        try:
+            result = await asyncio.wait_for(future, wait)
+        except asyncio.TimeoutError:
+            # A thread cannot be killed, but the run stops waiting for it
+            print(f"⚠️  Extraction of {file_path} timed out")
+            result = ExtractionResult(
+                nodes=[],
+                edges=[],
+                confidence="LOW",
+                errors=[f"extraction timed out after {timeout:g}s"]
+            )
+        return file_path, result
+
+    @staticmethod
+    def _retarget(result: ExtractionResult, file_path: str, copy_path: str) -> ExtractionResult:
+        from app.extractors.manager import extraction_manager
+        return extraction_manager.retarget(result, file_path, copy_path)
+
+    def _extract_blob(self, file_path: str, sha: str) -> ExtractionResult:
+        """Read a blob through the pipeline's cat-file process and extract it in-process"""
+        from app.extractors.manager import extraction_manager
+        try:
+            content = self._reader.read_blob(sha)
+        except Exception as e:
+            print(f"⚠️  Error reading blob {sha} for {file_path}: {e}")
+            return ExtractionResult(nodes=[], edges=[], confidence="LOW", errors=[str(e)])
+        return extraction_manager.extract_content(file_path, content, content_hash=sha)
+
+    async def _batch_stage(self, inbox: asyncio.Queue, out: asyncio.Queue) -> None:
+        """Merge per-file results into write batches on file boundaries"""
+        nodes: List[UASNode] = []
+        edges: List[DependencyEdge] = []
+        paths: List[str] = []
+
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                break
+            if item is _FLUSH:
+                if paths:
+                    await out.put((ExtractionResult(nodes=nodes, edges=edges), paths))
+                    nodes, edges, paths = [], [], []
+                await out.put(_FLUSH)
+                continue
+
+            file_path, result = item
+            self.stats.files_extracted += 1
+            self.stats.errors.extend(f"{file_path}: {e}" for e in result.errors)
+            if self.on_file_done:
+                self.on_file_done(file_path, result)
+
+            workspace = self._workspaces.get(file_path)
+            if workspace is not None:
+                for node in result.nodes:
+                    node.workspace = workspace
+
+            # Keep each file's nodes and edges together so edges never
+            # reference nodes that have not been written yet
+            nodes.extend(result.nodes)
+            edges.extend(result.edges)
+            paths.append(file_path)
+            if len(nodes) >= self.batch_size or len(paths) >= self.batch_size:
+                await out.put((ExtractionResult(nodes=nodes, edges=edges), paths))
+                nodes, edges, paths = [], [], []
+
+        if self.on_extract_complete:
+            self.on_extract_complete()
+        if paths:
+            await out.put((ExtractionResult(nodes=nodes, edges=edges), paths))
+        await out.put(_DONE)
+
+    async def _write_stage(self, inbox: asyncio.Queue) -> None:
+        """Persist batches to the graph"""
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                break
+            if item is _FLUSH:
+                self.stats.quick_look_seconds = time.perf_counter() - self._started
+                if self.on_quick_look:
+                    self.on_quick_look()
+                continue
+
+            batch, paths = item
+            if batch.nodes or batch.edges:
+                await self.graph.save_extraction_result(self.project_id, batch)
+                self.stats.nodes_written += len(batch.nodes)
+                self.stats.edges_written += len(batch.edges)
+                self.stats.batches_written += 1
+            if self.on_batch_written:
+                self.on_batch_written(paths)
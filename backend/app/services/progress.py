@@ -0,0 +1,177 @@
+"""
+Ingestion progress tracking.
+Workers report stage changes and per-file completions; snapshots are
+persisted on the job so the API can serve status and live event streams.
+"""
+
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+
+class IngestStage(str, Enum):
+    """Stages of an ingestion job"""
+    QUEUED = "queued"
+    CLONE = "clone"
+    DETECT = "detect"
+    SCAN = "scan"
+    EXTRACT = "extract"
+    SAVE = "save"
+    DONE = "done"
+
+
+# Keep persisted progress small; the total error count is always reported
+MAX_REPORTED_ERRORS = 50
+
+
+@dataclass
+class JobProgress:
+    """Point-in-time progress of one job"""
+    stage: IngestStage = IngestStage.QUEUED
+    files_done: int = 0
+    files_total: int = 0
+    files_resumed: int = 0  # Completed by an earlier attempt of the job
+    files_written: int = 0  # In the graph, including resumed files
+    started_at: float = field(default_factory=time.time)
+    extract_started_at: Optional[float] = None
+    error_count: int = 0
+    errors: List[str] = field(default_factory=list)
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """Files extracted per second since extraction started"""
+        extracted = self.files_done - self.files_resumed
+        if not self.extract_started_at or extracted <= 0:
+            return 0.0
+        elapsed = time.time() - self.extract_started_at
+        return extracted / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated seconds until extraction finishes"""
+        rate = self.throughput
+        if not rate or not self.files_total:
+            return None
+        return max(self.files_total - self.files_done, 0) / rate
+
+    @property
+    def coverage_percent(self) -> float:
+        """Share of the job's files whose facts are already in the graph"""
+        if not self.files_total:
+            return 0.0
+        return min(100.0, 100.0 * self.files_written / self.files_total)
+
+    def to_dict(self) -> Dict[str, Any]:
+        eta = self.eta_seconds
+        return {
+            "stage": self.stage.value,
+            "files_done": self.files_done,
+            "files_total": self.files_total,
+            "files_resumed": self.files_resumed,
+            "files_written": self.files_written,
+            "coverage_percent": round(self.coverage_percent, 1),
+            "throughput_files_per_sec": round(self.throughput, 2),
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "elapsed_seconds": round(time.time() - self.started_at, 1),
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "metrics": self.metrics,
+        }
+
+
+class ProgressReporter:
+    """
+    Collects progress for a job and persists throttled snapshots to the queue.
+
+    Stage changes are written immediately; per-file updates at most once
+    per flush_interval seconds. Without a queue, progress is only kept in memory.
+    """
+
+    def __init__(
+        self,
+        queue=None,
+        job_id: Optional[str] = None,
+        flush_interval: float = 1.0,
+        worker_id: Optional[str] = None
+    ):
+        """
+        Args:
+            queue: JobQueue the job lives in (None for in-memory tracking)
+            job_id: Job being reported on
+            flush_interval: Minimum seconds between per-file writes
+            worker_id: Worker running the job; once it loses the job, its
+                snapshots are no longer stored
+        """
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.flush_interval = flush_interval
+        self.progress = JobProgress()
+        self._last_flush = 0.0
+
+    def set_stage(self, stage: IngestStage) -> None:
+        """Enter a new stage"""
+        self.progress.stage = stage
+        if stage == IngestStage.EXTRACT and self.progress.extract_started_at is None:
+            self.progress.extract_started_at = time.time()
+        self.flush()
+
+    def set_total(self, files_total: int) -> None:
+        """Record the number of files to extract"""
+        self.progress.files_total = files_total
+        self.flush()
+
+    def add_total(self, files: int, force: bool = True) -> None:
+        """Add files to extract (for jobs made of several pipelines, or as a scan streams in)"""
+        self.progress.files_total += files
+        self.flush(force=force)
+
+    def resume(self, files_done: int, force: bool = True) -> None:
+        """Credit files completed by an earlier attempt of the job"""
+        self.progress.files_resumed += files_done
+        self.progress.files_done += files_done
+        self.progress.files_written += files_done
+        self.flush(force=force)
+
+    def file_done(self, file_path: str, result=None) -> None:
+        """Record one extracted file (signature matches IngestionPipeline.on_file_done)"""
+        self.progress.files_done += 1
+        if result is not None and result.errors:
+            for error in result.errors:
+                self.error(f"{file_path}: {error}", flush=False)
+        self.flush(force=False)
+
+    def batch_written(self, paths: List[str]) -> None:
+        """Record files whose facts were written to the graph (signature matches on_batch_written)"""
+        self.progress.files_written += len(paths)
+        self.flush(force=False)
+
+    def clone_progress(self, phase: str, percent: int) -> None:
+        """Record clone/fetch transfer progress (signature matches repo_store.ProgressCallback)"""
+        self.progress.metrics["clone"] = {"phase": phase, "percent": percent}
+        self.flush(force=False)
+
+    def set_metrics(self, name: str, metrics: Dict[str, Any]) -> None:
+        """Attach a group of job metrics (e.g. extraction pool balance)"""
+        self.progress.metrics[name] = metrics
+        self.flush()
+
+    def error(self, message: str, flush: bool = True) -> None:
+        """Record an error without failing the job"""
+        self.progress.error_count += 1
+        if len(self.progress.errors) < MAX_REPORTED_ERRORS:
+            self.progress.errors.append(message)
+        if flush:
+            self.flush()
+
+    def flush(self, force: bool = True) -> None:
+        """Persist the current snapshot"""
+        if self.queue is None:
+            return
+        now = time.time()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        self.queue.update_progress(self.job_id, self.progress.to_dict(), worker_id=self.worker_id)
@@ -0,0 +1,115 @@
+"""
+Persistent per-project ingestion state.
+Remembers where each project is checked out and which commit was last
+ingested, so later runs can work incrementally.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+from app.core.config import settings
+from app.db.sqlite import LocalConnections
+
+
+@dataclass
+class ProjectState:
+    """Last known ingestion state of a project"""
+    project_id: str
+    repo_url: str
+    repo_path: str
+    last_commit: Optional[str] = None
+    updated_at: float = 0.0
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    project_id TEXT PRIMARY KEY,
+    repo_url TEXT NOT NULL,
+    repo_path TEXT NOT NULL,
+    last_commit TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS workspaces (
+    project_id TEXT NOT NULL,
+    workspace TEXT NOT NULL,
+    last_commit TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (project_id, workspace)
+);
+"""
+
+
+class ProjectStore:
+    """SQLite-backed project state shared by the API and ingest workers"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: SQLite database file (default: settings.PROJECT_STATE_PATH)
+        """
+        self.path = path or settings.PROJECT_STATE_PATH
+        self._conn = LocalConnections(self.path, _SCHEMA).connection
+
+    def get(self, project_id: str) -> Optional[ProjectState]:
+        """Fetch a project's state"""
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT * FROM projects WHERE project_id = ?", (project_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return ProjectState(
+            project_id=row["project_id"],
+            repo_url=row["repo_url"],
+            repo_path=row["repo_path"],
+            last_commit=row["last_commit"],
+            updated_at=row["updated_at"],
+        )
+
+    def save(self, state: ProjectState) -> None:
+        """Insert or replace a project's state"""
+        state.updated_at = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                """
+                INSERT INTO projects (project_id, repo_url, repo_path, last_commit, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (project_id) DO UPDATE SET
+                    repo_url = excluded.repo_url,
+                    repo_path = excluded.repo_path,
+                    last_commit = excluded.last_commit,
+                    updated_at = excluded.updated_at
+                """,
+                (state.project_id, state.repo_url, state.repo_path,
+                 state.last_commit, state.updated_at)
+            )
+
+    def workspaces(self, project_id: str) -> Dict[str, str]:
+        """Monorepo workspaces of a project and the commit each was last ingested at"""
+        with self._conn() as conn:
+            return {
+                row["workspace"]: row["last_commit"]
+                for row in conn.execute(
+                    "SELECT workspace, last_commit FROM workspaces WHERE project_id = ?",
+                    (project_id,)
+                )
+            }
+
+    def save_workspaces(self, project_id: str, workspaces: Iterable[str], commit: str) -> None:
+        """Record that workspaces were ingested at commit"""
+        now = time.time()
+        with self._conn() as conn:
+            conn.executemany(
+                """
+                INSERT INTO workspaces (project_id, workspace, last_commit, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (project_id, workspace) DO UPDATE SET
+                    last_commit = excluded.last_commit,
+                    updated_at = excluded.updated_at
+                """,
+                [(project_id, workspace, commit, now) for workspace in workspaces]
+            )
+
+
+project_store = ProjectStore()
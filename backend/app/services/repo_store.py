@@ -0,0 +1,634 @@
+"""
+Persistent mirror store for cloned repositories.
+Keeps one bare mirror per repository URL under REPO_STORAGE_PATH and
+materializes project checkouts as git worktrees, so repeat ingests only
+fetch new objects instead of cloning from scratch.
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import os
+import re
+import shutil
+import signal
+import subprocess
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+# Touched on every use; its mtime drives LRU eviction
+_LAST_USED_MARKER = "eonix-last-used"
+
+# "Receiving objects:  45% (450/1000), 1.20 MiB | 300.00 KiB/s"
+_PROGRESS_LINE = re.compile(r"^(?:remote: )?([A-Za-z][A-Za-z ]*):\s+(\d+)%")
+
+# Seconds between attempts to take a mirror lock held by another clone
+_LOCK_POLL_SECONDS = 0.1
+
+# Called with (phase, percent) as a clone or fetch advances
+ProgressCallback = Callable[[str, int], None]
+
+
+class GitCommandError(RuntimeError):
+    """A git subprocess exited with a non-zero status"""
+
+
+class GitTimeoutError(GitCommandError):
+    """A git subprocess ran past its timeout and was killed"""
+
+
+def run_git(
+    *args: str,
+    cwd: Optional[str] = None,
+    timeout: Optional[float] = None,
+    input: Optional[str] = None
+) -> str:
+    """Run a git command (with input on its stdin, if given) and return its stdout"""
+    result = subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        input=input,
+    )
+    if result.returncode != 0:
+        raise GitCommandError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def parse_progress(line: str):
+    """
+    Phase and percentage of a git --progress line.
+
+    Returns:
+        (phase, percent), or None for lines that are not progress
+    """
+    match = _PROGRESS_LINE.match(line.strip())
+    if match is None:
+        return None
+    return match.group(1).strip(), int(match.group(2))
+
+
+def _kill(proc: asyncio.subprocess.Process) -> None:
+    """Kill a git child together with the helpers it spawned (remote-https, index-pack)"""
+    if proc.returncode is not None:
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+async def run_git_async(
+    *args: str,
+    cwd: Optional[str] = None,
+    timeout: Optional[float] = None,
+    on_progress: Optional[ProgressCallback] = None
+) -> str:
+    """
+    Run a git command as an asyncio subprocess and return its stdout.
+
+    The event loop stays free while git runs. If the timeout expires or the
+    calling task is cancelled, the child and its process group are killed
+    before the error propagates.
+
+    Args:
+        args: git arguments; add --progress to clone/fetch for progress reports
+        cwd: Working directory
+        timeout: Seconds before the command is killed (None for no limit)
+        on_progress: Called with (phase, percent) whenever either changes
+
+    Raises:
+        GitTimeoutError: The command ran past the timeout
+        GitCommandError: The command exited with a non-zero status
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "git", *args,
+        cwd=cwd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
+    )
+    messages = deque(maxlen=20)
+    last = None
+
+    def handle(line: bytes) -> None:
+        nonlocal last
+        text = line.decode("utf-8", "replace").strip()
+        if not text:
+            return
+        update = parse_progress(text)
+        if update is None:
+            messages.append(text)
+        elif update != last:
+            last = update
+            if on_progress is not None:
+                on_progress(*update)
+
+    async def read_stderr() -> None:
+        # Progress lines are terminated by \r, everything else by \n
+        buffer = b""
+        while True:
+            chunk = await proc.stderr.read(4096)
+            if not chunk:
+                break
+            *lines, buffer = re.split(rb"[\r\n]", buffer + chunk)
+            for line in lines:
+                handle(line)
+        handle(buffer)
+
+    async def communicate() -> bytes:
+        stdout, _ = await asyncio.gather(proc.stdout.read(), read_stderr())
+        await proc.wait()
+        return stdout
+
+    try:
+        stdout = await asyncio.wait_for(communicate(), timeout)
+    except asyncio.TimeoutError:
+        _kill(proc)
+        await proc.wait()
+        raise GitTimeoutError(f"git {' '.join(args)} timed out after {timeout}s")
+    except BaseException:
+        # Cancelled: don't leave the clone running behind the job
+        _kill(proc)
+        await proc.wait()
+        raise
+    if proc.returncode != 0:
+        raise GitCommandError(f"git {' '.join(args)} failed: {' '.join(messages)}")
+    return stdout.decode("utf-8", "replace")
+
+
+def normalize_repo_url(repo_url: str) -> str:
+    """
+    Canonical form of a repository URL, so trivially different spellings
+    (trailing slash or .git, host case) identify the same repository.
+    """
+    url = repo_url.strip().rstrip("/")
+    if url.endswith(".git"):
+        url = url[:-len(".git")]
+    scheme, sep, rest = url.partition("://")
+    if sep:
+        host, slash, path = rest.partition("/")
+        url = f"{scheme.lower()}://{host.lower()}{slash}{path}"
+    return url
+
+
+def resolve_local_path(path: str) -> str:
+    """
+    Real path of an already mounted repository for a local-path ingest.
+
+    Raises:
+        PermissionError: The path is outside every LOCAL_INGEST_ROOTS directory
+        FileNotFoundError: The path is not a directory
+    """
+    real = os.path.realpath(path)
+    roots = [os.path.realpath(root) for root in settings.LOCAL_INGEST_ROOTS]
+    if not any(real == root or real.startswith(root.rstrip(os.sep) + os.sep) for root in roots):
+        raise PermissionError(f"{path} is not under an allowed local ingest root")
+    if not os.path.isdir(real):
+        raise FileNotFoundError(f"{path} is not a directory")
+    return real
+
+
+def resolve_remote_commit(repo_url: str, rev: str = "HEAD", timeout: float = 30) -> str:
+    """
+    Commit a remote ref points at, without fetching.
+
+    Args:
+        repo_url: Repository to query
+        rev: Ref name, or a full commit SHA (returned unchanged)
+        timeout: Seconds before giving up on the remote
+
+    Returns:
+        The commit SHA
+    """
+    if len(rev) == 40 and all(c in "0123456789abcdef" for c in rev.lower()):
+        return rev.lower()
+    output = run_git("ls-remote", repo_url, rev, f"{rev}^{{}}", timeout=timeout)
+    refs = {}
+    for line in output.splitlines():
+        sha, _, ref = line.partition("\t")
+        refs[ref] = sha
+    for ref in (rev, f"refs/heads/{rev}", f"refs/tags/{rev}"):
+        # Annotated tags are listed twice; "^{}" is the commit they point at
+        if f"{ref}^{{}}" in refs:
+            return refs[f"{ref}^{{}}"]
+        if ref in refs:
+            return refs[ref]
+    raise GitCommandError(f"{rev} not found in {repo_url}")
+
+
+class RepositoryStore:
+    """
+    Bare-mirror cache with worktree checkouts.
+
+    Layout:
+        <root>/mirrors/<url-hash>.git   bare mirror of each remote
+        <root>/mirrors/<url-hash>.lock  serializes fetches of one mirror
+        <root>/mirrors/<url-hash>.use   shared-locked by every job using the mirror
+
+    Mirrors can be shallow (--depth) and/or blob-less partial clones
+    (--filter=blob:none). When the mirrors exceed the disk quota, the
+    least-recently-used ones are evicted, together with their worktrees,
+    unless a job (in any worker process) is still using them.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        quota_bytes: Optional[int] = None,
+        depth: Optional[int] = None,
+        partial: Optional[bool] = None
+    ):
+        """
+        Args:
+            root: Storage root (default: settings.REPO_STORAGE_PATH)
+            quota_bytes: Disk quota for all mirrors (default: settings.REPO_MIRROR_QUOTA_BYTES)
+            depth: Shallow clone depth, 0 for full history (default: settings.CLONE_DEPTH)
+            partial: Blob-less partial clones (default: settings.CLONE_PARTIAL)
+        """
+        self.root = os.path.abspath(root or settings.REPO_STORAGE_PATH)
+        self.mirrors_dir = os.path.join(self.root, "mirrors")
+        self.quota_bytes = quota_bytes or settings.REPO_MIRROR_QUOTA_BYTES
+        self.depth = settings.CLONE_DEPTH if depth is None else depth
+        self.partial = settings.CLONE_PARTIAL if partial is None else partial
+        # Mirror -> (last-used mtime, size); a mirror is only re-measured once used again
+        self._sizes: Dict[str, Tuple[float, int]] = {}
+
+    def mirror_path(self, repo_url: str) -> str:
+        """
+        Location of the bare mirror for a repository URL.
+
+        Keyed by the normalized URL, so every spelling that admission treats
+        as the same repository shares one mirror.
+        """
+        key = hashlib.sha1(normalize_repo_url(repo_url).encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.mirrors_dir, f"{key}.git")
+
+    def mirror_size(self, repo_url: str) -> Optional[int]:
+        """Disk size of a repository's mirror, or None if it has not been cloned"""
+        mirror = self.mirror_path(repo_url)
+        if not os.path.isdir(mirror):
+            return None
+        return self._dir_size(mirror)
+
+    def _lock_path(self, mirror: str) -> str:
+        os.makedirs(self.mirrors_dir, exist_ok=True)
+        return mirror[:-len(".git")] + ".lock"
+
+    @contextmanager
+    def _locked(self, mirror: str):
+        with open(self._lock_path(mirror), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _use_path(self, mirror: str) -> str:
+        os.makedirs(self.mirrors_dir, exist_ok=True)
+        return mirror[:-len(".git")] + ".use"
+
+    @staticmethod
+    @contextmanager
+    def _try_locked(lock_path: str):
+        """Take an exclusive flock, yielding False at once instead of waiting if it is busy"""
+        with open(lock_path, "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @asynccontextmanager
+    async def _locked_async(self, mirror: str):
+        """Like _locked, but waits for the lock without blocking the event loop"""
+        with open(self._lock_path(mirror), "w") as lock:
+            while True:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    await asyncio.sleep(_LOCK_POLL_SECONDS)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @asynccontextmanager
+    async def in_use(self, repo_url: str):
+        """
+        Keep a repository's mirror and its worktrees from being evicted.
+
+        Held for a whole job (clone, scan, extraction), not just the fetch
+        and checkout the mirror lock covers. Any number of jobs can hold it
+        at once; eviction skips the mirror while one does.
+
+        Yields:
+            Path to the (possibly not yet cloned) mirror
+        """
+        mirror = self.mirror_path(repo_url)
+        with open(self._use_path(mirror), "a") as lock:
+            while True:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_SH | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    # Being evicted; the clone that follows recreates it
+                    await asyncio.sleep(_LOCK_POLL_SECONDS)
+            try:
+                yield mirror
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _clone_args(self) -> List[str]:
+        args = []
+        if self.depth:
+            args.append(f"--depth={self.depth}")
+        if self.partial:
+            args.append("--filter=blob:none")
+        return args
+
+    def ensure_mirror(self, repo_url: str) -> str:
+        """
+        Create the mirror on first use, otherwise fetch new objects into it.
+
+        Returns:
+            Path to the bare mirror
+        """
+        mirror = self.mirror_path(repo_url)
+        with self._locked(mirror):
+            if os.path.isdir(mirror):
+                print(f"🔄 Fetching {repo_url} into mirror")
+                run_git("fetch", "--prune", *self._clone_args(), "origin", cwd=mirror)
+            else:
+                print(f"📥 Cloning mirror of {repo_url}")
+                tmp = mirror + ".tmp"
+                if os.path.exists(tmp):
+                    shutil.rmtree(tmp)
+                run_git("clone", "--mirror", *self._clone_args(), repo_url, tmp)
+                os.rename(tmp, mirror)
+            self._touch(mirror)
+        return mirror
+
+    async def ensure_mirror_async(
+        self,
+        repo_url: str,
+        on_progress: Optional[ProgressCallback] = None,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        ensure_mirror() as a cancellable asyncio subprocess.
+
+        A clone that times out or is cancelled is killed and its partial
+        mirror removed; an interrupted fetch leaves the mirror as it was.
+
+        Args:
+            repo_url: Repository to clone or fetch
+            on_progress: Called with (phase, percent) as objects are transferred
+            timeout: Seconds before git is killed (default: settings.CLONE_TIMEOUT_SECONDS)
+
+        Returns:
+            Path to the bare mirror
+        """
+        mirror = self.mirror_path(repo_url)
+        timeout = timeout or settings.CLONE_TIMEOUT_SECONDS
+        async with self._locked_async(mirror):
+            if os.path.isdir(mirror):
+                print(f"🔄 Fetching {repo_url} into mirror")
+                await run_git_async(
+                    "fetch", "--progress", "--prune", *self._clone_args(), "origin",
+                    cwd=mirror, timeout=timeout, on_progress=on_progress
+                )
+            else:
+                print(f"📥 Cloning mirror of {repo_url}")
+                tmp = mirror + ".tmp"
+                if os.path.exists(tmp):
+                    await asyncio.to_thread(shutil.rmtree, tmp)
+                try:
+                    await run_git_async(
+                        "clone", "--mirror", "--progress", *self._clone_args(), repo_url, tmp,
+                        timeout=timeout, on_progress=on_progress
+                    )
+                except BaseException:
+                    shutil.rmtree(tmp, ignore_errors=True)
+                    raise
+                os.rename(tmp, mirror)
+            self._touch(mirror)
+        return mirror
+
+    def checkout(
+        self,
+        repo_url: str,
+        dest: str,
+        rev: Optional[str] = None,
+        fetch: bool = True
+    ) -> str:
+        """
+        Materialize a worktree of the repository at dest.
+
+        Args:
+            repo_url: Repository to check out
+            dest: Worktree directory (replaced if it exists)
+            rev: Commit or ref to check out (default: the remote HEAD)
+            fetch: Fetch the mirror first (skip when rev is known to be present)
+
+        Returns:
+            The checked-out commit SHA
+        """
+        mirror = self.mirror_path(repo_url)
+        if fetch or not os.path.isdir(mirror):
+            self.ensure_mirror(repo_url)
+
+        with self._locked(mirror):
+            commit = run_git("rev-parse", "--verify", f"{rev or 'HEAD'}^{{commit}}", cwd=mirror).strip()
+            self._remove_worktree(dest)
+            os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+            run_git("worktree", "add", "--force", "--detach", os.path.abspath(dest), commit, cwd=mirror)
+            self._touch(mirror)
+
+        self.evict(keep=mirror)
+        return commit
+
+    async def checkout_async(
+        self,
+        repo_url: str,
+        dest: str,
+        rev: Optional[str] = None,
+        fetch: bool = True,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> str:
+        """
+        checkout() with the fetch and worktree creation run as cancellable
+        asyncio subprocesses.
+
+        Args:
+            repo_url: Repository to check out
+            dest: Worktree directory (replaced if it exists)
+            rev: Commit or ref to check out (default: the remote HEAD)
+            fetch: Fetch the mirror first (skip when rev is known to be present)
+            on_progress: Called with (phase, percent) while fetching
+
+        Returns:
+            The checked-out commit SHA
+        """
+        mirror = self.mirror_path(repo_url)
+        if fetch or not os.path.isdir(mirror):
+            await self.ensure_mirror_async(repo_url, on_progress)
+
+        async with self._locked_async(mirror):
+            commit = (await run_git_async(
+                "rev-parse", "--verify", f"{rev or 'HEAD'}^{{commit}}", cwd=mirror
+            )).strip()
+            await asyncio.to_thread(self._remove_worktree, dest)
+            os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+            await run_git_async(
+                "worktree", "add", "--force", "--detach", os.path.abspath(dest), commit,
+                cwd=mirror, timeout=settings.CLONE_TIMEOUT_SECONDS
+            )
+            self._touch(mirror)
+
+        await self.evict_async(keep=mirror)
+        return commit
+
+    def remove_worktree(self, dest: str) -> None:
+        """Delete a checkout created by checkout()"""
+        self._remove_worktree(dest)
+
+    def _remove_worktree(self, dest: str) -> None:
+        if not os.path.exists(dest):
+            return
+        owner = self.worktree_owner(dest)
+        shutil.rmtree(dest)
+        # Let the owning mirror forget the deleted worktree
+        if owner and os.path.isdir(owner):
+            try:
+                run_git("worktree", "prune", cwd=owner)
+            except GitCommandError:
+                pass
+
+    @staticmethod
+    def worktree_owner(dest: str) -> Optional[str]:
+        """Mirror a worktree belongs to, read from its `.git` file"""
+        git_file = os.path.join(dest, ".git")
+        if not os.path.isfile(git_file):
+            return None
+        with open(git_file) as f:
+            content = f.read().strip()
+        if not content.startswith("gitdir:"):
+            return None
+        # gitdir: <mirror>/worktrees/<name>
+        gitdir = content[len("gitdir:"):].strip()
+        return os.path.dirname(os.path.dirname(gitdir))
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """
+        Evict least-recently-used mirrors until usage is within the quota.
+
+        Mirrors in use (see in_use) or whose lock is held (a clone, fetch
+        or checkout in progress) are skipped rather than waited for, so
+        eviction never blocks on a lock held by the caller's own process
+        and never removes files a running job is reading.
+
+        Args:
+            keep: Mirror that must survive (the one just used)
+
+        Returns:
+            Paths of the evicted mirrors
+        """
+        usage = [(self._last_used(m), m, self._mirror_size(m)) for m in self._mirrors()]
+        total = sum(size for _, _, size in usage)
+        evicted = []
+
+        for _, mirror, size in sorted(usage):
+            if total <= self.quota_bytes:
+                break
+            if mirror == keep:
+                continue
+            with self._try_locked(self._use_path(mirror)) as unused, \
+                    self._try_locked(self._lock_path(mirror)) as idle:
+                if not (unused and idle):
+                    continue
+                for worktree in self._worktrees(mirror):
+                    shutil.rmtree(worktree, ignore_errors=True)
+                shutil.rmtree(mirror, ignore_errors=True)
+            self._sizes.pop(mirror, None)
+            total -= size
+            evicted.append(mirror)
+            print(f"🧹 Evicted mirror {os.path.basename(mirror)} ({size} bytes)")
+
+        return evicted
+
+    async def evict_async(self, keep: Optional[str] = None) -> List[str]:
+        """evict() on a thread, for callers on the event loop"""
+        return await asyncio.to_thread(self.evict, keep)
+
+    def _mirrors(self) -> List[str]:
+        if not os.path.isdir(self.mirrors_dir):
+            return []
+        return [
+            os.path.join(self.mirrors_dir, name)
+            for name in os.listdir(self.mirrors_dir)
+            if name.endswith(".git")
+        ]
+
+    @staticmethod
+    def _worktrees(mirror: str) -> List[str]:
+        """Checkout directories registered against a mirror"""
+        try:
+            output = run_git("worktree", "list", "--porcelain", cwd=mirror)
+        except GitCommandError:
+            return []
+        worktrees = []
+        for entry in output.strip().split("\n\n"):
+            lines = entry.splitlines()
+            if lines and lines[0].startswith("worktree ") and "bare" not in lines:
+                worktrees.append(lines[0][len("worktree "):])
+        return worktrees
+
+    @staticmethod
+    def _touch(mirror: str) -> None:
+        marker = os.path.join(mirror, _LAST_USED_MARKER)
+        with open(marker, "a"):
+            os.utime(marker, None)
+
+    @staticmethod
+    def _last_used(mirror: str) -> float:
+        try:
+            return os.path.getmtime(os.path.join(mirror, _LAST_USED_MARKER))
+        except OSError:
+            return 0.0
+
+    def _mirror_size(self, mirror: str) -> int:
+        """Disk size of a mirror, measured again only after it was used"""
+        last_used = self._last_used(mirror)
+        cached = self._sizes.get(mirror)
+        if cached is not None and cached[0] == last_used:
+            return cached[1]
+        size = self._dir_size(mirror)
+        self._sizes[mirror] = (last_used, size)
+        return size
+
+    @staticmethod
+    def _dir_size(path: str) -> int:
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.lstat(os.path.join(root, name)).st_size
+                except OSError:
+                    pass
+        return total
+
+
+repo_store = RepositoryStore()
@@ -4,11 +4,22 @@ Provides intelligent file walking with ignore patterns and statistics collection
 """
 
 import os
+import stat
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from fnmatch import fnmatch
 from pathlib import Path
-from typing import List, Set, Dict, Optional
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, Collection, Iterable, Iterator, List, Set, Dict, Optional, Tuple
+from dataclasses import dataclass, field, replace
 from enum import Enum
 
+from app.core.config import settings
+from app.extractors.cache import git_blob_hash
+from app.services.ignore import IgnoreRules, is_ignored
+from app.services.sniffer import SkipReason, sniff, sniff_file, too_large
+
+if TYPE_CHECKING:
+    from app.services.git_objects import GitObjectReader, TreeEntry
+
 
 class FileCategory(str, Enum):
     """File categories for processing"""
@@ -29,8 +40,24 @@ class FileInfo:
     extension: str
     category: FileCategory
     size_bytes: int
+    blob_sha: Optional[str] = None  # Set when the file is read from the git object store
+    duplicates: List["FileInfo"] = field(default_factory=list)  # Identical files extracted through this one
+    workspace: Optional[str] = None  # Monorepo workspace the file belongs to
+    content: Optional[bytes] = None  # In-memory content, e.g. a member of an uploaded archive
     
     
+@dataclass
+class _DirListing:
+    """One directory's share of a scan, produced on a scan thread"""
+    files: List[FileInfo]
+    # (path, relative path, .gitignore rules in effect) of directories to descend into
+    subdirs: List[Tuple[str, str, Tuple[IgnoreRules, ...]]]
+    # ('/'-separated relative path, size, reason) of files sniffed out
+    skipped: List[Tuple[str, int, SkipReason]] = field(default_factory=list)
+    directories_scanned: int = 0
+    directories_ignored: int = 0
+
+
 @dataclass
 class ScanStatistics:
     """Statistics collected during repository scan"""
@@ -40,6 +67,104 @@ class ScanStatistics:
     files_by_extension: Dict[str, int]
     directories_scanned: int
     directories_ignored: int
+    duplicate_files: int = 0  # Files folded into an identical file by deduplicate()
+    duplicate_bytes: int = 0
+    # Binary, minified, generated or oversized files, by '/'-separated relative path
+    skipped_files: Dict[str, SkipReason] = field(default_factory=dict)
+    skipped_bytes: int = 0
+    
+    @property
+    def dedup_ratio(self) -> float:
+        """Fraction of scanned files that need no extraction of their own"""
+        if not self.total_files:
+            return 0.0
+        return self.duplicate_files / self.total_files
+    
+    @property
+    def skipped_by_reason(self) -> Dict[str, int]:
+        """Number of skipped files per SkipReason value"""
+        counts: Dict[str, int] = {}
+        for reason in self.skipped_files.values():
+            counts[reason.value] = counts.get(reason.value, 0) + 1
+        return counts
+
+
+def count_files(files: List[FileInfo]) -> int:
+    """Number of files, counting every copy folded into a representative"""
+    return sum(1 + len(f.duplicates) for f in files)
+
+
+def assign_workspaces(files: List[FileInfo], workspaces: List[str]) -> None:
+    """Tag each file (and its copies) with the innermost workspace containing it"""
+    prefixes = sorted(workspaces, key=len, reverse=True)
+    for file_info in files:
+        for member in (file_info, *file_info.duplicates):
+            relative_path = member.relative_path.replace(os.sep, '/')
+            member.workspace = next(
+                (w for w in prefixes if relative_path.startswith(w + '/')), None
+            )
+
+
+def split_by_workspace(files: List[FileInfo]) -> Dict[Optional[str], List[FileInfo]]:
+    """Group files by workspace (None for files outside every workspace)"""
+    groups: Dict[Optional[str], List[FileInfo]] = {}
+    for file_info in files:
+        groups.setdefault(file_info.workspace, []).append(file_info)
+    return groups
+
+
+def without_paths(files: List[FileInfo], paths: Collection[str]) -> List[FileInfo]:
+    """
+    Drop files whose path is in paths.
+    
+    When a representative is dropped but some of its copies are not, the
+    first remaining copy takes its place.
+    """
+    kept: List[FileInfo] = []
+    for file_info in files:
+        members = [f for f in (file_info, *file_info.duplicates) if f.path not in paths]
+        if len(members) == len(file_info.duplicates) + 1:
+            kept.append(file_info)
+        elif members:
+            kept.append(replace(members[0], duplicates=members[1:]))
+    return kept
+
+
+def quick_look_rank(relative_path: str, patterns: Optional[List[str]] = None) -> int:
+    """
+    Likely value of a file for a first look at a repository, lower first.
+    
+    0: the file is named like a route, controller or model module
+       (urls.py, models.py, users.controller.ts)
+    1: the file sits under such a directory (api/, routes/, controllers/)
+    2: anything else
+    
+    Args:
+        relative_path: Path relative to the repository root
+        patterns: Name globs (default: settings.QUICK_LOOK_PATTERNS); a file
+            name matches on its full name or on its stem
+    """
+    patterns = settings.QUICK_LOOK_PATTERNS if patterns is None else patterns
+    *dirs, name = relative_path.replace(os.sep, '/').lower().split('/')
+    stem = name.split('.', 1)[0]
+    if any(fnmatch(name, p) or fnmatch(stem, p) for p in patterns):
+        return 0
+    if any(fnmatch(d, p) for d in dirs for p in patterns):
+        return 1
+    return 2
+
+
+def split_quick_look(files: List[FileInfo]) -> Tuple[List[FileInfo], List[FileInfo]]:
+    """
+    Split files into the high-value ones, best first, and the rest.
+    
+    Returns:
+        (high-value files ordered by quick_look_rank, remaining files)
+    """
+    ranked = [(quick_look_rank(f.relative_path), f) for f in files]
+    first = [f for rank, f in sorted(ranked, key=lambda item: item[0]) if rank < 2]
+    rest = [f for rank, f in ranked if rank >= 2]
+    return first, rest
 
 
 # Directories to ignore during scanning
@@ -83,6 +208,19 @@ IGNORED_FILE_PATTERNS: Set[str] = {
     ".DS_Store", "Thumbs.db",
 }
 
+# Directories that are hidden but still scanned, and hidden files still considered
+VISIBLE_HIDDEN: Set[str] = {".github", ".gitlab", ".env.example"}
+
+
+def builtin_ignore_patterns(ignored_dirs: Collection[str]) -> List[str]:
+    """The built-in ignore lists as gitignore patterns"""
+    patterns = [".*"]
+    patterns += [f"!{name}" for name in sorted(VISIBLE_HIDDEN)]
+    patterns += [f"{name}/" for name in sorted(ignored_dirs)]
+    patterns += [f"*{suffix}" for suffix in sorted(IGNORED_FILE_PATTERNS)]
+    return patterns
+
+
 # Extension to category mapping
 EXTENSION_CATEGORY_MAP: Dict[str, FileCategory] = {
     ".py": FileCategory.PYTHON,
@@ -121,13 +259,20 @@ class RepositoryScanner:
         Initialize scanner with optional additional ignore patterns.
         
         Args:
-            additional_ignores: Additional directory names to ignore
+            additional_ignores: Additional directory names (or globs) to ignore
         """
         self.ignored_dirs = IGNORED_DIRS.copy()
         if additional_ignores:
             self.ignored_dirs.update(additional_ignores)
+        self._builtin_rules = IgnoreRules(builtin_ignore_patterns(self.ignored_dirs))
+        self._user_rules: List[IgnoreRules] = []  # .eonixignore, above every other rule set
+        self._layers: Tuple[IgnoreRules, ...] = (self._builtin_rules,)
         
-        self.stats = ScanStatistics(
+        self.stats = self._new_stats()
+    
+    @staticmethod
+    def _new_stats() -> ScanStatistics:
+        return ScanStatistics(
             total_files=0,
             total_size_bytes=0,
             files_by_category={cat: 0 for cat in FileCategory},
@@ -136,12 +281,320 @@ class RepositoryScanner:
             directories_ignored=0,
         )
     
-    def scan(self, repo_path: str) -> List[FileInfo]:
+    def scan(
+        self,
+        repo_path: str,
+        subdir: Optional[str] = None,
+        workers: Optional[int] = None
+    ) -> List[FileInfo]:
         """
         Scan repository and return list of files to process.
         
+        A git checkout is listed from its index with `git ls-files`
+        (tracked files plus untracked ones .gitignore does not exclude), so
+        untracked build output is never visited. Other directories are
+        walked with os.scandir on a thread pool; files come back in the
+        order os.walk would produce them. Files that pass the filters are
+        sniffed (size, then the first settings.SCAN_SNIFF_BYTES) and
+        binary, minified, generated or oversized ones are left out and
+        recorded in the statistics' skipped_files.
+        
+        Args:
+            repo_path: Path to repository root
+            subdir: Only scan this directory ('/'-separated, relative to
+                repo_path); relative paths stay relative to repo_path
+            workers: Directory listing threads (default: settings.SCAN_WORKERS)
+            
+        Returns:
+            List of FileInfo objects for processable files
+        """
+        return list(self._scan(repo_path, subdir, workers, ordered=True))
+    
+    def scan_iter(
+        self,
+        repo_path: str,
+        subdir: Optional[str] = None,
+        workers: Optional[int] = None
+    ) -> Iterator[FileInfo]:
+        """
+        Like scan(), but yield files as they are discovered.
+        
+        Statistics are updated as files are yielded and are final once the
+        iterator is exhausted. Walked directories are yielded in the order
+        their listings complete rather than in os.walk order. Closing the
+        iterator early stops the walk.
+        
+        Args:
+            repo_path: Path to repository root
+            subdir: Only scan this directory ('/'-separated, relative to repo_path)
+            workers: Directory listing threads (default: settings.SCAN_WORKERS)
+        """
+        return self._scan(repo_path, subdir, workers, ordered=False)
+    
+    def _scan(
+        self,
+        repo_path: str,
+        subdir: Optional[str],
+        workers: Optional[int],
+        ordered: bool
+    ) -> Iterator[FileInfo]:
+        repo_path = os.path.abspath(repo_path)
+        workers = workers or settings.SCAN_WORKERS
+        self.stats = self._new_stats()
+        
+        files = None
+        if settings.SCAN_USE_GIT and os.path.exists(os.path.join(repo_path, '.git')):
+            files = self._git_files(repo_path, subdir, workers)
+        if files is None:
+            if subdir:
+                parts = subdir.split('/')
+                start = (
+                    os.path.join(repo_path, *parts),
+                    os.path.join(*parts),
+                    self._ancestor_gitignores(repo_path, parts),
+                )
+            else:
+                start = (repo_path, "", ())
+            files = self._walk_files(start, workers, ordered)
+        
+        for file_info in files:
+            self._update_stats(file_info)
+            self.stats.total_files += 1
+            yield file_info
+    
+    def _git_files(self, repo_path: str, subdir: Optional[str], workers: int) -> Optional[Iterator[FileInfo]]:
+        """
+        List a git checkout's files from its index.
+        
+        Only paths that pass the filters are stat'ed, for their size, and
+        sniffed; tracked files deleted from the work tree are skipped.
+        
+        Returns:
+            FileInfo objects in path order, or None if git cannot list
+            repo_path (the caller falls back to walking it)
+        """
+        from app.services.repo_store import GitCommandError, run_git
+        try:
+            output = run_git(
+                "ls-files", "-z", "--cached", "--others", "--exclude-standard",
+                "--", subdir or ".",
+                cwd=repo_path
+            )
+        except (GitCommandError, OSError):
+            return None
+        
+        # Unmerged files are listed once per stage
+        paths = list(dict.fromkeys(p for p in output.split('\0') if p))
+        kept = [paths[i].split('/') for i in self._filter_listing(paths)]
+        full_paths = [os.path.join(repo_path, *parts) for parts in kept]
+        
+        def generate() -> Iterator[FileInfo]:
+            executor = None
+            if workers > 1 and len(full_paths) > 1:
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan")
+                sniffed = executor.map(self._stat_and_sniff, full_paths, chunksize=256)
+            else:
+                sniffed = map(self._stat_and_sniff, full_paths)
+            try:
+                for parts, file_path, result in zip(kept, full_paths, sniffed):
+                    if result is None:
+                        continue
+                    size, reason = result
+                    if reason is not None:
+                        self._record_skip('/'.join(parts), size, reason)
+                        continue
+                    ext = self._get_extension(parts[-1])
+                    yield FileInfo(
+                        path=file_path,
+                        relative_path=os.path.join(*parts),
+                        extension=ext,
+                        category=EXTENSION_CATEGORY_MAP.get(ext, FileCategory.UNKNOWN),
+                        size_bytes=size,
+                    )
+            finally:
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+        
+        return generate()
+    
+    def _walk_files(
+        self,
+        start: Tuple[str, str, Tuple[IgnoreRules, ...]],
+        workers: int,
+        ordered: bool
+    ) -> Iterator[FileInfo]:
+        """Files of a directory walk, in os.walk order or as listings complete"""
+        listings = self._iter_listings(start, workers)
+        if ordered:
+            listings = self._in_walk_order(start[0], dict(listings))
+        for _, listing in listings:
+            self.stats.directories_scanned += listing.directories_scanned
+            self.stats.directories_ignored += listing.directories_ignored
+            for skipped in listing.skipped:
+                self._record_skip(*skipped)
+            yield from listing.files
+    
+    @staticmethod
+    def _in_walk_order(root: str, listings: Dict[str, _DirListing]) -> Iterator[Tuple[str, _DirListing]]:
+        """Listings in os.walk order: a directory, then each subdirectory in turn"""
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            listing = listings[path]
+            yield path, listing
+            stack.extend(subdir[0] for subdir in reversed(listing.subdirs))
+    
+    @staticmethod
+    def _regular_file_size(file_path: str) -> Optional[int]:
+        """Size of a regular file (following symlinks), None for anything else or a missing file"""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        return st.st_size if stat.S_ISREG(st.st_mode) else None
+    
+    @classmethod
+    def _stat_and_sniff(cls, file_path: str) -> Optional[Tuple[int, Optional[SkipReason]]]:
+        """(size, reason to skip or None) of a regular file, None as for _regular_file_size"""
+        size = cls._regular_file_size(file_path)
+        if size is None:
+            return None
+        return size, sniff_file(file_path, size)
+    
+    def _record_skip(self, relative_path: str, size_bytes: int, reason: SkipReason) -> None:
+        """Count a sniffed-out file in the statistics"""
+        self.stats.skipped_files[relative_path] = reason
+        self.stats.skipped_bytes += size_bytes
+    
+    def _ancestor_gitignores(self, repo_path: str, parts: List[str]) -> Tuple[IgnoreRules, ...]:
+        """.gitignore rules of the directories above a subdirectory scan's start"""
+        rules: Tuple[IgnoreRules, ...] = ()
+        for depth in range(len(parts)):
+            rules += self._read_gitignore(os.path.join(repo_path, *parts[:depth]), '/'.join(parts[:depth]))
+        return rules
+    
+    @staticmethod
+    def _read_gitignore(path: str, relative: str) -> Tuple[IgnoreRules, ...]:
+        """A directory's .gitignore rules, as a 0- or 1-tuple to append to its parent's"""
+        if not settings.SCAN_RESPECT_GITIGNORE:
+            return ()
+        try:
+            with open(os.path.join(path, '.gitignore'), 'r', errors='replace') as f:
+                return (IgnoreRules.from_text(f.read(), relative),)
+        except (OSError, IOError):
+            return ()
+    
+    def _iter_listings(
+        self,
+        start: Tuple[str, str, Tuple[IgnoreRules, ...]],
+        workers: int
+    ) -> Iterator[Tuple[str, _DirListing]]:
+        """
+        List every directory under start, fanning out across threads.
+        
+        Directory listings and stats are I/O bound (and slow on network
+        mounts), so threads overlap their latency despite the GIL.
+        
+        Yields:
+            (path, listing) of each scanned directory as its listing completes
+        """
+        if workers <= 1:
+            pending = [start]
+            while pending:
+                subdir = pending.pop()
+                listing = self._list_dir(*subdir)
+                yield subdir[0], listing
+                pending.extend(reversed(listing.subdirs))
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan")
+        try:
+            running = {executor.submit(self._list_dir, *start): start[0]}
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = running.pop(future)
+                    listing = future.result()
+                    for subdir in listing.subdirs:
+                        running[executor.submit(self._list_dir, *subdir)] = subdir[0]
+                    yield path, listing
+        finally:
+            executor.shutdown(cancel_futures=True)
+    
+    def _list_dir(
+        self,
+        path: str,
+        relative: str,
+        gitignores: Tuple[IgnoreRules, ...] = ()
+    ) -> _DirListing:
+        """
+        Filter one directory's entries (runs on a scan thread).
+        
+        Entry types come from os.scandir without a stat; only files that
+        pass the filters are stat'ed, once, for their size. Like os.walk,
+        symlinked directories are counted but not followed, and unreadable
+        directories are skipped. A .gitignore in the directory applies to
+        everything below it. Files that pass the filters are sniffed here,
+        on the scan thread, and skips are left for the caller to record.
+        """
+        listing = _DirListing(files=[], subdirs=[])
+        try:
+            with os.scandir(path) as entries:
+                entries = list(entries)
+        except OSError:
+            return listing
+        
+        posix = relative.replace(os.sep, '/')
+        if any(entry.name == '.gitignore' for entry in entries):
+            gitignores += self._read_gitignore(path, posix)
+        layers = self._layers_with(gitignores)
+        
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            relative_path = os.path.join(relative, entry.name)
+            posix_path = f"{posix}/{entry.name}" if posix else entry.name
+            if is_dir:
+                if self._should_ignore_directory(posix_path, layers):
+                    listing.directories_ignored += 1
+                    continue
+                listing.directories_scanned += 1
+                if not entry.is_symlink():
+                    listing.subdirs.append((entry.path, relative_path, gitignores))
+            elif self._should_process_file(posix_path, layers):
+                try:
+                    size = entry.stat().st_size
+                except OSError as e:
+                    # Skip files that can't be read
+                    print(f"Warning: Cannot read {entry.path}: {e}")
+                    continue
+                reason = sniff_file(entry.path, size)
+                if reason is not None:
+                    listing.skipped.append((posix_path, size, reason))
+                    continue
+                ext = self._get_extension(entry.name)
+                listing.files.append(FileInfo(
+                    path=entry.path,
+                    relative_path=relative_path,
+                    extension=ext,
+                    category=EXTENSION_CATEGORY_MAP.get(ext, FileCategory.UNKNOWN),
+                    size_bytes=size,
+                ))
+        return listing
+    
+    def scan_paths(self, repo_path: str, relative_paths: List[str]) -> List[FileInfo]:
+        """
+        Apply the scanner's filters to an explicit list of files.
+        
+        Used when the set of files is already known (e.g. from a git diff).
+        Paths that no longer exist are skipped, as are files sniffed out
+        like in scan().
+        
         Args:
             repo_path: Path to repository root
+            relative_paths: File paths relative to repo_path, using '/' separators
             
         Returns:
             List of FileInfo objects for processable files
@@ -149,60 +602,257 @@ class RepositoryScanner:
         repo_path = os.path.abspath(repo_path)
         files: List[FileInfo] = []
         
-        for root, dirs, filenames in os.walk(repo_path):
-            # In-place filter to prevent descending into ignored directories
-            original_dir_count = len(dirs)
-            dirs[:] = [d for d in dirs if not self._should_ignore_directory(d)]
-            self.stats.directories_ignored += (original_dir_count - len(dirs))
-            self.stats.directories_scanned += len(dirs)
+        for relative_path in relative_paths:
+            if not self.accepts(relative_path):
+                continue
             
-            for filename in filenames:
-                if self._should_process_file(filename):
-                    file_path = os.path.join(root, filename)
-                    relative_path = os.path.relpath(file_path, repo_path)
-                    
-                    try:
-                        file_info = self._create_file_info(
-                            file_path,
-                            relative_path,
-                            filename
-                        )
-                        files.append(file_info)
-                        self._update_stats(file_info)
-                    except (OSError, IOError) as e:
-                        # Skip files that can't be read
-                        print(f"Warning: Cannot read {file_path}: {e}")
-                        continue
+            parts = relative_path.split('/')
+            file_path = os.path.join(repo_path, *parts)
+            try:
+                file_info = self._create_file_info(
+                    file_path,
+                    os.path.join(*parts),
+                    parts[-1]
+                )
+            except (OSError, IOError):
+                continue
+            reason = sniff_file(file_path, file_info.size_bytes)
+            if reason is not None:
+                self._record_skip(relative_path, file_info.size_bytes, reason)
+                continue
+            files.append(file_info)
+            self._update_stats(file_info)
+        
+        self.stats.total_files += len(files)
+        return files
+    
+    def accepts(self, relative_path: str) -> bool:
+        """Whether the scanner's filters keep a '/'-separated relative path"""
+        parts = relative_path.split('/')
+        if any(self._should_ignore_directory('/'.join(parts[:depth])) for depth in range(1, len(parts))):
+            return False
+        return self._should_process_file(relative_path)
+    
+    def scan_content(self, repo_path: str, relative_path: str, content: bytes) -> Optional[FileInfo]:
+        """
+        Record a file whose content is already in memory.
+        
+        Used for streamed sources such as uploaded archives, where files
+        arrive one by one and never exist on disk. The caller checks
+        accepts() before reading the content.
+        
+        Args:
+            repo_path: Notional repository root used to build the file path
+            relative_path: '/'-separated path of the file
+            content: Raw file content
+            
+        Returns:
+            FileInfo carrying the content, or None if the content is sniffed
+            out (binary, minified, generated or oversized)
+        """
+        reason = sniff(content[:settings.SCAN_SNIFF_BYTES], len(content))
+        if reason is not None:
+            self._record_skip(relative_path, len(content), reason)
+            return None
+        parts = relative_path.split('/')
+        ext = self._get_extension(parts[-1])
+        file_info = FileInfo(
+            path=os.path.join(os.path.abspath(repo_path), *parts),
+            relative_path=os.path.join(*parts),
+            extension=ext,
+            category=EXTENSION_CATEGORY_MAP.get(ext, FileCategory.UNKNOWN),
+            size_bytes=len(content),
+            content=content,
+        )
+        self._update_stats(file_info)
+        self.stats.total_files += 1
+        return file_info
+    
+    def scan_tree(
+        self,
+        repo_path: str,
+        entries: List["TreeEntry"],
+        reader: Optional["GitObjectReader"] = None,
+        sniffed: Optional[Dict[str, Optional[SkipReason]]] = None
+    ) -> List[FileInfo]:
+        """
+        Apply the scanner's filters to a git tree listing.
+        
+        Files are not read from disk; each FileInfo carries the blob SHA
+        its content is read from, and a path under repo_path so node IDs
+        match those of a checked-out ingest. With a reader, the blobs that
+        pass the filters are fetched and sniffed like scan() sniffs files;
+        without one, only the size ceiling is applied.
+        
+        Args:
+            repo_path: Notional repository root used to build file paths
+            entries: Output of git_objects.list_tree
+            reader: Object reader of the repository, to sniff blob content
+            sniffed: Blob SHA -> sniffing outcome, reused and filled in
+                across calls (e.g. the commits of a history run)
+            
+        Returns:
+            List of FileInfo objects for processable files
+        """
+        repo_path = os.path.abspath(repo_path)
+        files: List[FileInfo] = []
+        
+        for index in self._filter_listing([entry.path for entry in entries]):
+            entry = entries[index]
+            if too_large(entry.size_bytes):
+                self._record_skip(entry.path, entry.size_bytes, SkipReason.TOO_LARGE)
+                continue
+            if reader is not None:
+                reason = self._sniff_blob(reader, entry, sniffed)
+                if reason is not None:
+                    self._record_skip(entry.path, entry.size_bytes, reason)
+                    continue
+            parts = entry.path.split('/')
+            ext = self._get_extension(parts[-1])
+            file_info = FileInfo(
+                path=os.path.join(repo_path, *parts),
+                relative_path=os.path.join(*parts),
+                extension=ext,
+                category=EXTENSION_CATEGORY_MAP.get(ext, FileCategory.UNKNOWN),
+                size_bytes=entry.size_bytes,
+                blob_sha=entry.sha,
+            )
+            files.append(file_info)
+            self._update_stats(file_info)
         
         self.stats.total_files = len(files)
         return files
     
-    def _should_ignore_directory(self, dirname: str) -> bool:
-        """Check if directory should be ignored"""
-        # Check against ignored directory set
-        if dirname in self.ignored_dirs:
-            return True
+    @staticmethod
+    def _sniff_blob(
+        reader: "GitObjectReader",
+        entry: "TreeEntry",
+        sniffed: Optional[Dict[str, Optional[SkipReason]]]
+    ) -> Optional[SkipReason]:
+        """Sniff a blob's head; blobs that cannot be read are left to extraction"""
+        if settings.SCAN_SNIFF_BYTES <= 0:
+            return None
+        if sniffed is not None and entry.sha in sniffed:
+            return sniffed[entry.sha]
+        from app.services.repo_store import GitCommandError
+        try:
+            head = reader.read_blob(entry.sha)[:settings.SCAN_SNIFF_BYTES]
+        except GitCommandError:
+            return None
+        reason = sniff(head, entry.size_bytes)
+        if sniffed is not None:
+            sniffed[entry.sha] = reason
+        return reason
+    
+    def _filter_listing(self, paths: Iterable[str]) -> List[int]:
+        """
+        Apply the filters to a flat listing of '/'-separated file paths.
+        
+        Each directory is checked once, however many files it holds, and
+        counted in the scanned/ignored statistics like a walk would.
         
-        # Check for hidden directories (except .github for CI configs)
-        if dirname.startswith('.') and dirname not in {'.github', '.gitlab'}:
-            return True
+        Returns:
+            Indices of the paths to keep
+        """
+        kept: List[int] = []
+        ignored_dirs: Set[str] = set()
+        scanned_dirs: Set[str] = set()
         
-        return False
+        for index, path in enumerate(paths):
+            parts = path.split('/')
+            
+            ignored = False
+            for depth in range(1, len(parts)):
+                directory = '/'.join(parts[:depth])
+                if directory in ignored_dirs:
+                    ignored = True
+                    break
+                if directory in scanned_dirs:
+                    continue
+                if self._should_ignore_directory(directory):
+                    ignored_dirs.add(directory)
+                    ignored = True
+                    break
+                scanned_dirs.add(directory)
+            if not ignored and self._should_process_file(path):
+                kept.append(index)
+        
+        self.stats.directories_scanned += len(scanned_dirs)
+        self.stats.directories_ignored += len(ignored_dirs)
+        return kept
     
-    def _should_process_file(self, filename: str) -> bool:
-        """Check if file should be processed"""
-        # Ignore hidden files
-        if filename.startswith('.') and filename not in {'.env.example'}:
-            return False
+    def deduplicate(self, files: List[FileInfo]) -> List[FileInfo]:
+        """
+        Fold files with identical content into one file to extract.
         
-        # Check against ignored patterns
-        for pattern in IGNORED_FILE_PATTERNS:
-            if filename.endswith(pattern):
-                return False
+        Vendored and copied files (identical schemas, generated clients,
+        copied utils) are extracted once; the result is re-targeted to
+        every copy. Only files sharing an extension and size with another
+        file are hashed: checked-out files are read, tree files already
+        carry their blob SHA.
         
-        # Only process files with recognized extensions
-        ext = self._get_extension(filename)
-        return ext in EXTENSION_CATEGORY_MAP
+        Args:
+            files: Output of scan, scan_paths or scan_tree
+            
+        Returns:
+            Files to extract in scan order, each listing its copies in duplicates
+        """
+        sizes: Dict[Tuple[str, int], int] = {}
+        for file_info in files:
+            key = (file_info.extension, file_info.size_bytes)
+            sizes[key] = sizes.get(key, 0) + 1
+        
+        representatives: Dict[Tuple[str, str], FileInfo] = {}
+        unique: List[FileInfo] = []
+        for file_info in files:
+            if sizes[(file_info.extension, file_info.size_bytes)] > 1:
+                content_hash = file_info.blob_sha or self._hash_file(file_info.path)
+                if content_hash is not None:
+                    key = (file_info.extension, content_hash)
+                    first = representatives.get(key)
+                    if first is not None:
+                        first.duplicates.append(file_info)
+                        self.stats.duplicate_files += 1
+                        self.stats.duplicate_bytes += file_info.size_bytes
+                        continue
+                    representatives[key] = file_info
+            unique.append(file_info)
+        return unique
+    
+    @staticmethod
+    def _hash_file(file_path: str) -> Optional[str]:
+        """Git blob hash of a file on disk, or None if it cannot be read"""
+        try:
+            with open(file_path, 'rb') as f:
+                return git_blob_hash(f.read())
+        except (OSError, IOError):
+            return None
+    
+    def _layers_with(self, gitignores: Tuple[IgnoreRules, ...]) -> Tuple[IgnoreRules, ...]:
+        """Rule sets in precedence order: built-ins, .gitignore files, .eonixignore"""
+        if not gitignores:
+            return self._layers
+        return (self._builtin_rules, *gitignores, *self._user_rules)
+    
+    def _should_ignore_directory(
+        self,
+        relative_dir: str,
+        layers: Optional[Tuple[IgnoreRules, ...]] = None
+    ) -> bool:
+        """Check if a '/'-separated directory path should be ignored"""
+        return is_ignored(layers or self._layers, relative_dir, True)
+    
+    def _should_process_file(
+        self,
+        relative_path: str,
+        layers: Optional[Tuple[IgnoreRules, ...]] = None
+    ) -> bool:
+        """Check if a '/'-separated file path should be processed"""
+        # Only process files with recognized extensions; this is the cheap check
+        ext = self._get_extension(relative_path)
+        if ext not in EXTENSION_CATEGORY_MAP:
+            return False
+        return not is_ignored(layers or self._layers, relative_path, False)
     
     def _get_extension(self, filename: str) -> str:
         """Get file extension in lowercase"""
@@ -240,10 +890,10 @@ class RepositoryScanner:
         """
         Load .eonixignore file if it exists and add patterns.
         
-        Format similar to .gitignore:
-        - One pattern per line
-        - # for comments
-        - Blank lines ignored
+        Same syntax as .gitignore (globs, "**", anchoring "/", "!"
+        negation, trailing "/" for directories only), relative to the
+        repository root. Its patterns take precedence over the built-in
+        ignores and .gitignore files, so "!" can re-include their paths.
         """
         ignore_file = os.path.join(repo_path, '.eonixignore')
         
@@ -252,16 +902,17 @@ class RepositoryScanner:
         
         try:
             with open(ignore_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    # Skip comments and empty lines
-                    if not line or line.startswith('#'):
-                        continue
-                    # Add to ignored directories
-                    self.ignored_dirs.add(line)
+                self.add_ignore_patterns(f.read())
         except (OSError, IOError) as e:
             print(f"Warning: Cannot read .eonixignore: {e}")
     
+    def add_ignore_patterns(self, text: str) -> None:
+        """Add patterns from .eonixignore content (e.g. read from a git blob)"""
+        rules = IgnoreRules.from_text(text)
+        if rules.size:
+            self._user_rules.append(rules)
+            self._layers = (self._builtin_rules, *self._user_rules)
+    
     def get_statistics(self) -> ScanStatistics:
         """Get current scan statistics"""
         return self.stats
@@ -274,6 +925,15 @@ class RepositoryScanner:
         print(f"Total size: {self._format_bytes(self.stats.total_size_bytes)}")
         print(f"Directories scanned: {self.stats.directories_scanned}")
         print(f"Directories ignored: {self.stats.directories_ignored}")
+        if self.stats.duplicate_files:
+            print(f"Duplicate files: {self.stats.duplicate_files} "
+                  f"({self.stats.dedup_ratio:.1%}, {self._format_bytes(self.stats.duplicate_bytes)})")
+        if self.stats.skipped_files:
+            reasons = ", ".join(
+                f"{reason}: {count}" for reason, count in sorted(self.stats.skipped_by_reason.items())
+            )
+            print(f"Skipped files: {len(self.stats.skipped_files)} "
+                  f"({reasons}; {self._format_bytes(self.stats.skipped_bytes)})")
         
         print("\n📁 Files by Category:")
         for category, count in sorted(
@@ -0,0 +1,176 @@
+"""
+Fair multi-tenant ingest scheduling.
+Decides which queued job a worker claims next (priority classes, tenant
+fair share, per-tenant running caps) and splits each worker's extraction
+pool between the jobs it runs, so a huge batch ingest cannot starve small
+interactive ones.
+"""
+
+import math
+import threading
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Iterable, Optional
+
+from app.core.config import settings
+
+
+DEFAULT_TENANT = "default"
+
+
+class JobPriority(str, Enum):
+    """Priority classes, highest first"""
+    INTERACTIVE = "interactive"
+    NORMAL = "normal"
+    BATCH = "batch"
+
+    @property
+    def rank(self) -> int:
+        """0 is the most urgent class"""
+        return _PRIORITY_RANKS[self]
+
+    @property
+    def weight(self) -> float:
+        """Relative share of extraction workers for jobs of this class"""
+        return _PRIORITY_WEIGHTS[self]
+
+
+_PRIORITY_RANKS = {
+    JobPriority.INTERACTIVE: 0,
+    JobPriority.NORMAL: 1,
+    JobPriority.BATCH: 2,
+}
+
+_PRIORITY_WEIGHTS = {
+    JobPriority.INTERACTIVE: 4.0,
+    JobPriority.NORMAL: 2.0,
+    JobPriority.BATCH: 1.0,
+}
+
+
+def tenant_weight(tenant: str) -> float:
+    """Configured fair-share weight of a tenant (default 1)"""
+    return max(settings.TENANT_WEIGHTS.get(tenant, 1.0), 0.001)
+
+
+def tenant_job_limit(tenant: str) -> int:
+    """Running jobs allowed for a tenant across all workers (0 = unlimited)"""
+    return settings.TENANT_JOB_LIMITS.get(tenant, settings.TENANT_MAX_RUNNING_JOBS)
+
+
+@dataclass
+class Candidate:
+    """A runnable job as seen by the scheduler"""
+    job_id: str
+    tenant: str
+    priority: JobPriority
+    created_at: float
+
+
+def pick_next(
+    candidates: Iterable[Candidate],
+    running: Dict[str, int],
+    now: float,
+    min_priority: Optional[JobPriority] = None
+) -> Optional[Candidate]:
+    """
+    Choose the next job to run.
+
+    1. Tenants at their running-job cap are skipped.
+    2. The most urgent priority class wins. Waiting jobs age one class up
+       every JOB_PRIORITY_AGING_SECONDS, so batch work is never starved.
+    3. Within a class, the tenant using the smallest share of its weight
+       (running jobs / weight) goes first.
+    4. Ties go to the oldest job.
+
+    Args:
+        candidates: Runnable jobs
+        running: Running job count per tenant
+        now: Current time
+        min_priority: Only consider jobs of this class or more urgent
+            (by submitted class, ignoring aging)
+
+    Returns:
+        The job to claim, or None if every candidate is capped
+    """
+    aging = settings.JOB_PRIORITY_AGING_SECONDS
+    best, best_key = None, None
+    for candidate in candidates:
+        if min_priority is not None and candidate.priority.rank > min_priority.rank:
+            continue
+        active = running.get(candidate.tenant, 0)
+        limit = tenant_job_limit(candidate.tenant)
+        if limit and active >= limit:
+            continue
+
+        rank = candidate.priority.rank
+        if aging > 0:
+            rank = max(0, rank - int((now - candidate.created_at) // aging))
+        key = (rank, active / tenant_weight(candidate.tenant), candidate.created_at)
+        if best_key is None or key < best_key:
+            best, best_key = candidate, key
+    return best
+
+
+class FairShare:
+    """
+    Weighted split of one worker process's extraction slots among its jobs.
+
+    Each job's weight is its tenant weight times its priority weight,
+    divided by the number of that tenant's jobs running here, so tenants
+    (not job counts) share the pool. Quotas are recomputed whenever a job
+    joins or leaves, so a job started alone gives capacity back as soon as
+    others arrive.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: Files that may be in flight across all jobs
+        """
+        self.capacity = max(capacity, 1)
+        self._jobs: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def join(self, job_id: str, tenant: str, priority: JobPriority) -> None:
+        with self._lock:
+            self._jobs[job_id] = (tenant, priority)
+
+    def leave(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def quota(self, job_id: str) -> int:
+        """Files the job may currently have in flight (at least 1)"""
+        with self._lock:
+            if job_id not in self._jobs:
+                return 1
+            per_tenant: Dict[str, int] = {}
+            for tenant, _ in self._jobs.values():
+                per_tenant[tenant] = per_tenant.get(tenant, 0) + 1
+
+            def weight(entry) -> float:
+                tenant, priority = entry
+                return tenant_weight(tenant) * priority.weight / per_tenant[tenant]
+
+            total = sum(weight(entry) for entry in self._jobs.values())
+            share = weight(self._jobs[job_id]) / total
+        return max(1, math.floor(self.capacity * share))
+
+
+class WorkerShare:
+    """A job's handle on the shared extraction pool and its fair quota"""
+
+    def __init__(self, pool, fair_share: FairShare, job_id: str):
+        """
+        Args:
+            pool: ExtractionPool shared by the worker's jobs
+            fair_share: Quota calculator for the worker
+            job_id: Job this share belongs to
+        """
+        self.pool = pool
+        self.fair_share = fair_share
+        self.job_id = job_id
+
+    def max_in_flight(self) -> int:
+        return self.fair_share.quota(self.job_id)
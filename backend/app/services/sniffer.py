@@ -0,0 +1,71 @@
+"""
+Content sniffing for scanned files.
+Classifies a file from its size and its first few KB as binary, minified,
+generated or too large, so such files are skipped before extraction
+instead of dominating parse time.
+"""
+
+from enum import Enum
+from typing import Optional
+
+from app.core.config import settings
+
+
+class SkipReason(str, Enum):
+    """Why the scanner skipped a file it would otherwise extract"""
+    TOO_LARGE = "too_large"
+    BINARY = "binary"
+    MINIFIED = "minified"
+    GENERATED = "generated"
+
+
+def too_large(size_bytes: int) -> bool:
+    """Whether a file is above the size ceiling (settings.SCAN_MAX_FILE_BYTES, 0 = none)"""
+    return 0 < settings.SCAN_MAX_FILE_BYTES < size_bytes
+
+
+def sniff(head: bytes, size_bytes: int) -> Optional[SkipReason]:
+    """
+    Classify a file from its size and the start of its content.
+
+    Args:
+        head: First bytes of the file (settings.SCAN_SNIFF_BYTES are enough)
+        size_bytes: Size of the whole file
+
+    Returns:
+        Reason to skip the file, or None to extract it
+    """
+    if too_large(size_bytes):
+        return SkipReason.TOO_LARGE
+    if not head:
+        return None
+    if b'\0' in head:
+        return SkipReason.BINARY
+    if any(marker.encode() in head for marker in settings.SCAN_GENERATED_MARKERS):
+        return SkipReason.GENERATED
+
+    lines = head.split(b'\n')
+    # A line cut off by the end of the head is at least this long
+    if max(len(line) for line in lines) > settings.SCAN_MINIFIED_MAX_LINE:
+        return SkipReason.MINIFIED
+    if len(head) < size_bytes and len(lines) > 1:
+        lines.pop()
+    if sum(len(line) for line in lines) / len(lines) > settings.SCAN_MINIFIED_MEAN_LINE:
+        return SkipReason.MINIFIED
+    return None
+
+
+def sniff_file(file_path: str, size_bytes: int) -> Optional[SkipReason]:
+    """
+    Classify a file on disk, reading only its head.
+
+    Files that cannot be read are not skipped here; extraction reports them.
+    """
+    if too_large(size_bytes) or settings.SCAN_SNIFF_BYTES <= 0:
+        return sniff(b'', size_bytes)
+    try:
+        with open(file_path, 'rb') as f:
+            head = f.read(settings.SCAN_SNIFF_BYTES)
+    except (OSError, IOError):
+        return None
+    return sniff(head, size_bytes)
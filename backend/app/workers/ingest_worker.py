@@ -0,0 +1,286 @@
+"""
+Standalone ingestion worker.
+Claims jobs from the durable job queue and runs them outside the API process,
+so ingest capacity scales independently of API replicas.
+
+Run with: PYTHONPATH=. python -m app.workers.ingest_worker --concurrency 2
+"""
+
+import argparse
+import asyncio
+import signal
+from typing import Any, Dict, Optional, Set
+
+from app.core.config import settings
+from app.extractors.pool import ExtractionPool
+from app.services.job_queue import Job, JobQueue, default_worker_id, job_queue
+from app.services.progress import IngestStage, ProgressReporter
+from app.services.scheduler import FairShare, JobPriority, WorkerShare
+
+
+async def connect_graph():
+    """
+    Connect to Neo4j, falling back to the in-memory mock graph.
+    """
+    from app.db.neo4j import neo4j_client
+    from app.services.graph_service import GraphService, graph_service
+
+    try:
+        neo4j_client.connect(
+            settings.NEO4J_URI,
+            (settings.NEO4J_USER, settings.NEO4J_PASSWORD)
+        )
+        await graph_service.initialize_schema()
+        print("✅ Connected to Neo4j")
+        return graph_service
+    except Exception as e:
+        print(f"⚠️ Neo4j connection failed: {e}")
+        print("🔄 Switching to IN-MEMORY MOCK mode (graph stays in this worker)")
+        mock = GraphService(use_mock=True)
+        await mock.initialize_schema()
+        return mock
+
+
+class IngestWorker:
+    """
+    Polls the job queue and runs up to `concurrency` jobs at once.
+
+    Each running job renews its lease in the background. If the lease is
+    lost (e.g. this worker stalled and another one took over), the local
+    run is cancelled. Queue calls run in threads: a claim waiting on a
+    contended SQLite lock must not hold up other jobs' heartbeats.
+
+    All jobs share one extraction pool; each gets a weighted fair share of
+    its slots (see scheduler.FairShare), so a small interactive ingest
+    keeps making progress next to a huge batch one. On top of `concurrency`
+    general slots, INGEST_INTERACTIVE_SLOTS slots only take interactive
+    jobs, so those never wait for a batch job to finish.
+    """
+
+    def __init__(
+        self,
+        queue: Optional[JobQueue] = None,
+        concurrency: Optional[int] = None,
+        worker_id: Optional[str] = None,
+        graph=None,
+        extraction_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            queue: Job queue to consume (default: shared job_queue)
+            concurrency: Jobs run at once (default: settings.INGEST_WORKER_CONCURRENCY)
+            worker_id: Identifier recorded on claimed jobs
+            graph: GraphService for writes (default: connect on start)
+            extraction_workers: Size of the shared extraction pool
+                (default: settings.EXTRACTION_WORKERS)
+        """
+        self.queue = queue or job_queue
+        self.concurrency = concurrency or settings.INGEST_WORKER_CONCURRENCY
+        self.worker_id = worker_id or default_worker_id()
+        self.graph = graph
+        self.pool = ExtractionPool(extraction_workers)
+        self.fair_share = FairShare(self.pool.max_workers * 2)
+        self._shares: Dict[str, WorkerShare] = {}
+        self._running: Set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """Stop claiming new jobs; running jobs are allowed to finish"""
+        self._stopping.set()
+
+    async def run(self, max_jobs: Optional[int] = None) -> None:
+        """
+        Consume jobs until stop() is called.
+
+        Args:
+            max_jobs: Exit after claiming this many jobs (used by tests)
+        """
+        if self.graph is None:
+            self.graph = await connect_graph()
+
+        print(f"👷 Worker {self.worker_id} started (concurrency={self.concurrency})")
+        claimed = 0
+        while not self._stopping.is_set():
+            if max_jobs is not None and claimed >= max_jobs:
+                break
+
+            job = None
+            if len(self._running) < self.concurrency:
+                job = await asyncio.to_thread(self.queue.claim, self.worker_id)
+            elif len(self._running) < self.concurrency + settings.INGEST_INTERACTIVE_SLOTS:
+                job = await asyncio.to_thread(
+                    self.queue.claim, self.worker_id, min_priority=JobPriority.INTERACTIVE
+                )
+
+            if job is not None:
+                claimed += 1
+                task = asyncio.create_task(self._run_job(job))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+                continue
+
+            # Queue empty or all slots busy: wait for a slot, a stop, or the poll interval
+            waiters = set(self._running)
+            stop_waiter = asyncio.create_task(self._stopping.wait())
+            waiters.add(stop_waiter)
+            await asyncio.wait(
+                waiters,
+                timeout=settings.JOB_POLL_INTERVAL,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            stop_waiter.cancel()
+
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        self.pool.shutdown()
+        print(f"👋 Worker {self.worker_id} stopped")
+
+    async def _run_job(self, job: Job) -> None:
+        print(f"🚀 [{self.worker_id}] Running {job.kind} job {job.id} "
+              f"(attempt {job.attempts}/{job.max_attempts})")
+        progress = ProgressReporter(self.queue, job.id, worker_id=self.worker_id)
+        self.fair_share.join(job.id, job.tenant, job.priority)
+        self._shares[job.id] = WorkerShare(self.pool, self.fair_share, job.id)
+        work = asyncio.create_task(self.handle(job, progress))
+        heartbeat = asyncio.create_task(self._heartbeat(job, work))
+        try:
+            result = await work
+            await asyncio.to_thread(progress.set_stage, IngestStage.DONE)
+            completed = await asyncio.to_thread(
+                self.queue.complete, job.id, result, worker_id=self.worker_id
+            )
+            if completed:
+                print(f"✅ Job {job.id} complete")
+            else:
+                print(f"⚠️  Job {job.id} was reclaimed by another worker, dropping its result")
+        except asyncio.CancelledError:
+            print(f"⚠️  Job {job.id} lost its lease, abandoning local run")
+        except Exception as e:
+            print(f"❌ Job {job.id} failed: {e}")
+            await asyncio.to_thread(progress.error, str(e))
+            failed = await asyncio.to_thread(
+                self.queue.fail, job.id, str(e), worker_id=self.worker_id
+            )
+            if not failed:
+                print(f"⚠️  Job {job.id} was reclaimed by another worker, dropping its failure")
+        finally:
+            heartbeat.cancel()
+            self.fair_share.leave(job.id)
+            self._shares.pop(job.id, None)
+
+    async def _heartbeat(self, job: Job, work: asyncio.Task) -> None:
+        interval = settings.JOB_LEASE_SECONDS / 3
+        while not work.done():
+            await asyncio.sleep(interval)
+            if not await asyncio.to_thread(self.queue.heartbeat, job.id, self.worker_id):
+                work.cancel()
+                return
+
+    async def handle(self, job: Job, progress: ProgressReporter) -> Dict[str, Any]:
+        """Dispatch a job to its handler by kind"""
+        if job.kind == "ingest":
+            from app.services.ingestion import ingestion_service
+            return await ingestion_service.ingest_repo(
+                job.payload["repo_url"],
+                project_id=job.project_id,
+                commit=job.payload.get("commit"),
+                graph=self.graph,
+                progress=progress,
+                from_object_store=job.payload.get("from_object_store"),
+                share=self._shares.get(job.id),
+                progressive=job.payload.get("progressive")
+            )
+        if job.kind == "ingest_incremental":
+            from app.services.ingestion import ingestion_service
+            return await ingestion_service.ingest_incremental(
+                job.project_id,
+                commit=job.payload.get("commit"),
+                graph=self.graph,
+                progress=progress,
+                share=self._shares.get(job.id)
+            )
+        if job.kind == "ingest_workspace":
+            from app.services.ingestion import ingestion_service
+            return await ingestion_service.ingest_workspace(
+                job.project_id,
+                job.payload["workspace"],
+                commit=job.payload.get("commit"),
+                graph=self.graph,
+                progress=progress,
+                share=self._shares.get(job.id)
+            )
+        if job.kind == "ingest_local":
+            from app.services.ingestion import ingestion_service
+            return await ingestion_service.ingest_local(
+                job.payload["path"],
+                project_id=job.project_id,
+                graph=self.graph,
+                progress=progress,
+                share=self._shares.get(job.id)
+            )
+        if job.kind == "ingest_archive":
+            from app.services.archive import remove_staged, staged_chunks
+            from app.services.ingestion import ingestion_service
+            path = job.payload["archive_path"]
+            try:
+                result = await ingestion_service.ingest_archive(
+                    staged_chunks(path),
+                    project_id=job.project_id,
+                    strip_components=job.payload.get("strip_components", 0),
+                    graph=self.graph,
+                    progress=progress,
+                    share=self._shares.get(job.id),
+                    source=f"upload:{job.payload.get('sha256')}"
+                )
+            except Exception:
+                # Kept for the retry, if any
+                if job.attempts >= job.max_attempts:
+                    remove_staged(path)
+                raise
+            remove_staged(path)
+            return result
+        if job.kind == "ingest_history":
+            from app.services.history import history_service
+            return await history_service.ingest_history(
+                job.payload["repo_url"],
+                revs=job.payload.get("revs"),
+                last_tags=job.payload.get("last_tags"),
+                project_id=job.project_id,
+                graph=self.graph,
+                progress=progress,
+                share=self._shares.get(job.id)
+            )
+        raise ValueError(f"Unknown job kind: {job.kind}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Eonix ingestion worker")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.INGEST_WORKER_CONCURRENCY,
+        help="Jobs to run at once in this process"
+    )
+    parser.add_argument(
+        "--extraction-workers",
+        type=int,
+        default=None,
+        help="Extraction processes shared by this worker's jobs (default: one per core)"
+    )
+    args = parser.parse_args()
+
+    async def run() -> None:
+        worker = IngestWorker(
+            concurrency=args.concurrency,
+            extraction_workers=args.extraction_workers
+        )
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, worker.stop)
+        await worker.run()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
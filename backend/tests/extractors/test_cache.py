@@ -0,0 +1,94 @@
+"""
+Test the content-addressed extraction cache.
+"""
+
+import os
+import shutil
+import tempfile
+
+from app.extractors.cache import ExtractionCache, git_blob_hash
+from app.extractors.manager import ExtractionManager
+from app.schemas.uas import EndpointNode, ExtractionResult
+
+
+CODE = """
+from fastapi import FastAPI
+import httpx
+
+app = FastAPI()
+
+@app.get("/users")
+def list_users():
+    return httpx.get("https://api.stripe.com/v1/customers")
+"""
+
+
+def test_git_blob_hash_matches_git():
+    # `printf 'hello\\n' | git hash-object --stdin`
+    assert git_blob_hash(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+
+def test_identical_content_hits_and_is_retargeted():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        cache = ExtractionCache(os.path.join(temp_dir, "cache.db"))
+        manager = ExtractionManager(cache=cache)
+        uncached = ExtractionManager()
+        
+        first = os.path.join(temp_dir, "svc_a", "api.py")
+        second = os.path.join(temp_dir, "svc_b", "api.py")
+        for path in (first, second):
+            os.makedirs(os.path.dirname(path))
+            with open(path, 'w') as f:
+                f.write(CODE)
+        
+        manager.extract_file(first)
+        hit = manager.extract_file(second)
+        
+        assert cache.stats.misses == 1
+        assert cache.stats.hits == 1
+        expected = uncached.extract_file(second)
+        assert [n.model_dump() for n in hit.nodes] == [n.model_dump() for n in expected.nodes]
+        assert [e.model_dump() for e in hit.edges] == [e.model_dump() for e in expected.edges]
+        assert isinstance(hit.nodes[0], EndpointNode)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_lru_eviction_keeps_cache_bounded():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        cache = ExtractionCache(os.path.join(temp_dir, "cache.db"), max_bytes=200)
+        result = ExtractionResult(nodes=[], edges=[], warnings=["x" * 100])
+        
+        for i in range(10):
+            cache.put(f"key{i}", "a.py", result)
+        
+        summary = cache.summary()
+        assert summary["size_bytes"] <= 200
+        assert summary["evictions"] > 0
+        assert cache.get("key9") is not None
+        assert cache.get("key0") is None
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_hits_batch_their_last_access_writes():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        cache = ExtractionCache(os.path.join(temp_dir, "cache.db"))
+        result = ExtractionResult(nodes=[], edges=[])
+        cache.put("key", "a.py", result)
+        with cache._conn() as conn:
+            stored = conn.execute("SELECT last_access FROM entries").fetchone()["last_access"]
+        
+        for _ in range(5):
+            assert cache.get("key") is not None
+        with cache._conn() as conn:
+            assert conn.execute("SELECT last_access FROM entries").fetchone()["last_access"] == stored
+        
+        cache.flush_access()
+        with cache._conn() as conn:
+            assert conn.execute("SELECT last_access FROM entries").fetchone()["last_access"] > stored
+    finally:
+        shutil.rmtree(temp_dir)
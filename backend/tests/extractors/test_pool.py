@@ -0,0 +1,214 @@
+"""
+Test parallel extraction through the process pool.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.extractors.manager import ExtractionManager, extraction_manager
+from app.extractors.pool import ExtractionPool, PoolMetrics, WorkerLimits, plan_chunks
+from app.schemas.uas import EndpointNode
+from app.services.scanner import FileCategory, FileInfo
+
+
+ENDPOINT_CODE = """
+from fastapi import FastAPI
+
+app = FastAPI()
+
+@app.get("/items/{item_id}")
+def get_item(item_id: int):
+    return {}
+"""
+
+
+def create_files(count: int):
+    temp_dir = tempfile.mkdtemp()
+    paths = []
+    for i in range(count):
+        path = os.path.join(temp_dir, f"module_{i}.py")
+        with open(path, 'w') as f:
+            f.write(ENDPOINT_CODE)
+        paths.append(path)
+    return temp_dir, paths
+
+
+def test_pool_matches_sequential_extraction():
+    """Pool results should be identical to in-process extraction"""
+    temp_dir, paths = create_files(8)
+    try:
+        with ExtractionPool(max_workers=2) as pool:
+            results = dict(pool.extract_files(paths))
+        
+        assert set(results) == set(paths)
+        for path in paths:
+            expected = extraction_manager.extract_file(path)
+            assert results[path].model_dump() == expected.model_dump()
+            assert isinstance(results[path].nodes[0], EndpointNode)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_pool_async_yields_every_file():
+    """Async variant should yield one result per file"""
+    temp_dir, paths = create_files(5)
+    
+    async def run():
+        with ExtractionPool(max_workers=2) as pool:
+            return [path async for path, _ in pool.extract_files_async(paths)]
+    
+    try:
+        assert sorted(asyncio.run(run())) == sorted(paths)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def file_of_size(name: str, size: int) -> FileInfo:
+    return FileInfo(name, name, ".py", FileCategory.PYTHON, size)
+
+
+def test_plan_chunks_runs_largest_first_and_groups_small_files():
+    files = [file_of_size(f"small_{i}.py", 100) for i in range(40)]
+    files.insert(17, file_of_size("generated.py", 2_000_000))
+    
+    chunks = plan_chunks(files, workers=2, target_bytes=1000, max_files=8)
+    
+    # The big file goes first, alone; small files share tasks
+    assert [f.path for f in chunks[0]] == ["generated.py"]
+    assert all(1 < len(chunk) <= 8 for chunk in chunks[1:])
+    assert sorted(f.path for chunk in chunks for f in chunk) == sorted(f.path for f in files)
+
+
+def test_chunk_extraction_records_pool_metrics():
+    temp_dir, paths = create_files(4)
+    try:
+        metrics = PoolMetrics()
+        with ExtractionPool(max_workers=2) as pool:
+            chunk = pool.submit_chunk([(path, None) for path in paths]).result()
+        metrics.record(chunk)
+        
+        assert [path for path, _ in chunk.results] == paths
+        assert all(len(result.nodes) == 1 for _, result in chunk.results)
+        summary = metrics.to_dict()
+        assert summary["tasks"] == 1
+        assert summary["files_per_task"] == 4
+        assert summary["workers_used"] == 1
+        assert summary["load_balance"] == 1.0
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+needs_fork = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="workers must inherit the patched manager"
+)
+
+
+def test_pool_metrics_report_worker_cache_hits(monkeypatch):
+    """Hits in the workers' caches reach the job's pool metrics"""
+    temp_dir, paths = create_files(4)
+    monkeypatch.setattr(settings, "EXTRACTION_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "EXTRACTION_CACHE_PATH", os.path.join(temp_dir, "cache.db"))
+    try:
+        runs = []
+        for _ in range(2):
+            metrics = PoolMetrics()
+            with ExtractionPool(max_workers=1) as pool:
+                metrics.record(pool.submit_chunk([(path, None) for path in paths]).result())
+            runs.append(metrics.to_dict())
+        
+        # Identical files: the first is parsed, the rest hit
+        assert (runs[0]["cache_hits"], runs[0]["cache_misses"]) == (3, 1)
+        assert (runs[1]["cache_hits"], runs[1]["cache_misses"]) == (4, 0)
+        assert runs[1]["cache_hit_rate"] == 1.0
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_workers_are_not_forked_from_the_threaded_parent(monkeypatch):
+    """Forked workers could inherit locks held by the parent's other threads"""
+    assert ExtractionPool()._context.get_start_method() != "fork"
+    monkeypatch.setattr(settings, "EXTRACTION_START_METHOD", "no-such-method")
+    assert ExtractionPool()._context.get_start_method() == "spawn"
+
+
+def misbehaving_extract(original):
+    """Wrap extract_content so files named after a failure mode misbehave"""
+    def extract_content(self, file_path, content, content_hash=None, on_disk=False):
+        name = os.path.basename(file_path)
+        if name.startswith("slow"):
+            time.sleep(30)
+        elif name.startswith("stuck"):
+            # Ignores the soft timeout, so the parent has to kill the worker
+            signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+            time.sleep(30)
+        elif name.startswith("crash"):
+            os._exit(1)
+        return original(self, file_path, content, content_hash, on_disk)
+    return extract_content
+
+
+@needs_fork
+def test_bad_files_become_low_results_without_stalling_the_chunk(monkeypatch):
+    monkeypatch.setattr(settings, "EXTRACTION_START_METHOD", "fork")
+    monkeypatch.setattr(
+        ExtractionManager, "extract_content",
+        misbehaving_extract(ExtractionManager.extract_content)
+    )
+    temp_dir = tempfile.mkdtemp()
+    try:
+        paths = []
+        for name in ("ok_1.py", "slow.py", "stuck.py", "crash.py", "ok_2.py"):
+            path = os.path.join(temp_dir, name)
+            with open(path, 'w') as f:
+                f.write(ENDPOINT_CODE)
+            paths.append(path)
+        limits = WorkerLimits(
+            file_timeout=0.5, kill_grace=0.5, max_tasks=0, max_rss_bytes=0, max_as_bytes=0
+        )
+        
+        started = time.perf_counter()
+        with ExtractionPool(max_workers=1, limits=limits) as pool:
+            chunk = pool.submit_chunk([(path, None) for path in paths]).result()
+            # The replacement worker keeps serving later tasks
+            _, after = pool.submit(paths[0]).result()
+        
+        assert time.perf_counter() - started < 10
+        results = dict(chunk.results)
+        assert [path for path, _ in chunk.results] == paths
+        for name in ("ok_1.py", "ok_2.py"):
+            assert len(results[os.path.join(temp_dir, name)].nodes) == 1
+        for name, error in (("slow.py", "timed out"), ("stuck.py", "killed"), ("crash.py", "died")):
+            result = results[os.path.join(temp_dir, name)]
+            assert result.confidence == "LOW"
+            assert error in result.errors[0]
+        assert chunk.workers_replaced == 2
+        assert len(after.nodes) == 1
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_workers_are_recycled_after_max_tasks():
+    temp_dir, paths = create_files(3)
+    try:
+        limits = WorkerLimits(
+            file_timeout=0, kill_grace=0, max_tasks=2, max_rss_bytes=0, max_as_bytes=0
+        )
+        with ExtractionPool(max_workers=1, limits=limits) as pool:
+            first = pool.submit_chunk([(path, None) for path in paths]).result()
+            second = pool.submit_chunk([(paths[0], None)]).result()
+        
+        assert first.workers_recycled == 1
+        assert second.workers_recycled == 0
+        assert second.worker_pid != first.worker_pid
+        assert all(len(result.nodes) == 1 for _, result in first.results + second.results)
+    finally:
+        shutil.rmtree(temp_dir)
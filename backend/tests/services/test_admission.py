@@ -0,0 +1,133 @@
+"""
+Test single-flight deduplication and admission control of ingest requests.
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from app.core.config import settings
+from app.services.admission import BatchRepo, CommitResolver, IngestAdmission
+from app.services.job_queue import JobQueue, QueueFullError
+from app.services.project_store import ProjectState, ProjectStore
+from app.services.repo_store import RepositoryStore
+
+from tests.services.test_incremental import git, write
+
+
+def make_origin(workdir: str, name: str = "origin") -> str:
+    origin = os.path.join(workdir, name)
+    os.makedirs(origin)
+    git(origin, "init", "-q")
+    write(origin, "app.py", "print('v1')\n")
+    git(origin, "add", ".")
+    git(origin, "commit", "-qm", "initial")
+    return origin
+
+
+def make_admission(workdir: str) -> IngestAdmission:
+    return IngestAdmission(
+        queue=JobQueue(os.path.join(workdir, "jobs.db")),
+        projects=ProjectStore(os.path.join(workdir, "state.db")),
+        resolver=CommitResolver(ttl_seconds=0),
+        repos=RepositoryStore(os.path.join(workdir, "storage")),
+    )
+
+
+def test_identical_requests_share_one_job_and_reuse_results():
+    workdir = tempfile.mkdtemp()
+    try:
+        origin = make_origin(workdir)
+        admission = make_admission(workdir)
+
+        async def burst():
+            return await asyncio.gather(*[
+                admission.submit_ingest(url) for url in (origin, origin + "/", origin)
+            ])
+        submissions = asyncio.run(burst())
+
+        assert sorted(s.outcome for s in submissions) == ["attached", "attached", "queued"]
+        assert len({s.job.id for s in submissions}) == 1
+        job = submissions[0].job
+        commit = git(origin, "rev-parse", "HEAD").strip()
+        assert job.payload["commit"] == commit
+
+        # Once the job finished, the same commit reuses its project
+        admission.queue.claim("worker")
+        admission.queue.complete(job.id, {"status": "success"})
+        admission.projects.save(ProjectState(job.project_id, origin, "/tmp/x", commit))
+        reused = asyncio.run(admission.submit_ingest(origin))
+        assert reused.outcome == "reused"
+        assert reused.job.id == job.id
+
+        # A new commit is new work
+        write(origin, "app.py", "print('v2')\n")
+        git(origin, "commit", "-qam", "update")
+        fresh = asyncio.run(admission.submit_ingest(origin))
+        assert fresh.outcome == "queued"
+        assert fresh.job.project_id != job.project_id
+
+        # Other tenants never share jobs
+        other = asyncio.run(admission.submit_ingest(origin, tenant="other"))
+        assert other.outcome == "queued"
+    finally:
+        shutil.rmtree(workdir)
+
+
+def test_saturated_queue_refuses_new_work_but_attaches(monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_MAX_QUEUED_JOBS", 1)
+    workdir = tempfile.mkdtemp()
+    try:
+        first = make_origin(workdir, "first")
+        second = make_origin(workdir, "second")
+        admission = make_admission(workdir)
+
+        queued = asyncio.run(admission.submit_ingest(first))
+        with pytest.raises(QueueFullError) as error:
+            asyncio.run(admission.submit_ingest(second))
+        assert error.value.retry_after == settings.INGEST_RETRY_AFTER_SECONDS
+
+        attached = asyncio.run(admission.submit_ingest(first))
+        assert attached.outcome == "attached"
+        assert attached.job.id == queued.job.id
+    finally:
+        shutil.rmtree(workdir)
+
+
+def test_batch_is_admitted_as_a_unit_and_queued_largest_first(monkeypatch):
+    monkeypatch.setattr(settings, "TENANT_MAX_QUEUED_JOBS", 1)
+    workdir = tempfile.mkdtemp()
+    try:
+        small, large, cached = (make_origin(workdir, name) for name in ("small", "large", "cached"))
+        admission = make_admission(workdir)
+        admission.repos.ensure_mirror(cached)
+        single = asyncio.run(admission.submit_ingest(cached, tenant="org"))
+
+        submitted = asyncio.run(admission.submit_batch([
+            BatchRepo(small, size_hint=10),
+            BatchRepo(cached),
+            BatchRepo(large, size_hint=10 ** 9),
+            BatchRepo(small + "/"),
+        ], tenant="org"))
+
+        assert [s.outcome for s in submitted.submissions] == ["queued", "attached", "queued"]
+        assert submitted.submissions[1].job.id == single.job.id
+        items = submitted.batch.items
+        assert [item["repo_url"] for item in items] == [small, cached, large]
+        assert items[1]["size_estimate"] > 0
+
+        claimed = [admission.queue.claim("worker").payload["repo_url"] for _ in range(3)]
+        assert claimed == [cached, large, small]
+
+        admission.queue.complete(single.job.id, {"status": "success"})
+        status = admission.queue.batch_status(submitted.batch.id)
+        assert status["total"] == 3
+        assert status["jobs"] == {"queued": 0, "running": 2, "succeeded": 1, "failed": 0}
+        assert not status["done"]
+        assert [repo["status"] for repo in status["repos"]] == ["running", "succeeded", "running"]
+        assert admission.queue.batch_status("missing") is None
+    finally:
+        shutil.rmtree(workdir)
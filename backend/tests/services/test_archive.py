@@ -0,0 +1,198 @@
+"""
+Test streaming ingestion of uploaded archives and of local paths.
+"""
+
+import asyncio
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+
+import pytest
+
+import app.services.ingestion as ingestion_module
+from app.core.config import settings
+from app.services.admission import CommitResolver, IngestAdmission
+from app.services.archive import iter_archive, member_path
+from app.services.graph_service import GraphService
+from app.services.ingestion import IngestionService
+from app.services.job_queue import JobQueue, JobStatus, QueueFullError
+from app.services.project_store import ProjectStore
+from app.workers.ingest_worker import IngestWorker
+
+from tests.services.test_incremental import endpoint_code, endpoint_paths, write
+
+
+FILES = {
+    "repo-1a2b/app/api.py": endpoint_code("/api"),
+    "repo-1a2b/app/admin.py": endpoint_code("/admin"),
+    "repo-1a2b/node_modules/dep/index.py": endpoint_code("/vendored"),
+    "repo-1a2b/requirements.txt": "fastapi\n",
+}
+
+
+def make_tar() -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, text in FILES.items():
+            data = text.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+        evil = tarfile.TarInfo("../escape.py")
+        evil.size = 3
+        tar.addfile(evil, io.BytesIO(b"x=1"))
+    return buffer.getvalue()
+
+
+class Unseekable(io.RawIOBase):
+    """Write-only sink, so zipfile falls back to data descriptors like a streaming zipper"""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.data += b
+        return len(b)
+
+
+def make_zip(streamed: bool) -> bytes:
+    sink = Unseekable() if streamed else io.BytesIO()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, text in FILES.items():
+            archive.writestr(name, text)
+        archive.writestr(zipfile.ZipInfo("repo-1a2b/stored.py"), endpoint_code("/stored"))
+    return bytes(sink.data) if streamed else sink.getvalue()
+
+
+async def in_chunks(data: bytes, size: int = 777):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def test_member_paths_are_contained_and_stripped():
+    assert member_path("./repo/app/api.py", 1) == "app/api.py"
+    assert member_path("../etc/passwd") is None
+    assert member_path("/etc/passwd") is None
+    assert member_path("repo/", 1) is None
+
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_zip_members_are_read_front_to_back(streamed):
+    data = make_zip(streamed)
+    members = list(iter_archive(io.BytesIO(data), lambda path: path.endswith(".py"), 1))
+    by_path = {m.path: m.content for m in members}
+    assert set(by_path) == {
+        "app/api.py", "app/admin.py", "node_modules/dep/index.py", "requirements.txt", "stored.py"
+    }
+    assert by_path["app/api.py"] == FILES["repo-1a2b/app/api.py"].encode()
+    assert by_path["stored.py"] == endpoint_code("/stored").encode()
+    assert by_path["requirements.txt"] is None
+
+
+@pytest.mark.parametrize("make", [make_tar, lambda: make_zip(streamed=True)])
+def test_archive_upload_is_ingested_from_the_stream(monkeypatch, make):
+    storage = tempfile.mkdtemp()
+    try:
+        monkeypatch.setattr(settings, "REPO_STORAGE_PATH", storage)
+        monkeypatch.setattr(settings, "UPLOAD_BUFFER_MEMBERS", 1)
+        service = IngestionService()
+        graph = GraphService(use_mock=True)
+
+        result = asyncio.run(service.ingest_archive(
+            in_chunks(make()), project_id="up", graph=graph
+        ))
+
+        assert endpoint_paths(graph, "up") == ["/admin", "/api"] + (
+            ["/stored"] if make is not make_tar else []
+        )
+        assert result["primary_language"] == "Python"
+        # Nothing was written for the upload
+        assert os.listdir(storage) == []
+    finally:
+        shutil.rmtree(storage)
+
+
+def test_uploads_are_staged_and_ingested_by_a_worker(monkeypatch):
+    workdir = tempfile.mkdtemp()
+    try:
+        staging = os.path.join(workdir, "uploads")
+        monkeypatch.setattr(settings, "UPLOAD_STAGING_PATH", staging)
+        projects = ProjectStore(os.path.join(workdir, "state.db"))
+        monkeypatch.setattr(ingestion_module, "project_store", projects)
+        queue = JobQueue(os.path.join(workdir, "jobs.db"))
+        admission = IngestAdmission(queue=queue, projects=projects, resolver=CommitResolver(0))
+        data = make_tar()
+
+        first = asyncio.run(admission.submit_archive(in_chunks(data), strip_components=1))
+        second = asyncio.run(admission.submit_archive(in_chunks(data), strip_components=1))
+        assert (first.outcome, second.outcome) == ("queued", "attached")
+        assert second.job.id == first.job.id
+        assert len(os.listdir(staging)) == 1
+
+        graph = GraphService(use_mock=True)
+        worker = IngestWorker(queue=queue, concurrency=1, worker_id="w", graph=graph)
+        asyncio.run(worker.run(max_jobs=1))
+
+        assert queue.get(first.job.id).status == JobStatus.SUCCEEDED
+        assert endpoint_paths(graph, first.job.project_id) == ["/admin", "/api"]
+        assert os.listdir(staging) == []
+        assert projects.get(first.job.project_id).repo_url.startswith("upload:")
+
+        again = asyncio.run(admission.submit_archive(in_chunks(data), strip_components=1))
+        assert again.outcome == "reused" and again.job.id == first.job.id
+        assert os.listdir(staging) == []
+
+        # Saturated: refused before the body is read
+        admission._uploads = settings.UPLOAD_MAX_CONCURRENT
+        with pytest.raises(QueueFullError):
+            asyncio.run(admission.submit_archive(in_chunks(data)))
+    finally:
+        shutil.rmtree(workdir)
+
+
+def test_streamed_uploads_hold_an_upload_slot(monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_MAX_CONCURRENT", 1)
+    queue = JobQueue(os.path.join(tempfile.mkdtemp(), "jobs.db"))
+    admission = IngestAdmission(queue=queue, resolver=CommitResolver(0))
+
+    async def run():
+        async with admission.upload_slot():
+            with pytest.raises(QueueFullError):
+                async with admission.upload_slot():
+                    pass
+        # Released once the upload is done
+        async with admission.upload_slot():
+            pass
+
+    asyncio.run(run())
+    assert admission._uploads == 0
+
+
+def test_local_path_ingest_is_limited_to_allowed_roots(monkeypatch):
+    workdir = tempfile.mkdtemp()
+    try:
+        mounted = os.path.join(workdir, "mounted", "service")
+        os.makedirs(mounted)
+        write(mounted, "app.py", endpoint_code("/local"))
+        monkeypatch.setattr(settings, "REPO_STORAGE_PATH", os.path.join(workdir, "storage"))
+        service = IngestionService()
+        graph = GraphService(use_mock=True)
+
+        with pytest.raises(PermissionError):
+            asyncio.run(service.ingest_local(mounted, project_id="loc", graph=graph))
+
+        monkeypatch.setattr(settings, "LOCAL_INGEST_ROOTS", [os.path.join(workdir, "mounted")])
+        result = asyncio.run(service.ingest_local(mounted, project_id="loc", graph=graph))
+
+        assert result["path"] == os.path.realpath(mounted)
+        assert endpoint_paths(graph, "loc") == ["/local"]
+        with pytest.raises(PermissionError):
+            asyncio.run(service.ingest_local(os.path.join(mounted, "..", ".."), graph=graph))
+    finally:
+        shutil.rmtree(workdir)
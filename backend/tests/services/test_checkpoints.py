@@ -0,0 +1,80 @@
+"""
+Test that a failed ingest resumes from its per-file checkpoints.
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+
+import pytest
+
+import app.services.ingestion as ingestion_module
+from app.core.config import settings
+from app.services.checkpoints import CheckpointStore, ingest_scope
+from app.services.graph_service import GraphService
+from app.services.ingestion import IngestionService
+from app.services.progress import ProgressReporter
+from app.services.project_store import ProjectStore
+from app.services.repo_store import RepositoryStore
+
+from tests.services.test_incremental import endpoint_code, endpoint_paths, git, write
+
+
+class CrashingGraph(GraphService):
+    """Mock graph whose writes fail after a number of batches"""
+
+    def __init__(self, fail_after: int):
+        super().__init__(use_mock=True)
+        self.fail_after = fail_after
+        self.saved_batches = 0
+
+    async def save_extraction_result(self, project_id, result, batch_size=100):
+        if self.saved_batches >= self.fail_after:
+            raise RuntimeError("graph connection lost")
+        self.saved_batches += 1
+        await super().save_extraction_result(project_id, result, batch_size)
+
+
+def test_retried_ingest_skips_checkpointed_files(monkeypatch):
+    workdir = tempfile.mkdtemp()
+    origin = os.path.join(workdir, "origin")
+    os.makedirs(origin)
+    try:
+        git(origin, "init", "-q")
+        for name in ("a", "b", "c"):
+            write(origin, f"{name}.py", endpoint_code(f"/{name}"))
+        git(origin, "add", ".")
+        git(origin, "commit", "-qm", "initial")
+
+        storage = os.path.join(workdir, "storage")
+        checkpoints = CheckpointStore(os.path.join(workdir, "checkpoints.db"))
+        monkeypatch.setattr(settings, "REPO_STORAGE_PATH", storage)
+        monkeypatch.setattr(settings, "GRAPH_WRITE_BATCH_SIZE", 1)
+        monkeypatch.setattr(ingestion_module, "checkpoint_store", checkpoints)
+        monkeypatch.setattr(ingestion_module, "project_store",
+                            ProjectStore(os.path.join(workdir, "state.db")))
+        monkeypatch.setattr(ingestion_module, "repo_store", RepositoryStore(storage))
+        service = IngestionService()
+        graph = CrashingGraph(fail_after=1)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(service.ingest_repo(origin, project_id="p1", graph=graph))
+        commit = git(origin, "rev-parse", "HEAD").strip()
+        assert len(checkpoints.completed(ingest_scope("p1", commit))) == 1
+
+        graph.fail_after = 100
+        progress = ProgressReporter()
+        result = asyncio.run(service.ingest_repo(
+            origin, project_id="p1", graph=graph, progress=progress
+        ))
+
+        assert result["status"] == "success"
+        assert progress.progress.files_resumed == 1
+        assert progress.progress.files_done == 3
+        assert graph.saved_batches == 3
+        assert endpoint_paths(graph, "p1") == ["/a", "/b", "/c"]
+        # A finished run forgets its checkpoints
+        assert checkpoints.completed(ingest_scope("p1", commit)) == set()
+    finally:
+        shutil.rmtree(workdir)
@@ -0,0 +1,126 @@
+"""
+Test ingestion straight from the git object store.
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+
+import pytest
+
+import app.services.ingestion as ingestion_module
+from app.core.config import settings
+from app.services.git_objects import GitObjectReader, list_tree
+from app.services.graph_service import GraphService
+from app.services.ingestion import IngestionService
+from app.services.project_store import ProjectStore
+from app.services.repo_store import GitCommandError, RepositoryStore
+
+from tests.services.test_incremental import endpoint_code, endpoint_paths, git, write
+
+
+def test_reader_streams_blobs_listed_by_ls_tree():
+    repo = tempfile.mkdtemp()
+    try:
+        git(repo, "init", "-q")
+        os.makedirs(os.path.join(repo, "pkg"))
+        write(repo, "pkg/a.py", "print('a')\n")
+        write(repo, "b.txt", "")
+        git(repo, "add", ".")
+        git(repo, "commit", "-qm", "initial")
+
+        entries = {e.path: e for e in list_tree(repo)}
+        assert sorted(entries) == ["b.txt", "pkg/a.py"]
+        assert entries["pkg/a.py"].size_bytes == len("print('a')\n")
+
+        with GitObjectReader(repo) as reader:
+            # One process serves every request, including empty blobs
+            assert reader.read_blob(entries["pkg/a.py"].sha) == b"print('a')\n"
+            assert reader.read_blob(entries["b.txt"].sha) == b""
+            with pytest.raises(GitCommandError):
+                reader.read_blob("0" * 40)
+            assert reader.read_text(entries["pkg/a.py"].sha) == "print('a')\n"
+    finally:
+        shutil.rmtree(repo)
+
+
+def test_object_store_ingest_matches_checkout_without_worktree(monkeypatch):
+    workdir = tempfile.mkdtemp()
+    origin = os.path.join(workdir, "origin")
+    os.makedirs(os.path.join(origin, "node_modules"))
+    try:
+        git(origin, "init", "-q")
+        write(origin, "requirements.txt", "fastapi\n")
+        write(origin, "users.py", endpoint_code("/users"))
+        write(origin, "orders.py", endpoint_code("/orders"))
+        write(origin, "node_modules/vendored.py", endpoint_code("/vendored"))
+        git(origin, "add", ".")
+        git(origin, "commit", "-qm", "initial")
+
+        storage = os.path.join(workdir, "storage")
+        monkeypatch.setattr(settings, "REPO_STORAGE_PATH", storage)
+        monkeypatch.setattr(ingestion_module, "project_store",
+                            ProjectStore(os.path.join(workdir, "state.db")))
+        monkeypatch.setattr(ingestion_module, "repo_store", RepositoryStore(storage))
+        service = IngestionService()
+        graph = GraphService(use_mock=True)
+
+        checkout = asyncio.run(service.ingest_repo(
+            origin, project_id="checkout", graph=graph, from_object_store=False
+        ))
+        objects = asyncio.run(service.ingest_repo(
+            origin, project_id="objects", graph=graph, from_object_store=True
+        ))
+
+        assert not os.path.exists(os.path.join(storage, "objects"))
+        assert objects["commit"] == checkout["commit"]
+        assert objects["total_files"] == checkout["total_files"] == 2
+        assert objects["primary_language"] == checkout["primary_language"]
+        assert objects["frameworks"] == checkout["frameworks"]
+        assert endpoint_paths(graph, "objects") == endpoint_paths(graph, "checkout") == [
+            "/orders", "/users"
+        ]
+
+        # Node file paths point at the project path, as with a checkout
+        file_paths = {
+            n["file_path"] for n in graph._mock_nodes.values()
+            if n["project_id"] == "objects" and "file_path" in n
+        }
+        assert os.path.join(storage, "objects", "users.py") in file_paths
+    finally:
+        shutil.rmtree(workdir)
+
+
+def test_partial_mirror_fetches_a_tree_in_one_request(monkeypatch):
+    workdir = tempfile.mkdtemp()
+    origin = os.path.join(workdir, "origin")
+    os.makedirs(origin)
+    try:
+        git(origin, "init", "-q")
+        git(origin, "config", "uploadpack.allowFilter", "true")
+        git(origin, "config", "uploadpack.allowAnySHA1InWant", "true")
+        for i in range(5):
+            write(origin, f"mod_{i}.py", f"x = {i}\n" * (i + 1))
+        git(origin, "add", ".")
+        git(origin, "commit", "-qm", "initial")
+
+        store = RepositoryStore(os.path.join(workdir, "storage"), partial=True)
+        mirror = store.ensure_mirror("file://" + origin)
+        assert "?" in git(mirror, "rev-list", "--objects", "--no-walk", "--missing=print", "HEAD")
+
+        trace = os.path.join(workdir, "trace")
+        monkeypatch.setenv("GIT_TRACE", trace)
+        entries = list_tree(mirror)
+        monkeypatch.delenv("GIT_TRACE")
+
+        with open(trace) as f:
+            assert sum("built-in: git fetch" in line for line in f) == 1
+
+        assert sorted(e.size_bytes for e in entries) == [len(f"x = {i}\n") * (i + 1) for i in range(5)]
+        # Every blob is local now: reads work even with the remote gone
+        git(mirror, "remote", "set-url", "origin", "file://" + os.path.join(workdir, "gone"))
+        with GitObjectReader(mirror) as reader:
+            assert all(len(reader.read_blob(e.sha)) == e.size_bytes for e in entries)
+    finally:
+        shutil.rmtree(workdir)
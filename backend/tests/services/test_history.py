@@ -0,0 +1,80 @@
+"""
+Test multi-commit history analysis with extraction shared across commits.
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+
+import app.services.history as history_module
+import app.services.ingestion as ingestion_module
+from app.core.config import settings
+from app.services.checkpoints import CheckpointStore
+from app.services.graph_service import GraphService
+from app.services.history import HistoryService, HistoryStore
+from app.services.repo_store import RepositoryStore
+
+from tests.services.test_incremental import endpoint_code, git, write
+
+
+def test_history_extracts_each_version_once(monkeypatch):
+    workdir = tempfile.mkdtemp()
+    origin = os.path.join(workdir, "origin")
+    os.makedirs(origin)
+    try:
+        git(origin, "init", "-q")
+        write(origin, "a.py", endpoint_code("/a"))
+        write(origin, "b.py", endpoint_code("/b"))
+        git(origin, "add", ".")
+        git(origin, "commit", "-qm", "v1")
+        git(origin, "tag", "v1")
+        write(origin, "b.py", endpoint_code("/b2"))
+        git(origin, "commit", "-qam", "v2")
+        git(origin, "tag", "v2")
+        # A vendored copy of a.py: same blob, new path
+        write(origin, "c.py", endpoint_code("/a"))
+        git(origin, "add", ".")
+        git(origin, "commit", "-qm", "v3")
+        git(origin, "tag", "v3")
+
+        storage = os.path.join(workdir, "storage")
+        checkpoints = CheckpointStore(os.path.join(workdir, "checkpoints.db"))
+        monkeypatch.setattr(settings, "REPO_STORAGE_PATH", storage)
+        monkeypatch.setattr(history_module, "repo_store", RepositoryStore(storage))
+        monkeypatch.setattr(history_module, "checkpoint_store", checkpoints)
+        monkeypatch.setattr(ingestion_module, "checkpoint_store", checkpoints)
+        service = HistoryService(HistoryStore(os.path.join(workdir, "history.db")))
+        graph = GraphService(use_mock=True)
+
+        result = asyncio.run(service.ingest_history(
+            origin, revs=["v1", "v2", "v3"], project_id="h1", graph=graph
+        ))
+
+        assert [s["new_versions"] for s in result["snapshots"]] == [2, 1, 1]
+        assert result["file_references"] == 7
+        # a.py, b.py at v1, b.py at v2; c.py reuses a.py's extraction
+        assert result["versions_extracted"] == 3
+        assert len(graph._mock_nodes) == 4
+
+        def endpoints(ref):
+            snapshot = asyncio.run(service.snapshot_graph("h1", ref, graph))
+            return sorted(
+                (n["relative_path"], n["path"]) for n in snapshot["nodes"] if n["type"] == "Endpoint"
+            )
+
+        assert endpoints("v1") == [("a.py", "/a"), ("b.py", "/b")]
+        assert endpoints("v2") == [("a.py", "/a"), ("b.py", "/b2")]
+        assert endpoints("v3") == [("a.py", "/a"), ("b.py", "/b2"), ("c.py", "/a")]
+
+        # A later run over a new tag only extracts what changed since
+        write(origin, "a.py", endpoint_code("/a2"))
+        git(origin, "commit", "-qam", "v4")
+        git(origin, "tag", "v4")
+        later = asyncio.run(service.ingest_history(
+            origin, revs=["v3", "v4"], project_id="h1", graph=graph
+        ))
+        assert later["versions_new"] == 1
+        assert [s.ref for s in service.store.snapshots("h1")] == ["v1", "v2", "v3", "v4"]
+    finally:
+        shutil.rmtree(workdir)
@@ -0,0 +1,85 @@
+"""
+Test gitignore-compatible ignore rules and their use by the scanner.
+"""
+
+import os
+import shutil
+import tempfile
+
+from app.core.config import settings
+from app.services.ignore import IgnoreRules, is_ignored
+from app.services.scanner import RepositoryScanner
+
+from tests.services.test_scanner import write
+
+
+def test_gitignore_semantics():
+    rules = IgnoreRules.from_text(
+        "# comment\n"
+        "*.min.js\n"
+        "**/generated/**\n"
+        "/root-only.py\n"
+        "docs/*.py\n"
+        "logs/\n"
+        "!keep.min.js\n"
+        "file[0-9].py\n"
+        "\\#literal.py\n"
+    )
+
+    assert rules.match("static/app.min.js", False) is True
+    assert rules.match("static/keep.min.js", False) is False
+    assert rules.match("src/generated/client.py", False) is True
+    assert rules.match("generated/deep/x.py", False) is True
+    assert rules.match("generated", True) is None  # "/**" matches inside only
+    assert rules.match("root-only.py", False) is True
+    assert rules.match("pkg/root-only.py", False) is None
+    assert rules.match("docs/conf.py", False) is True
+    assert rules.match("docs/api/conf.py", False) is None  # "*" stops at "/"
+    assert rules.match("pkg/logs", True) is True
+    assert rules.match("pkg/logs", False) is None  # Directories only
+    assert rules.match("file7.py", False) is True
+    assert rules.match("#literal.py", False) is True
+
+
+def test_later_layers_take_precedence():
+    builtin = IgnoreRules(["build/"])
+    nested = IgnoreRules(["*.py", "!main.py"], base="services/api")
+    user = IgnoreRules(["!build/"])
+
+    assert is_ignored([builtin], "build", True)
+    assert not is_ignored([builtin, user], "build", True)
+    assert is_ignored([nested], "services/api/util.py", False)
+    assert not is_ignored([nested], "services/api/main.py", False)
+    assert not is_ignored([nested], "services/web/util.py", False)
+
+
+def test_scanner_applies_eonixignore_and_nested_gitignores(monkeypatch):
+    monkeypatch.setattr(settings, "SCAN_USE_GIT", False)
+    repo = tempfile.mkdtemp()
+    try:
+        write(repo, "app/main.py", "x = 1\n")
+        write(repo, "app/generated/models.py", "x = 2\n")
+        write(repo, "app/static/bundle.min.js", "x=3\n")
+        write(repo, "app/static/site.js", "x = 4\n")
+        write(repo, "build/tool.py", "x = 5\n")
+        write(repo, "lib.egg-info/setup.py", "x = 6\n")
+        write(repo, "services/.gitignore", "api/fixtures/\n")
+        write(repo, "services/api/fixtures/data.py", "x = 7\n")
+        write(repo, "services/api/handlers.py", "x = 8\n")
+        write(repo, ".eonixignore", "**/generated/**\n*.min.js\n!build/\n")
+
+        scanner = RepositoryScanner()
+        scanner.load_eonixignore(repo)
+        paths = sorted(f.relative_path.replace(os.sep, '/') for f in scanner.scan(repo))
+
+        assert paths == [
+            "app/main.py", "app/static/site.js", "build/tool.py", "services/api/handlers.py"
+        ]
+        assert scanner.accepts("app/generated/models.py") is False
+        assert scanner.accepts("lib.egg-info/setup.py") is False
+
+        # A workspace scan still sees the .gitignore above it
+        sub = RepositoryScanner().scan(repo, subdir="services/api")
+        assert [f.relative_path for f in sub] == [os.path.join("services", "api", "handlers.py")]
+    finally:
+        shutil.rmtree(repo)
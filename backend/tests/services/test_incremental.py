@@ -0,0 +1,132 @@
+"""
+Test incremental re-ingestion driven by git diff.
+"""
+
+import asyncio
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import app.services.ingestion as ingestion_module
+from app.core.config import settings
+from app.services.graph_service import GraphService
+from app.services.ingestion import IngestionService
+from app.services.project_store import ProjectStore
+from app.services.detector import LanguageDetector
+from app.services.repo_store import RepositoryStore
+
+
+def endpoint_code(path: str) -> str:
+    return f"""
+from fastapi import FastAPI
+
+app = FastAPI()
+
+@app.get("{path}")
+def handler():
+    return {{}}
+"""
+
+
+def git(repo_path: str, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.email=test@example.com", "-c", "user.name=Test", *args],
+        cwd=repo_path, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def write(repo_path: str, name: str, content: str) -> None:
+    with open(os.path.join(repo_path, name), 'w') as f:
+        f.write(content)
+
+
+def endpoint_paths(graph: GraphService, project_id: str):
+    return sorted(
+        n['path'] for n in graph._mock_nodes.values()
+        if n['project_id'] == project_id and n['type'] == 'Endpoint'
+    )
+
+
+def test_incremental_ingest_applies_only_the_diff(monkeypatch):
+    workdir = tempfile.mkdtemp()
+    origin = os.path.join(workdir, "origin")
+    os.makedirs(origin)
+    try:
+        git(origin, "init", "-q")
+        write(origin, "users.py", endpoint_code("/users"))
+        write(origin, "orders.py", endpoint_code("/orders"))
+        write(origin, "legacy.py", endpoint_code("/legacy"))
+        git(origin, "add", ".")
+        git(origin, "commit", "-qm", "initial")
+        
+        monkeypatch.setattr(settings, "REPO_STORAGE_PATH", os.path.join(workdir, "storage"))
+        monkeypatch.setattr(ingestion_module, "project_store",
+                            ProjectStore(os.path.join(workdir, "state.db")))
+        monkeypatch.setattr(ingestion_module, "repo_store",
+                            RepositoryStore(os.path.join(workdir, "storage")))
+        service = IngestionService()
+        graph = GraphService(use_mock=True)
+        
+        first = asyncio.run(service.ingest_repo(origin, project_id="p1", graph=graph))
+        assert endpoint_paths(graph, "p1") == ["/legacy", "/orders", "/users"]
+        
+        write(origin, "users.py", endpoint_code("/v2/users"))
+        write(origin, "billing.py", endpoint_code("/billing"))
+        git(origin, "rm", "-q", "legacy.py")
+        git(origin, "add", ".")
+        git(origin, "commit", "-qm", "update")
+        
+        result = asyncio.run(service.ingest_incremental("p1", graph=graph))
+        
+        assert result["commit"] != first["commit"]
+        assert result["files_extracted"] == 2
+        assert result["files_removed"] == 1
+        assert endpoint_paths(graph, "p1") == ["/billing", "/orders", "/v2/users"]
+        
+        unchanged = asyncio.run(service.ingest_incremental("p1", graph=graph))
+        assert unchanged["status"] == "unchanged"
+    finally:
+        shutil.rmtree(workdir)
+
+
+def test_scans_leave_the_event_loop_free(monkeypatch):
+    workdir = tempfile.mkdtemp()
+    origin = os.path.join(workdir, "origin")
+    os.makedirs(origin)
+    try:
+        git(origin, "init", "-q")
+        write(origin, "users.py", endpoint_code("/users"))
+        git(origin, "add", ".")
+        git(origin, "commit", "-qm", "initial")
+        monkeypatch.setattr(settings, "REPO_STORAGE_PATH", os.path.join(workdir, "storage"))
+        monkeypatch.setattr(ingestion_module, "project_store",
+                            ProjectStore(os.path.join(workdir, "state.db")))
+        monkeypatch.setattr(ingestion_module, "repo_store",
+                            RepositoryStore(os.path.join(workdir, "storage")))
+        detect = LanguageDetector.detect
+
+        def slow_detect(self):
+            time.sleep(1)  # A large checkout
+            return detect(self)
+
+        monkeypatch.setattr(LanguageDetector, "detect", slow_detect)
+
+        async def main():
+            # Stands in for the job heartbeat sharing the worker's loop
+            ticks = []
+
+            async def heartbeat():
+                while True:
+                    ticks.append(time.monotonic())
+                    await asyncio.sleep(0.05)
+
+            beat = asyncio.create_task(heartbeat())
+            await IngestionService().ingest_repo(origin, project_id="p1", graph=GraphService(use_mock=True))
+            beat.cancel()
+            return max(b - a for a, b in zip(ticks, ticks[1:]))
+
+        assert asyncio.run(main()) < 0.5
+    finally:
+        shutil.rmtree(workdir)
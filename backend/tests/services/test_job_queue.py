@@ -0,0 +1,160 @@
+"""
+Test the durable job queue and the ingest worker loop.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import settings
+from app.services.job_queue import JobQueue, JobStatus
+from app.workers.ingest_worker import IngestWorker
+
+
+def make_queue() -> JobQueue:
+    return JobQueue(os.path.join(tempfile.mkdtemp(), "jobs.db"))
+
+
+def test_claim_and_complete():
+    queue = make_queue()
+    job = queue.enqueue("ingest", "project-1", {"repo_url": "https://example.com/repo.git"})
+    
+    claimed = queue.claim("worker-a")
+    assert claimed.id == job.id
+    assert claimed.status == JobStatus.RUNNING
+    assert claimed.attempts == 1
+    assert queue.claim("worker-b") is None
+    
+    queue.complete(job.id, {"total_files": 3})
+    done = queue.get(job.id)
+    assert done.status == JobStatus.SUCCEEDED
+    assert done.result == {"total_files": 3}
+
+
+def test_first_use_from_many_threads_creates_the_schema_once():
+    queue = make_queue()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        jobs = list(executor.map(
+            lambda i: queue.enqueue("ingest", f"project-{i}", {}), range(16)
+        ))
+    
+    assert len({job.id for job in jobs}) == 16
+
+
+def test_expired_lease_is_reclaimed():
+    """A job whose worker stopped heartbeating is handed to another worker"""
+    queue = make_queue()
+    job = queue.enqueue("ingest", "project-1", {})
+    
+    queue.claim("worker-a", lease_seconds=-1)
+    reclaimed = queue.claim("worker-b")
+    
+    assert reclaimed.id == job.id
+    assert reclaimed.worker_id == "worker-b"
+    assert reclaimed.attempts == 2
+    assert not queue.heartbeat(job.id, "worker-a")
+    
+    # The stale worker's progress, failure or result must not overwrite the new run
+    assert not queue.update_progress(job.id, {"stage": "extract"}, worker_id="worker-a")
+    assert not queue.fail(job.id, "stale worker crashed", worker_id="worker-a")
+    assert not queue.complete(job.id, {"total_files": 1}, worker_id="worker-a")
+    assert queue.get(job.id).status == JobStatus.RUNNING
+    assert queue.complete(job.id, {"total_files": 3}, worker_id="worker-b")
+    assert queue.get(job.id).result == {"total_files": 3}
+    assert not queue.complete(job.id, {"total_files": 3}, worker_id="worker-b")
+
+
+def test_failures_retry_until_attempts_exhausted():
+    queue = make_queue()
+    job = queue.enqueue("ingest", "project-1", {}, max_attempts=2)
+    
+    queue.claim("worker-a")
+    queue.fail(job.id, "clone failed")
+    assert queue.get(job.id).status == JobStatus.QUEUED
+    
+    queue.claim("worker-a")
+    queue.fail(job.id, "clone failed again")
+    failed = queue.get(job.id)
+    assert failed.status == JobStatus.FAILED
+    assert failed.error == "clone failed again"
+
+
+class RecordingWorker(IngestWorker):
+    def __init__(self, queue):
+        super().__init__(queue=queue, concurrency=2, worker_id="test", graph=object())
+        self.handled = []
+    
+    async def handle(self, job, progress):
+        self.handled.append(job.project_id)
+        if job.payload.get("explode"):
+            raise RuntimeError("boom")
+        return {"ok": True}
+
+
+def test_worker_runs_jobs_and_records_failures():
+    queue = make_queue()
+    good = queue.enqueue("ingest", "good", {})
+    bad = queue.enqueue("ingest", "bad", {"explode": True}, max_attempts=1)
+    
+    worker = RecordingWorker(queue)
+    asyncio.run(worker.run(max_jobs=2))
+    
+    assert sorted(worker.handled) == ["bad", "good"]
+    assert queue.get(good.id).status == JobStatus.SUCCEEDED
+    assert queue.get(bad.id).status == JobStatus.FAILED
+
+
+def test_slow_queue_calls_do_not_block_running_jobs(monkeypatch):
+    """A claim waiting on the database lock runs off the worker's event loop"""
+    class ContendedQueue(JobQueue):
+        def claim(self, worker_id, **kwargs):
+            job = super().claim(worker_id, **kwargs)
+            if job is None:
+                time.sleep(0.5)  # Another process holds the write lock
+            return job
+    
+    class TickingWorker(IngestWorker):
+        async def handle(self, job, progress):
+            gaps, last = [], time.monotonic()
+            for _ in range(50):
+                await asyncio.sleep(0.01)
+                gaps.append(time.monotonic() - last)
+                last = time.monotonic()
+            return {"max_gap": max(gaps)}
+    
+    monkeypatch.setattr(settings, "JOB_POLL_INTERVAL", 0.05)
+    queue = ContendedQueue(os.path.join(tempfile.mkdtemp(), "jobs.db"))
+    job = queue.enqueue("ingest", "project-1", {})
+    worker = TickingWorker(queue=queue, concurrency=2, worker_id="test", graph=object())
+    
+    async def run():
+        runner = asyncio.create_task(worker.run())
+        while queue.get(job.id).status != JobStatus.SUCCEEDED:
+            await asyncio.sleep(0.05)
+        worker.stop()
+        await runner
+    
+    asyncio.run(run())
+    assert queue.get(job.id).result["max_gap"] < 0.25
+
+
+def test_progress_snapshots_are_persisted():
+    from app.services.progress import IngestStage, ProgressReporter
+    
+    queue = make_queue()
+    job = queue.enqueue("ingest", "project-1", {})
+    progress = ProgressReporter(queue, job.id, flush_interval=0)
+    
+    progress.set_total(4)
+    progress.set_stage(IngestStage.EXTRACT)
+    progress.file_done("a.py")
+    progress.error("b.py: syntax error")
+    
+    snapshot = queue.latest_for_project("project-1").progress
+    assert snapshot["stage"] == "extract"
+    assert snapshot["files_done"] == 1
+    assert snapshot["files_total"] == 4
+    assert snapshot["error_count"] == 1
+    assert snapshot["eta_seconds"] is not None
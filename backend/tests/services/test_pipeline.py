@@ -0,0 +1,231 @@
+"""
+Test the streaming extraction-to-graph pipeline.
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from app.core.config import settings
+from app.schemas.uas import ExtractionResult
+from app.services.graph_service import GraphService
+from app.services.pipeline import IngestionPipeline, iterate_in_thread
+from app.services.scanner import RepositoryScanner, count_files, quick_look_rank, without_paths
+
+
+ENDPOINT_CODE = """
+from fastapi import FastAPI
+
+app = FastAPI()
+
+@app.get("/items/{item_id}")
+def get_item(item_id: int):
+    return {}
+"""
+
+
+def create_repo(count: int) -> str:
+    temp_dir = tempfile.mkdtemp()
+    for i in range(count):
+        with open(os.path.join(temp_dir, f"module_{i}.py"), 'w') as f:
+            f.write(ENDPOINT_CODE)
+    return temp_dir
+
+
+def run_pipeline(repo_path: str, **kwargs):
+    graph = GraphService(use_mock=True)
+    files = RepositoryScanner().scan(repo_path)
+    pipeline = IngestionPipeline("project-1", graph=graph, **kwargs)
+    stats = asyncio.run(pipeline.run(files))
+    return graph, stats
+
+
+def test_pipeline_writes_every_node_in_batches():
+    """All nodes reach the graph, split into several bounded batches"""
+    repo_path = create_repo(12)
+    try:
+        graph, stats = run_pipeline(repo_path, batch_size=5, queue_size=2, max_workers=1)
+        
+        assert stats.files_extracted == 12
+        assert stats.nodes_written == 12
+        assert stats.batches_written == 3
+        assert len(graph._mock_nodes) == 12
+    finally:
+        shutil.rmtree(repo_path)
+
+
+def test_pipeline_with_process_pool(monkeypatch):
+    """The pool-backed extract stage produces the same graph"""
+    monkeypatch.setattr(settings, "PARALLEL_EXTRACTION_MIN_FILES", 1)
+    repo_path = create_repo(6)
+    try:
+        graph, stats = run_pipeline(repo_path, batch_size=2, max_workers=2)
+        
+        assert stats.files_extracted == 6
+        assert len(graph._mock_nodes) == 6
+        
+        metrics = stats.pool_metrics.to_dict()
+        assert metrics["files"] == 6
+        assert 1 <= metrics["tasks"] <= 6
+        assert 0 < metrics["load_balance"] <= 1
+    finally:
+        shutil.rmtree(repo_path)
+
+
+def test_identical_files_are_extracted_once_and_retargeted():
+    """Copies share one extraction; each still gets nodes under its own path"""
+    repo_path = create_repo(4)
+    try:
+        with open(os.path.join(repo_path, "other.py"), 'w') as f:
+            f.write(ENDPOINT_CODE.replace("/items/", "/orders/"))
+        scanner = RepositoryScanner()
+        files = scanner.deduplicate(scanner.scan(repo_path))
+        
+        assert len(files) == 2
+        assert scanner.stats.duplicate_files == 3
+        assert scanner.stats.dedup_ratio == 0.6
+        
+        graph = GraphService(use_mock=True)
+        stats = asyncio.run(IngestionPipeline("project-1", graph=graph, max_workers=1).run(files))
+        
+        assert stats.files_total == 5
+        assert stats.files_extracted == 5
+        assert stats.files_retargeted == 3
+        assert sorted(n["file_path"] for n in graph._mock_nodes.values()) == sorted(
+            os.path.join(repo_path, name)
+            for name in ("module_0.py", "module_1.py", "module_2.py", "module_3.py", "other.py")
+        )
+        assert all(node_id.startswith(node["file_path"]) for node_id, node in graph._mock_nodes.items())
+    finally:
+        shutil.rmtree(repo_path)
+
+
+def test_without_paths_promotes_a_remaining_copy():
+    repo_path = create_repo(3)
+    try:
+        scanner = RepositoryScanner()
+        files = scanner.deduplicate(scanner.scan(repo_path))
+        first, *copies = [files[0], *files[0].duplicates]
+        
+        remaining = without_paths(files, {first.path})
+        
+        assert [f.path for f in remaining] == [copies[0].path]
+        assert [f.path for f in remaining[0].duplicates] == [copies[1].path]
+        assert count_files(remaining) == 2
+    finally:
+        shutil.rmtree(repo_path)
+
+
+def test_quick_look_rank_prefers_routes_and_models():
+    assert quick_look_rank("app/urls.py") == 0
+    assert quick_look_rank("src/users/users.controller.ts") == 0
+    assert quick_look_rank("shop/models.py") == 0
+    assert quick_look_rank("src/api/v1/users.py") == 1
+    assert quick_look_rank("src/utils/strings.py") == 2
+
+
+def test_progressive_pipeline_writes_high_value_files_first():
+    """Routes and models land in the graph before every other file"""
+    repo_path = create_repo(8)
+    try:
+        for name in ("models.py", os.path.join("api", "users.py"), os.path.join("routes", "orders.py")):
+            os.makedirs(os.path.dirname(os.path.join(repo_path, name)), exist_ok=True)
+            with open(os.path.join(repo_path, name), 'w') as f:
+                f.write(ENDPOINT_CODE)
+        batches, events = [], []
+        
+        graph, stats = run_pipeline(
+            repo_path, batch_size=100, max_workers=1, progressive=True,
+            on_batch_written=lambda paths: (batches.append(paths), events.append("batch")),
+            on_quick_look=lambda: events.append("quick_look")
+        )
+        
+        first = sorted(os.path.relpath(path, repo_path) for path in batches[0])
+        assert first == sorted(["models.py", os.path.join("api", "users.py"), os.path.join("routes", "orders.py")])
+        assert events == ["batch", "quick_look", "batch"]
+        assert stats.quick_look_files == 3
+        assert stats.files_extracted == 11
+        assert len(graph._mock_nodes) == 11
+    finally:
+        shutil.rmtree(repo_path)
+
+
+def test_cancelled_consumer_leaves_no_thread_behind():
+    def slow():
+        while True:
+            time.sleep(0.3)
+            yield 1
+
+    async def consume():
+        async for _ in iterate_in_thread(slow(), 4, name="slow-producer"):
+            pass
+
+    async def main():
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.5)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    # asyncio.run waits for the default executor's threads at shutdown
+    runner = threading.Thread(target=asyncio.run, args=(main(),), daemon=True)
+    runner.start()
+    runner.join(timeout=5)
+    assert not runner.is_alive()
+
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline and any(
+        t.name == "slow-producer" or t.name.startswith("asyncio_") for t in threading.enumerate()
+    ):
+        time.sleep(0.05)
+    assert not [t.name for t in threading.enumerate()
+                if t.name == "slow-producer" or t.name.startswith("asyncio_")]
+
+
+def test_failed_extraction_cancels_the_tasks_still_in_flight(monkeypatch):
+    """One failing chunk fails the run without leaving other extractions behind"""
+    monkeypatch.setattr(settings, "EXTRACTION_CHUNK_MAX_FILES", 1)
+    repo_path = create_repo(3)
+    with open(os.path.join(repo_path, "slow.py"), 'w') as f:
+        f.write(ENDPOINT_CODE * 4)  # Largest, so submitted first
+    cancelled = []
+    
+    class Share:
+        class pool:
+            max_workers = 1
+        
+        @staticmethod
+        def max_in_flight():
+            return 4
+    
+    class FailingPipeline(IngestionPipeline):
+        async def _extract_chunk(self, chunk, pool):
+            if chunk[0].path.endswith("slow.py"):
+                try:
+                    await asyncio.sleep(30)
+                except asyncio.CancelledError:
+                    cancelled.append(chunk[0].path)
+                    raise
+            if chunk[0].path.endswith("module_0.py"):
+                raise ValueError("extractor crashed")
+            return await asyncio.to_thread(lambda: [(f.path, ExtractionResult(nodes=[], edges=[])) for f in chunk])
+    
+    async def run():
+        files = RepositoryScanner().scan(repo_path)
+        pipeline = FailingPipeline("project-1", graph=GraphService(use_mock=True), share=Share())
+        try:
+            await pipeline.run(files)
+        except ValueError:
+            return cancelled[:]
+    
+    try:
+        started = time.monotonic()
+        assert asyncio.run(run()) == [os.path.join(repo_path, "slow.py")]
+        assert time.monotonic() - started < 10
+    finally:
+        shutil.rmtree(repo_path)
@@ -0,0 +1,196 @@
+"""
+Test the bare-mirror clone cache.
+"""
+
+import asyncio
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import pytest
+
+from app.services.repo_store import GitTimeoutError, RepositoryStore
+
+
+def git(repo_path: str, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.email=test@example.com", "-c", "user.name=Test", *args],
+        cwd=repo_path, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def make_origin(workdir: str, name: str = "origin") -> str:
+    origin = os.path.join(workdir, name)
+    os.makedirs(origin)
+    git(origin, "init", "-q")
+    with open(os.path.join(origin, "app.py"), 'w') as f:
+        f.write("print('v1')\n")
+    git(origin, "add", ".")
+    git(origin, "commit", "-qm", "v1")
+    return origin
+
+
+def test_checkout_reuses_mirror_and_fetches_new_commits():
+    workdir = tempfile.mkdtemp()
+    try:
+        origin = make_origin(workdir)
+        store = RepositoryStore(os.path.join(workdir, "storage"))
+        dest = os.path.join(workdir, "storage", "project-1")
+        
+        first = store.checkout(origin, dest)
+        assert first == git(origin, "rev-parse", "HEAD")
+        assert os.path.exists(os.path.join(dest, "app.py"))
+        
+        with open(os.path.join(origin, "app.py"), 'w') as f:
+            f.write("print('v2')\n")
+        git(origin, "commit", "-qam", "v2")
+        
+        second = store.checkout(origin, dest)
+        assert second == git(origin, "rev-parse", "HEAD")
+        assert second != first
+        with open(os.path.join(dest, "app.py")) as f:
+            assert "v2" in f.read()
+        assert store.worktree_owner(dest) == store.mirror_path(origin)
+        assert len(os.listdir(store.mirrors_dir)) == 2  # mirror + lock file
+    finally:
+        shutil.rmtree(workdir)
+
+
+def test_url_spellings_share_one_mirror():
+    store = RepositoryStore(tempfile.mkdtemp())
+    
+    paths = {
+        store.mirror_path(url)
+        for url in ("https://Example.com/org/repo", "https://example.com/org/repo.git",
+                    "https://example.com/org/repo/")
+    }
+    assert len(paths) == 1
+    assert store.mirror_path("https://example.com/org/other") not in paths
+    shutil.rmtree(store.root)
+
+
+def test_shallow_mirror():
+    workdir = tempfile.mkdtemp()
+    try:
+        origin = make_origin(workdir)
+        git(origin, "commit", "--allow-empty", "-qm", "v2")
+        store = RepositoryStore(os.path.join(workdir, "storage"), depth=1)
+        
+        # Local paths ignore --depth, so clone over the file:// transport
+        store.checkout(f"file://{origin}", os.path.join(workdir, "storage", "p"))
+        mirror = store.mirror_path(f"file://{origin}")
+        assert git(mirror, "rev-list", "--count", "HEAD") == "1"
+    finally:
+        shutil.rmtree(workdir)
+
+
+def test_lru_mirrors_are_evicted_over_quota():
+    workdir = tempfile.mkdtemp()
+    try:
+        old_origin = make_origin(workdir, "old")
+        new_origin = make_origin(workdir, "new")
+        store = RepositoryStore(os.path.join(workdir, "storage"))
+        old_dest = os.path.join(workdir, "storage", "old-project")
+        
+        store.checkout(old_origin, old_dest)
+        store.quota_bytes = 1
+        store.checkout(new_origin, os.path.join(workdir, "storage", "new-project"))
+        
+        assert not os.path.exists(store.mirror_path(old_origin))
+        assert not os.path.exists(old_dest)
+        assert os.path.exists(store.mirror_path(new_origin))
+    finally:
+        shutil.rmtree(workdir)
+
+
+def test_eviction_skips_mirrors_whose_lock_is_held():
+    workdir = tempfile.mkdtemp()
+    try:
+        busy_origin = make_origin(workdir, "busy")
+        new_origin = make_origin(workdir, "new")
+        store = RepositoryStore(os.path.join(workdir, "storage"), quota_bytes=1)
+        busy = store.ensure_mirror(busy_origin)
+        new = store.ensure_mirror(new_origin)
+
+        async def evict_while_locked():
+            # A clone of the same process holding the lock must not deadlock the loop
+            async with store._locked_async(busy):
+                return await asyncio.wait_for(store.evict_async(keep=new), timeout=10)
+
+        assert asyncio.run(evict_while_locked()) == []
+        assert os.path.exists(busy)
+        assert store.evict(keep=new) == [busy]
+    finally:
+        shutil.rmtree(workdir)
+
+
+def test_mirrors_in_use_are_not_evicted():
+    workdir = tempfile.mkdtemp()
+    try:
+        used_origin = make_origin(workdir, "used")
+        new_origin = make_origin(workdir, "new")
+        store = RepositoryStore(os.path.join(workdir, "storage"), quota_bytes=1)
+        used_dest = os.path.join(workdir, "storage", "used-project")
+        store.checkout(used_origin, used_dest)
+        new = store.ensure_mirror(new_origin)
+
+        async def evict_during_job():
+            # Another job (here in the same process) is still extracting from the checkout
+            async with store.in_use(used_origin):
+                return await store.evict_async(keep=new)
+
+        assert asyncio.run(evict_during_job()) == []
+        assert os.path.exists(os.path.join(used_dest, "app.py"))
+        assert store.evict(keep=new) == [store.mirror_path(used_origin)]
+        assert not os.path.exists(used_dest)
+    finally:
+        shutil.rmtree(workdir)
+
+
+def test_async_clone_reports_progress():
+    workdir = tempfile.mkdtemp()
+    try:
+        origin = make_origin(workdir)
+        store = RepositoryStore(os.path.join(workdir, "storage"))
+        dest = os.path.join(workdir, "storage", "project-1")
+        updates = []
+
+        commit = asyncio.run(store.checkout_async(
+            "file://" + origin, dest, on_progress=lambda phase, percent: updates.append((phase, percent))
+        ))
+
+        assert commit == git(origin, "rev-parse", "HEAD")
+        assert os.path.exists(os.path.join(dest, "app.py"))
+        assert ("Receiving objects", 100) in updates
+    finally:
+        shutil.rmtree(workdir)
+
+
+def test_hung_clone_is_killed_on_timeout_and_cancel(monkeypatch):
+    workdir = tempfile.mkdtemp()
+    try:
+        # The ssh transport never answers
+        monkeypatch.setenv("GIT_SSH_COMMAND", "sleep 60 #")
+        store = RepositoryStore(os.path.join(workdir, "storage"))
+        repo_url = "ssh://git@example.invalid/repo.git"
+
+        started = time.time()
+        with pytest.raises(GitTimeoutError):
+            asyncio.run(store.ensure_mirror_async(repo_url, timeout=0.5))
+        assert time.time() - started < 10
+
+        async def cancelled():
+            task = asyncio.create_task(store.ensure_mirror_async(repo_url))
+            await asyncio.sleep(0.5)
+            task.cancel()
+            await task
+
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(cancelled())
+        assert time.time() - started < 20
+        # No partial mirror is left behind
+        assert [name for name in os.listdir(store.mirrors_dir) if name.endswith((".git", ".tmp"))] == []
+    finally:
+        shutil.rmtree(workdir)
@@ -0,0 +1,146 @@
+"""
+Test the threaded os.scandir repository walk.
+"""
+
+import copy
+import os
+import shutil
+import tempfile
+
+from app.core.config import settings
+from app.services.scanner import RepositoryScanner
+
+from tests.services.test_incremental import git
+
+
+def write(repo: str, name: str, content: str) -> None:
+    path = os.path.join(repo, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def make_tree() -> str:
+    repo = tempfile.mkdtemp()
+    for i in range(3):
+        for j in range(4):
+            write(repo, f"pkg{i}/sub{j}/mod.py", "x = 1\n" * (i + j + 1))
+    write(repo, "main.py", "print('hi')\n")
+    write(repo, "README.md", "docs\n")
+    write(repo, "node_modules/dep/index.js", "module.exports = 1\n")
+    write(repo, ".hidden/secret.py", "x = 2\n")
+    os.symlink(os.path.join(repo, "pkg0"), os.path.join(repo, "linked"))
+    return repo
+
+
+def reference_scan(repo: str):
+    """What the scanner's former os.walk loop produced"""
+    scanner = RepositoryScanner()
+    files, scanned, ignored = [], 0, 0
+    for root, dirs, filenames in os.walk(repo):
+        relative_root = os.path.relpath(root, repo).replace(os.sep, '/')
+        prefix = "" if relative_root == "." else relative_root + "/"
+        kept = [d for d in dirs if not scanner._should_ignore_directory(prefix + d)]
+        ignored += len(dirs) - len(kept)
+        scanned += len(kept)
+        dirs[:] = kept
+        for filename in filenames:
+            if scanner._should_process_file(prefix + filename):
+                path = os.path.join(root, filename)
+                files.append((path, os.path.relpath(path, repo), os.path.getsize(path)))
+    return files, scanned, ignored
+
+
+def test_threaded_scan_matches_os_walk():
+    repo = make_tree()
+    try:
+        expected, scanned, ignored = reference_scan(repo)
+
+        for workers in (1, 4):
+            scanner = RepositoryScanner()
+            files = scanner.scan(repo, workers=workers)
+
+            assert [(f.path, f.relative_path, f.size_bytes) for f in files] == expected
+            assert scanner.stats.total_files == 13
+            assert scanner.stats.directories_scanned == scanned
+            assert scanner.stats.directories_ignored == ignored == 2
+    finally:
+        shutil.rmtree(repo)
+
+
+def test_subdir_scan_keeps_repo_relative_paths():
+    repo = make_tree()
+    try:
+        files = RepositoryScanner().scan(repo, subdir="pkg1/sub2", workers=4)
+
+        assert [f.relative_path for f in files] == [os.path.join("pkg1", "sub2", "mod.py")]
+    finally:
+        shutil.rmtree(repo)
+
+
+def test_git_checkout_is_listed_from_the_index(monkeypatch):
+    repo = make_tree()
+    try:
+        git(repo, "init", "-q")
+        write(repo, ".gitignore", "generated/\n")
+        git(repo, "add", ".")
+        git(repo, "commit", "-qm", "initial")
+        write(repo, "generated/client.py", "x = 3\n")  # Untracked and gitignored
+        write(repo, "new.py", "x = 4\n")  # Untracked, not ignored
+        os.remove(os.path.join(repo, "main.py"))  # Deleted from the work tree only
+
+        files = RepositoryScanner().scan(repo)
+        paths = {f.relative_path for f in files}
+
+        assert "new.py" in paths
+        assert "main.py" not in paths
+        assert os.path.join("generated", "client.py") not in paths
+        assert os.path.join("node_modules", "dep", "index.js") not in paths
+        assert all(f.size_bytes == os.path.getsize(f.path) for f in files)
+
+        # Walking applies the same .gitignore
+        monkeypatch.setattr(settings, "SCAN_USE_GIT", False)
+        assert {f.relative_path for f in RepositoryScanner().scan(repo)} == paths
+        monkeypatch.setattr(settings, "SCAN_RESPECT_GITIGNORE", False)
+        walked = {f.relative_path for f in RepositoryScanner().scan(repo)}
+        assert walked == paths | {os.path.join("generated", "client.py")}
+    finally:
+        shutil.rmtree(repo)
+
+
+def test_scan_iter_yields_the_same_files_as_scan():
+    repo = make_tree()
+    try:
+        expected = RepositoryScanner().scan(repo, workers=4)
+
+        for workers in (1, 4):
+            scanner = RepositoryScanner()
+            streamed = scanner.scan_iter(repo, workers=workers)
+            first = next(streamed)
+            rest = list(streamed)
+
+            assert sorted([first] + rest, key=lambda f: f.path) == sorted(expected, key=lambda f: f.path)
+            assert scanner.stats.total_files == len(expected) == 13
+            assert scanner.stats.total_size_bytes == sum(f.size_bytes for f in expected)
+
+        # Abandoning a scan part-way stops its listing threads
+        partial = RepositoryScanner().scan_iter(repo, workers=4)
+        next(partial)
+        partial.close()
+    finally:
+        shutil.rmtree(repo)
+
+
+def test_rescanning_resets_the_statistics():
+    repo = make_tree()
+    try:
+        scanner = RepositoryScanner()
+        scanner.deduplicate(scanner.scan(repo))
+        first = copy.deepcopy(scanner.get_statistics())
+
+        scanner.deduplicate(scanner.scan(repo))
+
+        assert scanner.get_statistics() == first
+        assert scanner.stats.total_files == 13
+    finally:
+        shutil.rmtree(repo)
@@ -0,0 +1,71 @@
+"""
+Test fair multi-tenant scheduling of ingest jobs.
+"""
+
+from app.core.config import settings
+from app.services.scheduler import Candidate, FairShare, JobPriority, pick_next
+
+from tests.services.test_job_queue import make_queue
+
+
+def test_interactive_jobs_jump_the_queue():
+    queue = make_queue()
+    queue.enqueue("ingest", "monorepo", {}, tenant="data", priority=JobPriority.BATCH)
+    queue.enqueue("ingest", "nightly", {}, tenant="data")
+    quick = queue.enqueue("ingest", "small", {}, tenant="web", priority=JobPriority.INTERACTIVE)
+
+    assert queue.claim("worker-a").id == quick.id
+    assert queue.claim("worker-a").project_id == "nightly"
+    assert queue.claim("worker-a").project_id == "monorepo"
+
+
+def test_per_tenant_cap_and_fair_share(monkeypatch):
+    monkeypatch.setattr(settings, "TENANT_JOB_LIMITS", {"data": 1})
+    queue = make_queue()
+    queue.enqueue("ingest", "data-1", {}, tenant="data")
+    queue.enqueue("ingest", "data-2", {}, tenant="data")
+    queue.enqueue("ingest", "web-1", {}, tenant="web")
+    queue.enqueue("ingest", "web-2", {}, tenant="web")
+
+    claimed = [queue.claim("worker-a").project_id for _ in range(3)]
+    # "data" is capped at one running job; "web" gets its turn after data-1
+    assert claimed == ["data-1", "web-1", "web-2"]
+    assert queue.claim("worker-a") is None
+
+    job = queue.list_for_project("data-1")[0]
+    queue.complete(job.id)
+    assert queue.claim("worker-a").project_id == "data-2"
+
+
+def test_min_priority_only_claims_urgent_jobs():
+    queue = make_queue()
+    queue.enqueue("ingest", "batch", {}, priority=JobPriority.BATCH)
+    assert queue.claim("worker-a", min_priority=JobPriority.INTERACTIVE) is None
+    assert queue.claim("worker-a").project_id == "batch"
+
+
+def test_waiting_jobs_age_into_higher_classes(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_PRIORITY_AGING_SECONDS", 60.0)
+    batch = Candidate("batch", "data", JobPriority.BATCH, created_at=0.0)
+
+    fresh_normal = Candidate("normal", "web", JobPriority.NORMAL, created_at=45.0)
+    assert pick_next([batch, fresh_normal], {}, now=50.0).job_id == "normal"
+
+    # After two aging intervals the batch job outranks a fresh normal one
+    fresh_normal = Candidate("normal", "web", JobPriority.NORMAL, created_at=120.0)
+    assert pick_next([batch, fresh_normal], {}, now=125.0).job_id == "batch"
+
+
+def test_fair_share_rebalances_extraction_slots(monkeypatch):
+    monkeypatch.setattr(settings, "TENANT_WEIGHTS", {})
+    share = FairShare(capacity=8)
+
+    share.join("monorepo", "data", JobPriority.BATCH)
+    assert share.quota("monorepo") == 8
+
+    share.join("small", "web", JobPriority.INTERACTIVE)
+    assert share.quota("small") == 6
+    assert share.quota("monorepo") == 1
+
+    share.leave("small")
+    assert share.quota("monorepo") == 8
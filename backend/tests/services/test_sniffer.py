@@ -0,0 +1,92 @@
+"""
+Test sniffing of binary, minified and generated files.
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from app.core.config import settings
+from app.services.git_objects import GitObjectReader, list_tree
+from app.services.scanner import RepositoryScanner
+from app.services.sniffer import SkipReason, sniff
+
+from tests.services.test_incremental import git
+from tests.services.test_scanner import write
+
+
+SOURCE = "def handler(request):\n    return {'ok': True}\n" * 20
+MINIFIED = "!function(e){" + "var a=e.b||{};" * 200 + "}();\n"
+PROTOBUF = "# Generated by the protocol buffer compiler.  DO NOT EDIT!\n" + SOURCE
+
+
+def test_sniff_classifies_heads():
+    assert sniff(SOURCE.encode(), len(SOURCE)) is None
+    assert sniff(b"", 0) is None
+    assert sniff(b"PK\x03\x04\x00\x00", 6) is SkipReason.BINARY
+    assert sniff(MINIFIED.encode(), len(MINIFIED)) is SkipReason.MINIFIED
+    # Many lines that are each just under the limit
+    wide = ("x = '" + "a" * 400 + "'\n") * 8
+    assert sniff(wide.encode(), len(wide)) is SkipReason.MINIFIED
+    assert sniff(PROTOBUF.encode(), len(PROTOBUF)) is SkipReason.GENERATED
+    assert sniff(b"// Code generated by protoc-gen-go. DO NOT EDIT.\n", 49) is SkipReason.GENERATED
+    # The size alone decides, whatever the head holds
+    assert sniff(SOURCE.encode()[:100], settings.SCAN_MAX_FILE_BYTES + 1) is SkipReason.TOO_LARGE
+
+
+def test_sniff_thresholds_are_configurable(monkeypatch):
+    monkeypatch.setattr(settings, "SCAN_MINIFIED_MAX_LINE", 10 ** 6)
+    monkeypatch.setattr(settings, "SCAN_MINIFIED_MEAN_LINE", 10 ** 6)
+    monkeypatch.setattr(settings, "SCAN_GENERATED_MARKERS", [])
+    monkeypatch.setattr(settings, "SCAN_MAX_FILE_BYTES", 0)
+
+    assert sniff(MINIFIED.encode(), len(MINIFIED)) is None
+    assert sniff(PROTOBUF.encode(), len(PROTOBUF)) is None
+    assert sniff(b"x = 1\n", 10 ** 12) is None
+
+
+@pytest.mark.parametrize("use_git", [False, True])
+def test_scanner_reports_sniffed_out_files(monkeypatch, use_git):
+    monkeypatch.setattr(settings, "SCAN_MAX_FILE_BYTES", 64 * 1024)
+    repo = tempfile.mkdtemp()
+    try:
+        write(repo, "app/api.py", SOURCE)
+        write(repo, "app/users_pb2.py", PROTOBUF)
+        write(repo, "static/vendor.js", MINIFIED)
+        write(repo, "static/logo.json", "\x00\x01binary")
+        write(repo, "fixtures/big.json", '{"rows": [\n' + '  {"id": 1},\n' * 8000 + ']}\n')
+        if use_git:
+            git(repo, "init", "-q")
+
+        scanner = RepositoryScanner()
+        files = scanner.scan(repo)
+
+        assert [f.relative_path for f in files] == [os.path.join("app", "api.py")]
+        assert scanner.stats.skipped_files == {
+            "app/users_pb2.py": SkipReason.GENERATED,
+            "static/vendor.js": SkipReason.MINIFIED,
+            "static/logo.json": SkipReason.BINARY,
+            "fixtures/big.json": SkipReason.TOO_LARGE,
+        }
+        assert scanner.stats.skipped_by_reason == {
+            "generated": 1, "minified": 1, "binary": 1, "too_large": 1
+        }
+        assert scanner.stats.total_files == 1
+        # Changed-file scans sniff the same way
+        assert RepositoryScanner().scan_paths(repo, ["app/api.py", "static/vendor.js"]) == files
+        
+        # And so do object-store scans, through the blob reader
+        git(repo, "init", "-q")
+        git(repo, "add", ".")
+        git(repo, "commit", "-qm", "initial")
+        tree_scanner = RepositoryScanner()
+        sniffed = {}
+        with GitObjectReader(repo) as reader:
+            blobs = tree_scanner.scan_tree(repo, list_tree(repo), reader, sniffed)
+        assert [f.relative_path for f in blobs] == [os.path.join("app", "api.py")]
+        assert tree_scanner.stats.skipped_files == scanner.stats.skipped_files
+        assert len(sniffed) == 4  # Blobs read once; the oversized one is never read
+    finally:
+        shutil.rmtree(repo)
@@ -0,0 +1,86 @@
+"""
+Test per-workspace ingestion of monorepos.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+
+import app.services.ingestion as ingestion_module
+from app.core.config import settings
+from app.services.checkpoints import CheckpointStore
+from app.services.detector import LanguageDetector
+from app.services.graph_service import GraphService
+from app.services.ingestion import IngestionService
+from app.services.project_store import ProjectStore
+from app.services.repo_store import RepositoryStore
+
+from tests.services.test_incremental import endpoint_code, endpoint_paths, git, write
+
+
+def make_dirs(root: str, *paths: str) -> None:
+    for path in paths:
+        os.makedirs(os.path.join(root, path), exist_ok=True)
+
+
+def test_workspace_patterns_from_package_json():
+    repo = tempfile.mkdtemp()
+    try:
+        make_dirs(repo, "apps/web", "apps/admin", "libs/shared", "tools/scripts")
+        write(repo, "package.json", json.dumps({"workspaces": {"packages": ["apps/*", "libs/shared"]}}))
+        write(repo, "lerna.json", json.dumps({"packages": ["tools/*", "!tools/legacy"]}))
+
+        result = LanguageDetector(repo).detect()
+
+        assert result.is_monorepo
+        assert result.workspaces == ["apps/admin", "apps/web", "libs/shared", "tools/scripts"]
+    finally:
+        shutil.rmtree(repo)
+
+
+def test_monorepo_workspaces_ingest_and_reingest_separately(monkeypatch):
+    workdir = tempfile.mkdtemp()
+    origin = os.path.join(workdir, "origin")
+    try:
+        make_dirs(origin, "packages/api", "packages/web")
+        git(origin, "init", "-q")
+        write(origin, "pnpm-workspace.yaml", "packages:\n  - 'packages/*'\n")
+        write(origin, "packages/api/app.py", endpoint_code("/api"))
+        write(origin, "packages/web/app.py", endpoint_code("/web"))
+        write(origin, "tools.py", endpoint_code("/tools"))
+        git(origin, "add", ".")
+        git(origin, "commit", "-qm", "initial")
+
+        storage = os.path.join(workdir, "storage")
+        projects = ProjectStore(os.path.join(workdir, "state.db"))
+        monkeypatch.setattr(settings, "REPO_STORAGE_PATH", storage)
+        monkeypatch.setattr(ingestion_module, "checkpoint_store",
+                            CheckpointStore(os.path.join(workdir, "checkpoints.db")))
+        monkeypatch.setattr(ingestion_module, "project_store", projects)
+        monkeypatch.setattr(ingestion_module, "repo_store", RepositoryStore(storage))
+        service = IngestionService()
+        graph = GraphService(use_mock=True)
+
+        result = asyncio.run(service.ingest_repo(origin, project_id="mono", graph=graph))
+
+        assert result["workspaces"] == ["packages/api", "packages/web"]
+        assert set(result["metrics"]["workspaces"]) == {".", "packages/api", "packages/web"}
+        tags = {n["path"]: n["workspace"] for n in graph._mock_nodes.values() if n["type"] == "Endpoint"}
+        assert tags == {"/api": "packages/api", "/web": "packages/web", "/tools": None}
+
+        # Both packages change, but only the API is re-ingested
+        write(origin, "packages/api/app.py", endpoint_code("/api/v2"))
+        write(origin, "packages/web/app.py", endpoint_code("/web/v2"))
+        git(origin, "commit", "-qam", "update")
+        commit = git(origin, "rev-parse", "HEAD").strip()
+
+        update = asyncio.run(service.ingest_workspace("mono", "packages/api", graph=graph))
+
+        assert update["files_extracted"] == 1
+        assert endpoint_paths(graph, "mono") == ["/api/v2", "/tools", "/web"]
+        assert projects.workspaces("mono")["packages/api"] == commit
+        assert projects.workspaces("mono")["packages/web"] != commit
+    finally:
+        shutil.rmtree(workdir)